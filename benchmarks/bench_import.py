@@ -0,0 +1,68 @@
+"""startup time of `import pynumstim`
+
+Measures the cumulative import time of the package (via `python -X importtime`)
+in fresh interpreters and fails, if the best run exceeds the time budget or if
+heavy dependencies are imported.
+
+usage: python benchmarks/bench_import.py [--budget MILLISECONDS] [--runs N]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.absolute()
+HEAVY_MODULES = ["numpy", "pandas", "toml", "sympy", "PIL"]
+
+
+def import_time(module: str = "pynumstim") -> float:
+    """cumulative import time in milliseconds measured in a fresh interpreter"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = [x.strip() for x in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000.0
+    raise RuntimeError(f"Can't find import time of '{module}'")
+
+
+def loaded_heavy_modules(module: str = "pynumstim") -> list:
+    code = (
+        f"import sys, {module}; "
+        + f"print(' '.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT,
+        check=True,
+    )
+    return proc.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=100.0, help="in ms")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    times = [import_time() for _ in range(args.runs)]
+    best = min(times)
+    heavy = loaded_heavy_modules()
+    print(f"import pynumstim: {best:.1f} ms (best of {args.runs}), "
+          + f"budget: {args.budget:.1f} ms")
+    if len(heavy) > 0:
+        print(f"FAILED: heavy modules imported: {', '.join(heavy)}")
+        sys.exit(1)
+    if best > args.budget:
+        print("FAILED: import time exceeds budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""pickling of problem lists for multiprocessing
+
+Compares the compact pickling of `SimpleArithmeticList` (columns of numbers
+and categorical properties) with the pickling of every problem and number as
+separate object. Reports pickle size, dump and load times and the time to
+pass a list to a worker of a `ProcessPoolExecutor`.
+
+usage: python benchmarks/bench_pickle.py [--n N] [--repeat N]
+"""
+
+import argparse
+import copyreg
+import io
+import pickle
+import sys
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from pynumstim import (  # noqa: E402
+    Datasets,
+    Num,
+    SimpleArithmetic,
+    SimpleArithmeticList,
+)
+
+
+class ObjectPickler(pickle.Pickler):
+    """pickles problems and numbers as separate objects (default pickling
+    of Python objects)"""
+
+    def reducer_override(self, obj):
+        if type(obj) in (Num, SimpleArithmetic, SimpleArithmeticList):
+            state = dict(obj.__dict__)
+            if "_store" in state:
+                state["_store"] = None  # cache of the property columns
+            return (copyreg.__newobj__, (type(obj),), state)
+        return NotImplemented
+
+
+def object_dumps(obj) -> bytes:
+    fl = io.BytesIO()
+    ObjectPickler(fl, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return fl.getvalue()
+
+
+def compact_dumps(obj) -> bytes:
+    return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def n_problems(lst) -> int:
+    """worker task"""
+    return len(lst.list)
+
+
+def n_problems_objects(data: bytes) -> int:
+    """worker task, problems pickled as objects"""
+    lst = pickle.loads(data)
+    return len(lst.list)
+
+
+def problem_list(n: int):
+    lst = Datasets.problem_space(
+        "+", range(1, 101), range(1, 101), incorrect_deviations=range(-5, 6)
+    )
+    lst = lst.get_random(n=n).copy()
+    lst.update_properties({"block": 1, "condition": "addition"})
+    return lst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000, help="number of problems")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lst = problem_list(args.n)
+    print(f"{'pickling':<10} {'size':>10} {'dumps':>10} {'loads':>10} {'executor':>10}")
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(n_problems, problem_list(10)).result()  # start worker
+        for name, dumps, task, arg in (
+            ("objects", object_dumps, n_problems_objects, lambda: object_dumps(lst)),
+            ("compact", compact_dumps, n_problems, lambda: lst),
+        ):
+            data = dumps(lst)
+            t_dumps = min(timeit.repeat(lambda: dumps(lst), number=1, repeat=args.repeat))
+            t_loads = min(
+                timeit.repeat(lambda: pickle.loads(data), number=1, repeat=args.repeat)
+            )
+            t_pool = min(
+                timeit.repeat(
+                    lambda: pool.submit(task, arg()).result(), number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(
+                f"{name:<10} {len(data) / 1e6:>8.2f}MB {t_dumps * 1000:>8.1f}ms "
+                + f"{t_loads * 1000:>8.1f}ms {t_pool * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+"""benchmark suite of pynumstim
+
+Measures generation, selection, export and rendering and stores the results
+as JSON. Results of different runs can be compared to detect regressions.
+
+usage:
+    python benchmarks/run_benchmarks.py [-o results.json] [-k FILTER]
+    python benchmarks/run_benchmarks.py --compare baseline.json [--threshold 1.2]
+
+Rendering is measured with a stub renderer (no LaTeX required) and, if
+`latex` and `dvipng` are installed, with the real toolchain.
+"""
+
+import argparse
+import io
+import json
+import pickle
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+import pynumstim  # noqa: E402
+from pynumstim import Datasets, Num, SimpleArithmetic  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+HAS_DVIPNG = shutil.which("latex") is not None and shutil.which("dvipng") is not None
+
+
+def benchmark(name: str):
+    """registers a benchmark. The decorated function does the setup and
+    returns the function to be timed"""
+
+    def decorator(fnc):
+        BENCHMARKS[name] = fnc
+        return fnc
+
+    return decorator
+
+
+def _problem_list(n_operand1: int = 99):
+    return Datasets.problem_space(
+        "+", range(1, n_operand1 + 1), range(1, 100), incorrect_deviations=[-2, 2]
+    )
+
+
+# generation
+for _n in (10, 100, 300):
+
+    @benchmark(f"problem_space[{_n}x99x3]")
+    def _bench_problem_space(n=_n):
+        return lambda: _problem_list(n)
+
+
+for _n_jobs in (1, None):
+
+    @benchmark(f"ProblemSpace.columns[2000x2x1000x3,n_jobs={_n_jobs}]")
+    def _bench_columns(n_jobs=_n_jobs):
+        from pynumstim import ProblemSpace
+
+        space = ProblemSpace(
+            range(10, 2010), ["+", "-"], range(10, 1010), deviations=[-2, 2]
+        ).where(carry=True)
+        return lambda: space.columns(n_jobs=n_jobs)
+
+
+@benchmark("datasets[bundled]")
+def _bench_datasets():
+    def fnc():
+        Datasets.Ahren_Jackson_79()
+        Datasets.Lindemann_Tira_10()
+        Datasets.Lyons_Bielock_12_list()
+
+    return fnc
+
+
+# selection
+@benchmark("find[problem_size]")
+def _bench_find():
+    lst = _problem_list()
+    return lambda: lst.find(problem_size=50, correct=True)
+
+
+@benchmark("find[n_carry]")
+def _bench_find_carry():
+    lst = _problem_list()
+    return lambda: lst.find(n_carry=1)
+
+
+@benchmark("find[properties]")
+def _bench_find_properties():
+    lst = _problem_list()
+    lst.update_properties({"category": "addition", "block": 1})
+    return lambda: lst.find(properties={"category": "addition", "block": 1})
+
+
+@benchmark("query[range,set,expr]")
+def _bench_query():
+    lst = _problem_list()
+    return lambda: lst.query(
+        "n_carry > 0 and not tie", result=(20, 50), problem_size=(None, 30),
+        operation={"+", "-"},
+    )
+
+
+@benchmark("make_foils")
+def _bench_make_foils():
+    lst = _problem_list()
+    return lambda: lst.make_foils(min_result=0, balance_size=True, seed=1)
+
+
+@benchmark("match[greedy,1000x29403]")
+def _bench_match_greedy():
+    lst = _problem_list()
+    targets = lst.find(deviation=0).get_random(n=1000)
+    return lambda: targets.match(lst)
+
+
+@benchmark("match[optimal,200x29403]")
+def _bench_match_optimal():
+    lst = _problem_list()
+    targets = lst.find(deviation=0).get_random(n=200)
+    return lambda: targets.match(lst, method="optimal")
+
+
+@benchmark("summary[by operand2]")
+def _bench_summary():
+    lst = _problem_list()
+    return lambda: lst.summary(by="op2")
+
+
+@benchmark("balance_batch[500x80]")
+def _bench_balance_batch():
+    lst = pynumstim.SimpleArithmeticList()
+    for correct in (True, False):
+        sub = _problem_list(30).find(correct=correct)
+        sub.update_properties({"condition": correct})
+        lst.append(sub)
+    candidates = [lst.get_random(n=80) for _ in range(500)]
+    return lambda: lst.balance_batch(candidates, by="condition")
+
+
+@benchmark("rand_selection")
+def _bench_rand_selection():
+    lst = _problem_list(30)
+    return lambda: lst.rand_selection(
+        n_correct=40, n_smaller=20, n_larger=20, dev_corr=[1, 2]
+    )
+
+
+@benchmark("get_random")
+def _bench_get_random():
+    lst = _problem_list(30)
+    return lambda: lst.get_random(n=80, dev_corr=0)
+
+
+@benchmark("pickle[dumps+loads,100k]")
+def _bench_pickle():
+    lst = Datasets.problem_space(
+        "+", range(1, 101), range(1, 101), incorrect_deviations=range(-5, 6)
+    )
+    lst = lst.get_random(n=100_000)
+    return lambda: pickle.loads(pickle.dumps(lst, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# export
+@benchmark("data_frame")
+def _bench_data_frame():
+    lst = _problem_list(30)
+    return lambda: lst.data_frame(problem_size=True, n_carry=True)
+
+
+@benchmark("to_csv")
+def _bench_to_csv():
+    lst = _problem_list(30)
+    buf = io.StringIO()
+
+    def fnc():
+        buf.seek(0)
+        lst.to_csv(buf)
+
+    return fnc
+
+
+# problems and numbers
+@benchmark("SimpleArithmetic.parse")
+def _bench_parse():
+    labels = [f"{a}+{b}={a + b}" for a in range(1, 33) for b in range(1, 33)]
+    return lambda: [SimpleArithmetic.parse(x) for x in labels]
+
+
+@benchmark("Num.arithmetic")
+def _bench_num():
+    nums = [Num(x) for x in range(1, 1001)]
+    half = Num(1, 2)
+
+    def fnc():
+        for x in nums:
+            (x + half) * x - x / half
+
+    return fnc
+
+
+# rendering
+def _stub_png(tex_str, filename, resolution=400, fg="White", bg="Transparent",
+              stats=None, renderer=None):
+    _stub_pillow(tex_str).save(filename)
+
+
+def _stub_pillow(tex_str, resolution=400, fg="White", bg="Transparent", stats=None,
+                 renderer=None):
+    from PIL import Image
+
+    return Image.new("RGBA", (10 * len(tex_str), 40), (255, 255, 255, 255))
+
+
+_STUB_PNG = []
+
+
+def _stub_tex_png(tex_str, resolution=400, fg="White", bg="Transparent", stats=None):
+    """PNG bytes of a stimulus of typical size (decoding is not stubbed)"""
+    if len(_STUB_PNG) == 0:
+        buf = io.BytesIO()
+        _stub_pillow("x" * 120).resize((1200, 300)).save(buf, format="PNG")
+        _STUB_PNG.append(buf.getvalue())
+    return io.BytesIO(_STUB_PNG[0])
+
+
+def _render_list():
+    return Datasets.problem_space("*", range(2, 10), range(2, 10))
+
+
+@benchmark("tex_to_image[stub]")
+def _bench_tex_to_image_stub():
+    from pynumstim import writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+    folder = tempfile.mkdtemp()
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex", _stub_png):
+            writer.tex_to_image(problem, path=folder)
+
+    return fnc
+
+
+@benchmark("problem_list_to_images[stub]")
+def _bench_problem_list_stub():
+    from pynumstim import writer
+
+    lst = _render_list()
+    folder = tempfile.mkdtemp()
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex", _stub_png):
+            writer.problem_list_to_images(lst, folder=folder, progress=None)
+
+    return fnc
+
+
+@benchmark("tex_to_pillow+asarray[stub]")
+def _bench_pillow_array_stub():
+    import numpy as np
+
+    from pynumstim import writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+            np.asarray(writer.tex_to_pillow(problem))
+
+    return fnc
+
+
+@benchmark("tex_to_array[stub]")
+def _bench_tex_to_array_stub():
+    from pynumstim import writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+            writer.tex_to_array(problem)
+
+    return fnc
+
+
+@benchmark("problem_list_to_arrays[stub,stack]")
+def _bench_problem_list_arrays_stub():
+    from pynumstim import writer
+
+    lst = _render_list()
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+            writer.problem_list_to_arrays(lst, stack=True, progress=None)
+
+    return fnc
+
+
+_COLOR_SCHEMES = {
+    "dark": ("White", "Black"),
+    "light": ("Black", "White"),
+    "red": ("Red", "Transparent"),
+    "gray": ("rgb 0.2 0.2 0.2", "rgb 0.8 0.8 0.8"),
+}
+
+
+@benchmark("colorize[4 schemes]")
+def _bench_colorize():
+    from pynumstim import writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+    with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+        mask = writer.tex_to_mask(problem)
+
+    return lambda: [writer.colorize(mask, fg, bg) for fg, bg in _COLOR_SCHEMES.values()]
+
+
+@benchmark("problem_list_to_color_variants[stub,4 schemes]")
+def _bench_color_variants_stub():
+    from pynumstim import writer
+
+    lst = _render_list().get_random(n=10)
+    folder = tempfile.mkdtemp()
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+            writer.problem_list_to_color_variants(
+                lst, folder=folder, colors=_COLOR_SCHEMES, progress=None
+            )
+
+    return fnc
+
+
+@benchmark("tex_to_resolutions[stub,300/400/600]")
+def _bench_resolutions_stub():
+    from pynumstim import writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+
+    def fnc():
+        with mock.patch.object(writer, "_from_tex_png", _stub_tex_png):
+            writer.tex_to_resolutions(problem, [300, 400, 600])
+
+    return fnc
+
+
+@benchmark("tex_to_pillow[font]")
+def _bench_tex_to_pillow_font():
+    from pynumstim import FontRenderer, writer
+
+    problem = SimpleArithmetic(12, "*", 7, 84)
+    renderer = FontRenderer()
+    return lambda: writer.tex_to_pillow(problem, renderer=renderer)
+
+
+@benchmark("problem_list_to_images[font]")
+def _bench_problem_list_font():
+    from pynumstim import FontRenderer, writer
+
+    lst = _render_list()
+    folder = tempfile.mkdtemp()
+    renderer = FontRenderer()
+
+    return lambda: writer.problem_list_to_images(
+        lst, folder=folder, progress=None, renderer=renderer
+    )
+
+
+if HAS_DVIPNG:
+
+    @benchmark("tex_to_image[dvipng]")
+    def _bench_tex_to_image_dvipng():
+        from pynumstim import writer
+
+        problem = SimpleArithmetic(12, "*", 7, 84)
+        folder = tempfile.mkdtemp()
+        return lambda: writer.tex_to_image(problem, path=folder)
+
+    @benchmark("problem_list_to_images[dvipng]")
+    def _bench_problem_list_dvipng():
+        from pynumstim import writer
+
+        lst = _render_list().get_random(n=10)
+        folder = tempfile.mkdtemp()
+
+        return lambda: writer.problem_list_to_images(lst, folder=folder, progress=None)
+
+
+def run(name: str, repeat: int, min_time: float) -> Dict[str, float]:
+    fnc = BENCHMARKS[name]()
+    timer = timeit.Timer(fnc)
+    number = 1
+    while True:  # autorange
+        t = timer.timeit(number)
+        if t >= min_time:
+            break
+        number *= 2
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """prints comparison and returns names of regressions"""
+    regressions = []
+    print(f"\n{'benchmark':<34} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, res in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]["min"]
+        ratio = res["min"] / old
+        flag = ""
+        if ratio > threshold:
+            flag = " REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<34} {old * 1000:>10.3f}ms {res['min'] * 1000:>10.3f}ms "
+            + f"{ratio:>7.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("-k", "--filter", default="", help="substring of names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="in seconds")
+    parser.add_argument("--compare", default=None, help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "pynumstim": pynumstim.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "dvipng": HAS_DVIPNG,
+        },
+        "results": {},
+    }
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        res = run(name, repeat=args.repeat, min_time=args.min_time)
+        results["results"][name] = res
+        print(f"{name:<34} {res['min'] * 1000:>10.3f}ms (n={res['number']})")
+
+    with open(args.output, "w", encoding="utf-8") as fl:
+        json.dump(results, fl, indent=2)
+    print(f"results saved: {args.output}")
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as fl:
+            baseline = json.load(fl)
+        if len(compare(results, baseline, args.threshold)) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
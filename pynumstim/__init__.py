@@ -6,9 +6,53 @@ creating math problem stimuli with latex formulas and dvipng
 __author__ = "Oliver Lindemann"
 __version__ = "0.4"
 
-from ._data_sets import Datasets
+from typing import TYPE_CHECKING
+
 from ._math_problem import LaTexProblem, MathProblem
-from ._mplist import SimpleArithmeticList
 from ._number import Num, TNum, TPyNum
 from ._simple import SimpleArithmetic
 from ._two_step_problem import TwoStepArithmetic
+
+if TYPE_CHECKING:
+    from ._atlas import TextureAtlas
+    from ._data_sets import Datasets
+    from ._mplist import SimpleArithmeticList
+    from ._problem_space import ProblemSpace
+    from ._renderer import FontRenderer, Renderer
+    from ._two_step_list import TwoStepArithmeticList
+
+# classes that require numpy, pandas, toml or PIL are imported on first access
+# (PEP 562), so that `import pynumstim` stays fast
+_LAZY_IMPORTS = {
+    "Datasets": "._data_sets",
+    "FontRenderer": "._renderer",
+    "ProblemSpace": "._problem_space",
+    "Renderer": "._renderer",
+    "SimpleArithmeticList": "._mplist",
+    "TextureAtlas": "._atlas",
+    "TwoStepArithmeticList": "._two_step_list",
+}
+
+__all__ = [
+    "LaTexProblem",
+    "MathProblem",
+    "Num",
+    "TNum",
+    "TPyNum",
+    "SimpleArithmetic",
+    "TwoStepArithmetic",
+] + list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+
+        obj = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = obj  # cache, __getattr__ is not called again
+        return obj
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_LAZY_IMPORTS.keys()))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+TRect = Tuple[int, int, int, int, int]  # page, x, y, width, height
+
+
+class TextureAtlas(object):
+    """Stimuli packed into a few images (pages) with an index of the
+    rectangles of all stimuli (see `writer.problem_list_to_atlas`)
+
+    The pages are read and decoded once. Stimuli are returned as views on the
+    page arrays without copying.
+    """
+
+    def __init__(self, index_file: Union[Path, str]) -> None:
+        index_file = Path(index_file)
+        with open(index_file, "r", encoding="utf-8") as fl:
+            index = json.load(fl)
+        folder = index_file.parent
+        self.rects: Dict[str, TRect] = {
+            k: tuple(v) for k, v in index["rects"].items()  # type: ignore
+        }
+        self.pages: List[NDArray[np.uint8]] = []
+        for flname in index["pages"]:
+            with Image.open(folder.joinpath(flname)) as im:
+                arr = np.asarray(im.convert("RGBA"))
+            arr.flags.writeable = False
+            self.pages.append(arr)
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.rects
+
+    def __getitem__(self, label: str) -> NDArray[np.uint8]:
+        """read-only RGBA array (view) of the stimulus"""
+        page, x, y, w, h = self.rects[label]
+        return self.pages[page][y : y + h, x : x + w]
+
+    def labels(self) -> List[str]:
+        return list(self.rects.keys())
+
+    def image(self, label: str) -> Image.Image:
+        """stimulus as Pillow image (copy)"""
+        return Image.fromarray(self[label])
+
+
+def pack(
+    sizes: Dict[str, Tuple[int, int]], max_size: int = 4096, padding: int = 2
+) -> Tuple[Dict[str, TRect], List[Tuple[int, int]]]:
+    """shelf packing of rectangles into pages with a maximum width and
+    height. Rectangles larger than max_size get a page of their own.
+
+    returns rects of all labels and the sizes of the pages
+    """
+    rects: Dict[str, TRect] = {}
+    page_sizes: List[Tuple[int, int]] = [(0, 0)]
+    x, y, shelf_height = 0, 0, 0
+    for label in sorted(sizes, key=lambda k: sizes[k][1], reverse=True):
+        w, h = sizes[label]
+        if w > max_size or h > max_size:  # page of its own
+            if x > 0 or y > 0:
+                page_sizes.append((0, 0))
+            rects[label] = (len(page_sizes) - 1, 0, 0, w, h)
+            page_sizes[-1] = (w, h)
+            page_sizes.append((0, 0))
+            x, y, shelf_height = 0, 0, 0
+            continue
+        if x > 0 and x + w > max_size:  # new shelf
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        if y > 0 and y + h > max_size:  # new page
+            page_sizes.append((0, 0))
+            x, y, shelf_height = 0, 0, 0
+        page = len(page_sizes) - 1
+        rects[label] = (page, x, y, w, h)
+        page_sizes[page] = (
+            max(page_sizes[page][0], x + w),
+            max(page_sizes[page][1], y + h),
+        )
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    if len(page_sizes) > 1 and x == 0 and y == 0:
+        page_sizes.pop()  # empty page after a large rectangle
+    return rects, page_sizes
+
+
+def save_atlas(
+    images: Dict[str, Image.Image],
+    index_file: Union[Path, str],
+    max_size: int = 4096,
+    padding: int = 2,
+) -> List[str]:
+    """packs images into pages and saves pages (PNG) and index (JSON)
+
+    returns list of the saved files
+    """
+    index_file = Path(index_file)
+    rects, page_sizes = pack(
+        {k: im.size for k, im in images.items()}, max_size=max_size, padding=padding
+    )
+    pages = [Image.new("RGBA", s, (0, 0, 0, 0)) for s in page_sizes]
+    for label, (page, x, y, _, _) in rects.items():
+        pages[page].paste(images[label], (x, y))
+
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    rtn = []
+    page_names = []
+    for i, im in enumerate(pages):
+        name = f"{index_file.stem}_{i}.png"
+        im.save(index_file.parent.joinpath(name))
+        page_names.append(name)
+        rtn.append(str(index_file.parent.joinpath(name)))
+    with open(index_file, "w", encoding="utf-8") as fl:
+        json.dump({"pages": page_names, "rects": rects}, fl, indent=1)
+    rtn.append(str(index_file))
+    return rtn
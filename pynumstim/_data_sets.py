@@ -1,21 +1,36 @@
+import warnings
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 from ._mplist import SimpleArithmeticList
-from ._number import Num
-from ._simple import SimpleArithmetic, TProperties
+from ._problem_space import ProblemSpace
+from ._simple import TProperties
+from ._two_step_list import TwoStepArithmeticList
 from ._two_step_problem import TwoStepArithmetic
 
 FLD = "datasets"
 
 
 class Datasets:
+    """Bundled datasets and problem spaces
+
+    The bundled datasets are loaded once per process. Each call returns an
+    independent copy of the loaded list.
+    """
+
     @staticmethod
     def read_dataset(flname: Union[Path, str]) -> SimpleArithmeticList:
-        rtn = SimpleArithmeticList()
-        p = Path(__file__).parent.absolute()
-        rtn.import_toml(p.joinpath(FLD, flname))
-        return rtn
+        """reads a bundled dataset or a toml file
+
+        Only bundled datasets are cached, other files are read at each call.
+        """
+        folder = Path(__file__).parent.absolute().joinpath(FLD)
+        path = folder.joinpath(flname)
+        if path.parent == folder:
+            return _read_bundled(path.name).copy()
+        else:
+            return _read_toml(path)
 
     @classmethod
     def Ahren_Jackson_79(cls) -> SimpleArithmeticList:
@@ -27,6 +42,26 @@ class Datasets:
 
     @classmethod
     def Lyons_Bielock_12(cls) -> Dict[str, List[TwoStepArithmetic]]:
+        """all possible 'Hard' problems as used by Lyons & Beilock (2012),
+        separated by category ("correct", "too_small_result",
+        "too_large_result")
+
+        Deprecated: use `Lyons_Bielock_12_list`
+        """
+        warnings.warn(
+            "Datasets.Lyons_Bielock_12 is deprecated, use "
+            + "Datasets.Lyons_Bielock_12_list",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        lst = cls.Lyons_Bielock_12_list()
+        return {
+            category: lst.find(properties={"category": category}).list
+            for category in ("correct", "too_small_result", "too_large_result")
+        }
+
+    @classmethod
+    def Lyons_Bielock_12_list(cls) -> TwoStepArithmeticList:
         """all possible 'Hard' problems as used by Lyons & Beilock (2012). Mathematics
         Anxiety: Separating the Math from the Anxiety. Cereb. Cortex 22, 2102–2110.
 
@@ -38,10 +73,16 @@ class Datasets:
         subtracting 5 from 32). Half of the trials were valid (correct = ‘Yes’)
         and half were invalid (correct = ‘No’).
 
+        The property `category` of the problems is "correct",
+        "too_small_result" or "too_large_result".
         """
-        from .datasets import Lyons_Bielock
+        return _lyons_bielock().copy()
 
-        return Lyons_Bielock.all_problems()
+    @staticmethod
+    def clear_cache():
+        """removes the loaded datasets from memory"""
+        _read_bundled.cache_clear()
+        _lyons_bielock.cache_clear()
 
     @staticmethod
     def problem_space(
@@ -54,33 +95,52 @@ class Datasets:
         negative_results=True,
         carry_problems=True,
         properties: Optional[TProperties] = None,
+        n_jobs: Optional[int] = 1,
     ) -> SimpleArithmeticList:
-        """creates a MathProblemList comprising the defined problem space"""
-        if incorrect_deviations is None:
-            inc_dev = set()
-        else:
-            inc_dev = set(incorrect_deviations)
-        inc_dev.add(0)  # correct result
-
-        rtn = SimpleArithmeticList()
-        for op1 in operand1:
-            for op2 in operand2:
-                if tie_problem or op1 != op2:
-                    for dev in inc_dev:
-                        p = SimpleArithmetic(op1, operation, op2)
-                        correct = p.calc()
-                        result = correct + dev
-                        if not decade_results and (
-                            result % 10 == 0 or correct % 10 == 0
-                        ):
-                            continue
-                        if not negative_results and (result < 0 or correct < 0):
-                            continue
-                        n_carry = p.n_carry()
-                        if not carry_problems and (n_carry is None or n_carry > 0):
-                            continue
-                        p.result = Num(p.calc() + dev)
-                        if isinstance(properties, Dict):
-                            p.update_properties(properties)
-                        rtn.append(p)
-        return rtn
+        """creates a MathProblemList comprising the defined problem space
+
+        n_jobs: number of worker processes, which generate parts of the
+            problem space in parallel (see `ProblemSpace.columns`)
+
+        see `ProblemSpace` for more flexible definitions of problem spaces
+        """
+        space = ProblemSpace(
+            operand1, operation, operand2, deviations=incorrect_deviations
+        )
+        if not tie_problem:
+            space.where(tie=False)
+        if not decade_results:
+            space.where(decade_result=False)
+        if not negative_results:
+            space.where(negative_result=False)
+        if not carry_problems:
+            space.where(carry=False)
+        return space.simple_arithmetic(properties=properties, n_jobs=n_jobs)
+
+
+def _read_toml(path: Path) -> SimpleArithmeticList:
+    rtn = SimpleArithmeticList()
+    rtn.import_toml(path)
+    return rtn
+
+
+@lru_cache(maxsize=None)
+def _read_bundled(name: str) -> SimpleArithmeticList:
+    return _read_toml(Path(__file__).parent.absolute().joinpath(FLD, name))
+
+
+@lru_cache(maxsize=None)
+def _lyons_bielock() -> TwoStepArithmeticList:
+    from .datasets import Lyons_Bielock
+
+    problems = Lyons_Bielock.problem_space().two_step_arithmetic()
+    rtn = TwoStepArithmeticList()
+    for category, dev in (
+        ("correct", 0),
+        ("too_small_result", -2),
+        ("too_large_result", 2),
+    ):
+        lst = problems.find(deviation=dev)
+        lst.update_properties({"category": category})
+        rtn.append(lst)
+    return rtn
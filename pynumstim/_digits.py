@@ -0,0 +1,153 @@
+"""vectorized digit analysis of arithmetic problems with integer operands
+
+Digit arrays have one row per problem and one column per decimal place
+(least significant digit first, i.e. column 0 are the ones).
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+TInt = NDArray[np.int64]
+TBool = NDArray[np.bool_]
+
+
+def n_digits(values: ArrayLike) -> TInt:
+    """number of digits of the absolute values (zero has one digit)"""
+    x = np.abs(np.asarray(values, dtype=np.int64))
+    rtn = np.ones(len(x), dtype=np.int64)
+    x = x // 10
+    while np.any(x > 0):
+        rtn += x > 0
+        x //= 10
+    return rtn
+
+
+def digits(values: ArrayLike, n: int | None = None) -> TInt:
+    """digits of the absolute values (n columns, default: maximum number of
+    digits)"""
+    x = np.abs(np.asarray(values, dtype=np.int64))
+    if n is None:
+        n = int(n_digits(x).max()) if len(x) > 0 else 0
+    rtn = np.empty((len(x), n), dtype=np.int64)
+    for i in range(n):
+        x, rtn[:, i] = np.divmod(x, 10)
+    return rtn
+
+
+def carry_positions(
+    operand1: ArrayLike, operation: ArrayLike, operand2: ArrayLike
+) -> Tuple[TBool, TBool]:
+    """decimal places that cause a carry (additions) or borrow (subtractions)
+
+    Problems with negative operands are analysed with the operation on the
+    absolute values that is required to solve the problem, e.g. `-23 + 8` and
+    `23 - 8` are subtractions of 8 from 23 (larger minus smaller absolute
+    value). Subtractions of non-negative operands are always analysed
+    digit by digit as `operand1 - operand2`.
+
+    returns a boolean array (n_problems, n_places) and a boolean array of
+    the valid problems (additions and subtractions of integers)
+    """
+    a, b, valid = _integers(operand1, operand2)
+    operation = np.broadcast_to(np.asarray(operation), a.shape)
+    valid &= (operation == "+") | (operation == "-")
+    neg1, neg2 = a < 0, b < 0
+    subtraction = (operation == "-") == (neg1 == neg2)
+    a, b = np.abs(a), np.abs(b)
+    swap = subtraction & (neg1 | neg2) & (b > a)  # larger minus smaller
+    a, b = np.where(swap, b, a), np.where(swap, a, b)
+    a[~valid] = 0
+    b[~valid] = 0
+
+    length = np.maximum(n_digits(a), n_digits(b))
+    n = int(length.max()) if len(a) > 0 else 0
+    da, db = digits(a, n), digits(b, n)
+    rtn = np.zeros((len(a), n), dtype=bool)
+    carry = np.zeros(len(a), dtype=np.int64)
+    for i in range(n):
+        x = np.where(
+            subtraction, da[:, i] - db[:, i] - carry, da[:, i] + db[:, i] + carry
+        )
+        rtn[:, i] = np.where(subtraction, x < 0, x >= 10) & (i < length)
+        carry = rtn[:, i].astype(np.int64)
+    return rtn & valid[:, np.newaxis], valid
+
+
+def n_carry(operand1: ArrayLike, operation: ArrayLike, operand2: ArrayLike) -> TInt:
+    """number of carry operations of additions and borrow operations of
+    subtractions (see `carry_positions` and `SimpleArithmetic.n_carry`).
+
+    Returns -1 for other operations and for problems with non-integer
+    operands.
+    """
+    pos, valid = carry_positions(operand1, operation, operand2)
+    rtn = pos.sum(axis=1)
+    rtn[~valid] = -1
+    return rtn
+
+
+def n_borrow(operand1: ArrayLike, operand2: ArrayLike) -> TInt:
+    """number of borrow operations of the subtractions `operand1 - operand2`"""
+    return n_carry(operand1, "-", operand2)
+
+
+def multiplication_carry_positions(
+    operand1: ArrayLike, operand2: ArrayLike
+) -> Tuple[TBool, TBool]:
+    """decimal places of the carries in the partial products of the
+    multiplications `operand1 * operand2` (long multiplication)
+
+    Each digit of operand2 is multiplied with operand1. A carry occurs, if
+    the product of a digit of operand1 (plus the previous carry) is at
+    least 10 and operand1 has a further digit. Carries of the addition of
+    the partial products are not considered. Signs are ignored.
+
+    returns a boolean array (n_problems, n_places_operand2,
+    n_places_operand1) and a boolean array of the valid problems
+    (integer operands)
+    """
+    a, b, valid = _integers(operand1, operand2)
+    a[~valid] = 0
+    b[~valid] = 0
+    la = n_digits(a)
+    da, db = digits(a), digits(b)
+    rtn = np.zeros((len(a), db.shape[1], da.shape[1]), dtype=bool)
+    for j in range(db.shape[1]):
+        carry = np.zeros(len(a), dtype=np.int64)
+        for i in range(da.shape[1]):
+            x = da[:, i] * db[:, j] + carry
+            rtn[:, j, i] = (x >= 10) & (i + 1 < la)
+            carry = x // 10
+    return rtn & valid[:, np.newaxis, np.newaxis], valid
+
+
+def n_multiplication_carry(operand1: ArrayLike, operand2: ArrayLike) -> TInt:
+    """number of carries in the partial products of multiplications (see
+    `multiplication_carry_positions`). Returns -1 for non-integer operands.
+    """
+    pos, valid = multiplication_carry_positions(operand1, operand2)
+    rtn = pos.sum(axis=(1, 2))
+    rtn[~valid] = -1
+    return rtn
+
+
+def _integers(operand1: ArrayLike, operand2: ArrayLike) -> Tuple[TInt, TInt, TBool]:
+    """int64 arrays of the operands and a boolean array of the problems with
+    integer operands (non-integers are set to zero)"""
+    a, valid1 = _integer(operand1)
+    b, valid2 = _integer(operand2)
+    a, b, valid1, valid2 = np.broadcast_arrays(a, b, valid1, valid2)
+    return a.copy(), b.copy(), valid1 & valid2
+
+
+def _integer(values: ArrayLike) -> Tuple[TInt, TBool]:
+    x = np.atleast_1d(np.asarray(values))
+    if np.issubdtype(x.dtype, np.integer):
+        return x.astype(np.int64), np.ones(x.shape, dtype=bool)
+    x = x.astype(np.float64)
+    valid = np.isfinite(x) & (x % 1 == 0)
+    return np.where(valid, x, 0).astype(np.int64), valid
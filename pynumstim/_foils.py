@@ -0,0 +1,150 @@
+"""vectorized generation of incorrect results (foils) of arithmetic problems
+
+Each strategy defines candidate results for all problems (array
+(n_problems, n_candidates), nan marks missing candidates). A foil is
+selected for each problem from the candidates of the assigned strategy.
+
+Strategies:
+    table: the four nearest products of the multiplication table (2-9) that
+        do not share an operand with the problem, e.g. 3 * 8 = 21
+        (multiplication table problems only)
+    operand: products that share an operand with the problem, i.e. results
+        that deviate by one or two times an operand, e.g. 3 * 8 = 32
+        (multiplications only, zero and products with the other sign are
+        excluded)
+    split10: results that deviate by +/-10
+    parity: results that deviate by +/-2 or +/-4 and thus preserve the
+        parity of the correct result
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+TFloat = NDArray[np.float64]
+
+STRATEGIES = ("table", "operand", "split10", "parity")
+
+_TABLE_OPERANDS = np.arange(2, 10)
+_TABLE_PRODUCTS = np.unique(np.outer(_TABLE_OPERANDS, _TABLE_OPERANDS)).astype(
+    np.float64
+)
+
+
+def correct_results(op1: TFloat, operation: NDArray[np.str_], op2: TFloat) -> TFloat:
+    """correct results of the problems (nan for undefined results)"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.select(
+            [operation == "+", operation == "-", operation == "*", operation == "/"],
+            [op1 + op2, op1 - op2, op1 * op2, op1 / op2],
+            default=np.nan,
+        )
+
+
+def candidates(
+    strategy: str, op1: TFloat, operation: NDArray[np.str_], op2: TFloat
+) -> TFloat:
+    """candidate foils of a strategy (n_problems, n_candidates). Candidates
+    might be identical with the correct result (see `select`)."""
+    correct = correct_results(op1, operation, op2)
+    integer = np.isfinite(correct) & (correct % 1 == 0)
+    multi = integer & (operation == "*")
+    if strategy == "table":
+        valid = multi & np.isin(op1, _TABLE_OPERANDS) & np.isin(op2, _TABLE_OPERANDS)
+        rtn = np.full((len(op1), 4), np.nan)
+        shared = np.zeros((np.sum(valid), len(_TABLE_PRODUCTS)), dtype=bool)
+        for op in (op1[valid], op2[valid]):
+            factor = _TABLE_PRODUCTS / op[:, np.newaxis]
+            shared |= (factor % 1 == 0) & (factor >= 2) & (factor <= 9)
+        prod = np.where(shared, np.nan, _TABLE_PRODUCTS)
+        dist = np.abs(np.nan_to_num(prod - correct[valid, np.newaxis], nan=np.inf))
+        rtn[valid] = np.take_along_axis(prod, np.argsort(dist, axis=1)[:, :4], axis=1)
+    elif strategy == "operand":
+        steps = np.array([-2, -1, 1, 2])
+        rtn = np.hstack(
+            (
+                correct[:, np.newaxis] + np.outer(op1, steps),
+                correct[:, np.newaxis] + np.outer(op2, steps),
+            )
+        )
+        valid = multi
+        # zero or the other sign are implausible, e.g. 2 * 2 = 0
+        rtn[np.where(correct[:, np.newaxis] < 0, rtn >= 0, rtn <= 0)] = np.nan
+    elif strategy == "split10":
+        rtn = correct[:, np.newaxis] + np.array([-10, 10])
+        valid = integer
+    elif strategy == "parity":
+        rtn = correct[:, np.newaxis] + np.array([-4, -2, 2, 4])
+        valid = integer
+    else:
+        raise ValueError(f"Unknown foil strategy: '{strategy}'")
+    rtn[~valid] = np.nan
+    return rtn
+
+
+def select(
+    correct: TFloat,
+    foils: Sequence[TFloat],
+    balance_sign: bool = True,
+    balance_size: bool = False,
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[TFloat, NDArray[np.int64]]:
+    """selects one foil per problem from the candidates of several strategies
+
+    The strategies are assigned to the problems in equal shares (random
+    order). If the assigned strategy has no valid candidate, the candidates
+    of the other strategies are used. Candidates that are identical with the
+    correct result or outside the range (min_result, max_result) are
+    invalid.
+
+    balance_sign: if True, half of the foils are smaller and half are
+        larger than the correct result (as far as possible)
+    balance_size: if True, half of the foils are the candidates with the
+        smallest and half with the largest deviation (as far as possible),
+        otherwise a random candidate is selected.
+
+    returns foils and the index of the strategy for each problem (nan and -1
+    for problems without valid candidates)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    n = len(correct)
+    cand = np.hstack(foils)
+    strategy = np.repeat(np.arange(len(foils)), [f.shape[1] for f in foils])
+    dev = cand - correct[:, np.newaxis]
+    invalid = np.isnan(cand) | (dev == 0)
+    if min_result is not None:
+        invalid |= cand < min_result
+    if max_result is not None:
+        invalid |= cand > max_result
+
+    def balanced(k: int) -> NDArray[np.int64]:
+        # equal shares of the k levels in random order
+        return rng.permutation(np.arange(n) % k)
+
+    # lexicographic preference: strategy, sign, size
+    score = np.where(strategy == balanced(len(foils))[:, np.newaxis], 0.0, 4.0)
+    if balance_sign:
+        larger = balanced(2)[:, np.newaxis] == 1
+        score += np.where((dev > 0) == larger, 0.0, 2.0)
+    if balance_size:
+        size = np.abs(np.where(invalid, 0, dev))
+        size /= size.max(axis=1, keepdims=True) + 1
+        score += np.where(balanced(2)[:, np.newaxis] == 1, 1 - size, size)
+        score += rng.random(score.shape) * 1e-6  # random ties
+    else:
+        score += rng.random(score.shape)
+    score[invalid] = np.inf
+
+    idx = np.argmin(score, axis=1)
+    rows = np.arange(n)
+    ok = np.isfinite(score[rows, idx])
+    return (
+        np.where(ok, cand[rows, idx], np.nan),
+        np.where(ok, strategy[idx], -1),
+    )
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import os
+from hashlib import md5
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from PIL import Image
+
+from ._renderer import Renderer
+
+TEntry = Dict[str, Any]
+
+
+class BuildManifest(object):
+    """Manifest of the stimuli in an output folder for incremental builds
+
+    The manifest stores for each file the label, a hash of the tex code and
+    all render parameters. A stimulus has to be rendered again, if its
+    entry changed or the file does not exist.
+    """
+
+    FILENAME = "pynumstim_manifest.json"
+
+    def __init__(self, folder: Union[Path, str]) -> None:
+        self.folder = Path(folder)
+        self.previous: Dict[str, TEntry] = {}
+        self.current: Dict[str, TEntry] = {}
+        path = self.folder.joinpath(self.FILENAME)
+        if path.is_file():
+            with open(path, "r", encoding="utf-8") as fl:
+                self.previous = json.load(fl)
+
+    @staticmethod
+    def entry(
+        label: str,
+        tex_code: str,
+        resolution: int,
+        fg: str,
+        bg: str,
+        background_hash: Optional[str] = None,
+        renderer: Optional[Renderer] = None,
+    ) -> TEntry:
+        rtn = {
+            "label": label,
+            "tex_hash": md5(tex_code.encode()).hexdigest(),
+            "resolution": resolution,
+            "fg": fg,
+            "bg": bg,
+            "background_hash": background_hash,
+        }
+        if renderer is not None:  # LaTeX entries have no renderer
+            rtn["renderer"] = repr(renderer)
+        return rtn
+
+    def is_current(self, filename: Union[Path, str], entry: TEntry) -> bool:
+        """adds the entry and returns True, if the file exists and was rendered
+        with identical parameters"""
+        name = os.path.basename(filename)
+        self.current[name] = entry
+        return self.previous.get(name) == entry and os.path.isfile(filename)
+
+    def save(self, prune: bool = False) -> List[str]:
+        """saves the manifest
+
+        prune: if True, files of the previous build that are not part of
+            the current build will be removed
+
+        returns list of removed files
+        """
+        removed = []
+        if prune:
+            manifest = dict(self.current)
+            for name in set(self.previous.keys()) - set(self.current.keys()):
+                path = self.folder.joinpath(name)
+                if path.is_file():
+                    path.unlink()
+                    removed.append(str(path))
+        else:
+            manifest = dict(self.previous)
+            manifest.update(self.current)
+
+        with open(self.folder.joinpath(self.FILENAME), "w", encoding="utf-8") as fl:
+            json.dump(manifest, fl, indent=1, sort_keys=True)
+        self.previous = manifest
+        self.current = {}
+        return removed
+
+
+def image_hash(image: Optional[Image.Image]) -> Optional[str]:
+    if image is None:
+        return None
+    md5_object = md5(f"{image.mode}{image.size}".encode())
+    md5_object.update(image.tobytes())
+    return md5_object.hexdigest()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ._renderer import TColor, _color
+
+TColorSpec = Union[str, Tuple[int, int, int], Tuple[int, int, int, int]]
+
+
+def colorize(
+    mask: NDArray[np.uint8], fg: TColorSpec = "White", bg: TColorSpec = "Transparent"
+) -> NDArray[np.uint8]:
+    """RGBA image of a coverage mask (see `writer.tex_to_mask`) with
+    foreground and background color
+
+    fg, bg: color names (e.g. "White", "Transparent", "rgb 1 0 0") or RGB(A)
+        tuples
+
+    returns array (height, width, 4)
+    """
+    mask = np.asarray(mask, dtype=np.uint8)
+    # lookup of one uint32 per pixel instead of four uint8
+    table = _color_table(_rgba(fg), _rgba(bg)).view(np.uint32).ravel()
+    return np.take(table, mask).view(np.uint8).reshape(mask.shape + (4,))
+
+
+@lru_cache(maxsize=64)
+def _color_table(fg: TColor, bg: TColor) -> NDArray[np.uint8]:
+    """RGBA of all 256 coverage values ("over" compositing of fg on bg)"""
+    fg_rgba = np.asarray(fg, dtype=np.float64) / 255
+    bg_rgba = np.asarray(bg, dtype=np.float64) / 255
+    cov = np.arange(256, dtype=np.float64)[:, np.newaxis] / 255 * fg_rgba[3]
+    bg_weight = bg_rgba[3] * (1 - cov)
+    alpha = cov + bg_weight
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rgb = (fg_rgba[:3] * cov + bg_rgba[:3] * bg_weight) / alpha
+    rgb = np.where(alpha > 0, rgb, fg_rgba[:3])  # fully transparent pixels
+    rtn = np.ascontiguousarray(np.rint(np.hstack((rgb, alpha)) * 255), dtype=np.uint8)
+    rtn.flags.writeable = False
+    return rtn
+
+
+def _rgba(color: TColorSpec) -> TColor:
+    if isinstance(color, str):
+        return _color(color)
+    elif len(color) == 3:
+        return (color[0], color[1], color[2], 255)
+    else:
+        return (color[0], color[1], color[2], color[3])  # type: ignore
@@ -0,0 +1,275 @@
+"""one-to-one matching of feature vectors (nearest neighbours)"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+TFloat = NDArray[np.float64]
+TInt = NDArray[np.int64]
+
+
+class KDTree(object):
+    """k-d tree of points for nearest neighbour queries
+
+    data: array (n_points, n_dimensions)
+    leaf_size: maximum number of points in the leaves, which are searched
+        by brute force
+    """
+
+    def __init__(self, data: ArrayLike, leaf_size: int = 64) -> None:
+        self.data = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        if leaf_size < 1:
+            raise ValueError("leaf_size has to be at least 1")
+        self.leaf_size = leaf_size
+        self.index = np.arange(len(self.data))
+        # nodes: start, end, split dimension (-1: leaf), split value, left, right
+        self._nodes: List[Tuple[int, int, int, float, int, int]] = []
+        if len(self.data) > 0:
+            self._build(0, len(self.data))
+        self._points = self.data[self.index]  # sorted by leaves
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._nodes)
+        self._nodes.append((start, end, -1, 0.0, -1, -1))
+        if end - start <= self.leaf_size:
+            return node
+        idx = self.index[start:end]
+        pts = self.data[idx]
+        dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        if pts[:, dim].max() == pts[:, dim].min():
+            return node  # identical points
+        mid = (end - start) // 2
+        order = np.argpartition(pts[:, dim], mid)
+        self.index[start:end] = idx[order]
+        split = float(self.data[self.index[start + mid], dim])
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self._nodes[node] = (start, end, dim, split, left, right)
+        return node
+
+    def query(self, points: ArrayLike, k: int = 1) -> Tuple[TFloat, TInt]:
+        """k nearest neighbours (euclidean distance) of each point
+
+        returns distances and indices (n_points, k), sorted by distance.
+        If the tree has less than k points, missing neighbours are inf and -1.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        dist = np.full((len(points), k), np.inf)  # squared distances, sorted
+        rtn = np.full((len(points), k), -1, dtype=np.int64)
+        if len(self._nodes) > 0 and k > 0:
+            # initial neighbours from the leaf of each point, then all points
+            # traverse the tree together and each node is visited once with
+            # the points that can have closer neighbours in it
+            leaf = self._leaves(points)
+            for node in np.unique(leaf).tolist():
+                self._search_leaf(node, points, np.flatnonzero(leaf == node), dist, rtn)
+            self._query(0, points, np.arange(len(points)), np.zeros(len(points)),
+                        leaf, dist, rtn)
+        found = rtn >= 0
+        rtn[found] = self.index[rtn[found]]
+        return np.sqrt(dist), rtn
+
+    def _leaves(self, points: TFloat) -> TInt:
+        """leaf node of each point"""
+        nodes = np.array([x[2:] for x in self._nodes], dtype=np.float64)
+        dim, split = nodes[:, 0].astype(np.int64), nodes[:, 1]
+        left, right = nodes[:, 2].astype(np.int64), nodes[:, 3].astype(np.int64)
+        rtn = np.zeros(len(points), dtype=np.int64)
+        inner = np.flatnonzero(dim[rtn] >= 0)
+        while len(inner) > 0:
+            node = rtn[inner]
+            lower = points[inner, dim[node]] < split[node]
+            rtn[inner] = np.where(lower, left[node], right[node])
+            inner = inner[dim[rtn[inner]] >= 0]
+        return rtn
+
+    def _search_leaf(
+        self, node: int, points: TFloat, qidx: TInt, dist: TFloat, rtn: TInt
+    ) -> None:
+        """merges the points of the leaf with the current neighbours"""
+        start, end = self._nodes[node][:2]
+        d = (
+            (points[qidx, np.newaxis, :] - self._points[np.newaxis, start:end, :]) ** 2
+        ).sum(axis=2)
+        cand_d = np.hstack((dist[qidx], d))
+        cand_i = np.hstack((rtn[qidx], np.broadcast_to(np.arange(start, end), d.shape)))
+        order = np.argsort(cand_d, axis=1, kind="stable")[:, : dist.shape[1]]
+        dist[qidx] = np.take_along_axis(cand_d, order, axis=1)
+        rtn[qidx] = np.take_along_axis(cand_i, order, axis=1)
+
+    def _query(
+        self,
+        node: int,
+        points: TFloat,
+        qidx: TInt,
+        bound: TFloat,
+        own_leaf: TInt,
+        dist: TFloat,
+        rtn: TInt,
+    ) -> None:
+        keep = bound < dist[qidx, -1]
+        qidx, bound = qidx[keep], bound[keep]
+        if len(qidx) == 0:
+            return
+        start, end, dim, split, left, right = self._nodes[node]
+        if dim < 0:
+            qidx = qidx[own_leaf[qidx] != node]  # already searched
+            if len(qidx) > 0:
+                self._search_leaf(node, points, qidx, dist, rtn)
+            return
+        diff = points[qidx, dim] - split
+        far_bound = np.maximum(bound, diff * diff)
+        lower = diff < 0
+        self._query(left, points, qidx, np.where(lower, bound, far_bound), own_leaf,
+                    dist, rtn)
+        self._query(right, points, qidx, np.where(lower, far_bound, bound), own_leaf,
+                    dist, rtn)
+
+
+def greedy_matching(
+    targets: TFloat, candidates: TFloat, k: int = 8, exclude: Optional[TInt] = None
+) -> Tuple[TInt, TFloat]:
+    """greedy one-to-one matching: pairs are assigned in the order of their
+    distances, each candidate is used only once
+
+    The k nearest candidates of each target are determined with a k-d tree.
+    If all of them are already assigned, the search is repeated with the
+    remaining candidates.
+
+    exclude: pairs of target and candidate indices (n_pairs, 2), which must
+        not be matched
+
+    returns index of the matched candidate (-1, if not matched) and the
+    distance for each target
+    """
+    excluded = set() if exclude is None else set(map(tuple, np.asarray(exclude).tolist()))
+    match = np.full(len(targets), -1, dtype=np.int64)
+    distance = np.full(len(targets), np.inf)
+    available = np.ones(len(candidates), dtype=bool)
+    todo = np.arange(len(targets))
+    while len(todo) > 0 and np.any(available):
+        cand_idx = np.flatnonzero(available)
+        kk = min(k, len(cand_idx))
+        d, i = KDTree(candidates[cand_idx]).query(targets[todo], kk)
+        order = np.argsort(d, axis=None, kind="stable")
+        rows, cols = np.unravel_index(order, d.shape)
+        for t, c, dist in zip(
+            todo[rows].tolist(), cand_idx[i[rows, cols]].tolist(), d[rows, cols].tolist()
+        ):
+            if match[t] < 0 and available[c] and (t, c) not in excluded:
+                match[t] = c
+                distance[t] = dist
+                available[c] = False
+        n_todo = len(todo)
+        todo = todo[match[todo] < 0]
+        if kk == len(cand_idx) and len(todo) == n_todo:
+            break  # only excluded candidates are left
+        k *= 2
+    return match, distance
+
+
+def optimal_matching(
+    targets: TFloat, candidates: TFloat, exclude: Optional[TInt] = None
+) -> Tuple[TInt, TFloat]:
+    """one-to-one matching with minimal sum of distances (assignment
+    problem, Hungarian algorithm). If there are less candidates than
+    targets, only a subset of targets is matched.
+
+    The assignment is solved for the union of the n_targets nearest
+    candidates of each target, which contains an optimal solution: if a
+    target were matched with another candidate, one of its n_targets nearest
+    candidates would be free and the sum of distances could be reduced.
+
+    exclude: pairs of target and candidate indices (n_pairs, 2), which must
+        not be matched. The pool is extended by the maximum number of
+        excluded candidates per target.
+
+    returns index of the matched candidate (-1, if not matched) and the
+    distance for each target
+    """
+    match = np.full(len(targets), -1, dtype=np.int64)
+    distance = np.full(len(targets), np.inf)
+    if len(targets) == 0 or len(candidates) == 0:
+        return match, distance
+    if exclude is None:
+        exclude = np.empty((0, 2), dtype=np.int64)
+    else:
+        exclude = np.asarray(exclude, dtype=np.int64).reshape(-1, 2)
+    if len(targets) > len(candidates):
+        tar, dist = optimal_matching(candidates, targets, exclude[:, ::-1])
+        ok = tar >= 0
+        match[tar[ok]] = np.flatnonzero(ok)
+        distance[tar[ok]] = dist[ok]
+        return match, distance
+
+    k = len(targets)
+    if len(exclude) > 0:
+        k += int(np.bincount(exclude[:, 0]).max())
+    if k < len(candidates):
+        pool = np.unique(KDTree(candidates).query(targets, k)[1])
+    else:
+        pool = np.arange(len(candidates))
+    cost = np.sqrt(
+        ((targets[:, np.newaxis, :] - candidates[np.newaxis, pool, :]) ** 2).sum(axis=2)
+    )
+    forbidden = np.zeros(cost.shape, dtype=bool)
+    if len(exclude) > 0:
+        column = np.full(len(candidates), -1, dtype=np.int64)
+        column[pool] = np.arange(len(pool))
+        ok = column[exclude[:, 1]] >= 0
+        forbidden[exclude[ok, 0], column[exclude[ok, 1]]] = True
+        # higher than the costs of any assignment without excluded pairs
+        cost[forbidden] = cost.max() * len(targets) + 1
+    cols = linear_sum_assignment(cost)
+    rows = np.arange(len(targets))
+    match[:] = pool[cols]
+    distance[:] = cost[rows, cols]
+    bad = forbidden[rows, cols]
+    match[bad] = -1
+    distance[bad] = np.inf
+    return match, distance
+
+
+def linear_sum_assignment(cost: TFloat) -> TInt:
+    """column of each row that minimizes the total cost (n_rows <= n_cols),
+    shortest augmenting path variant of the Hungarian algorithm"""
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("Number of rows must not exceed number of columns")
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)  # row (1-based) assigned to column
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:  # augmenting path
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    rtn = np.zeros(n, dtype=np.int64)
+    assigned = np.flatnonzero(p[1:] > 0)
+    rtn[p[assigned + 1] - 1] = assigned
+    return rtn
@@ -11,7 +11,14 @@ class MathProblem(metaclass=ABCMeta):
     def label(self) -> str:
         pass
 
+    def key(self) -> str:
+        """fast key to identify identical problems, i.e. the label. Unlike
+        `hash()`, the key is not a fixed-length digest.
+        """
+        return self.label()
+
     def hash(self) -> str:
+        """stable id of the problem (md5 hash of the label)"""
         md5_object = md5(self.label().encode())
         return md5_object.hexdigest()
 
@@ -1,24 +1,61 @@
 from __future__ import annotations
 
+import io
+import keyword
 import re
-from copy import deepcopy
+import tokenize
+from copy import copy
 from fractions import Fraction
+from itertools import chain
+from operator import is_
 from pathlib import Path
-from random import randint, shuffle
-from typing import List, Optional, Set, Tuple, Union
+from random import Random, randint, sample, shuffle
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
 
 import numpy as np
+from numpy.typing import NDArray
 import pandas as pd
-import toml
 
+from . import _digits, _foils, _matching, _pickling, _sequence, _stats, _vector
 from ._number import Num, TNum
-from ._simple import SimpleArithmetic, TProperties
+from ._properties import PropertyStore
+from ._properties import _key as _property_key
+from ._simple import SimpleArithmetic, TProperties, _from_int_columns
 
 
 class SimpleArithmeticList(object):
+    """List of SimpleArithmetic problems
+
+    Subsets (e.g. `find`, `query`, `get_random`) are lightweight views that
+    share the problem objects with the original list. Problems are copied
+    (copy-on-write), before they are changed by a method of a list that
+    shares its problems, e.g. `set_results` or `update_properties`.
+    Changing shared problems directly (`lst.list[0].result = ...`) affects
+    all lists, use `copy` to get independent problems.
+
+    For filtering, grouping and data frames, the properties of the problems
+    are converted to categorical columns (integer codes, see
+    `PropertyStore`). The columns are kept with the list and updated by
+    `update_properties`. They are recreated, if the problems of the list or
+    the properties of any problem have been replaced. Property dicts that
+    are changed in place (`lst.list[0].properties["block"] = 2`) are not
+    detected, use `update_properties` or assign a new dict.
+    """
+
     def __init__(self):
         self._list: List[SimpleArithmetic] = []
         self.number_types: Set[type] = set()  # involved number types
+        self._shared = False  # problems might be referenced by other lists
+        # cache, see _property_store
+        self._store: Optional[Tuple[int, List[SimpleArithmetic], PropertyStore]] = None
+
+    def __reduce__(self):
+        # compact pickling, e.g. for multiprocessing: columns of numbers and
+        # categorical properties instead of an object per problem and number
+        return (
+            _restore_list,
+            (_pickling.pack(self._list), self._property_store(), self.number_types),
+        )
 
     def __str__(self):
         rtn = ""
@@ -33,9 +70,8 @@ class SimpleArithmeticList(object):
     @list.setter
     def list(self, val: List[SimpleArithmetic]):
         self._list = val
-        self.number_types: Set[type] = set()
-        for x in self._list:
-            self.number_types = self.number_types | x.number_types()
+        self._shared = True
+        self.number_types: Set[type] = set().union(*(x.number_types() for x in val))
 
     def append(
         self, problem: SimpleArithmetic | SimpleArithmeticList | List[SimpleArithmetic]
@@ -45,22 +81,30 @@ class SimpleArithmeticList(object):
             self.number_types = self.number_types | problem.number_types()
         elif isinstance(problem, SimpleArithmeticList):
             self.append(problem.list)
+            self._shared = True
+            problem._shared = True
         elif isinstance(problem, List):
             for x in problem:
                 self.append(x)
 
     def get_random(
-        self, n: int = 1, dev_corr: Optional[int | float] = None
+        self,
+        n: int = 1,
+        dev_corr: Optional[int | float] = None,
+        rng: Optional[Random] = None,
     ) -> SimpleArithmeticList:
-        """Get x random problems
+        """Get x random problems (view, see `SimpleArithmeticList`)
 
         Optionally set results via `dev_cor`, which defined the deviation from
         correct (see `set_results`)
+
+        rng: random generator, if None, the global generator of the module
+            `random` is used
         """
-        lst = deepcopy(self._list)
-        shuffle(lst)
-        rtn = SimpleArithmeticList()
-        rtn.list = lst[0:n]
+        idx = (sample if rng is None else rng.sample)(
+            range(len(self._list)), min(n, len(self._list))
+        )
+        rtn = self._view([self._list[i] for i in idx], idx)
         if dev_corr is not None:
             rtn.set_results(dev_corr=dev_corr)
         return rtn
@@ -77,10 +121,10 @@ class SimpleArithmeticList(object):
         rtn = SimpleArithmeticList()
         for _ in range(n):
             index = randint(0, len(self._list) - 1)
-            p = self._list.pop(index)
-            if dev_corr is not None:
-                p.result = Num(p.calc() + dev_corr)
-            rtn.append(p)
+            rtn.append(self._list.pop(index))
+        rtn._shared = self._shared  # popped problems might be in other views
+        if dev_corr is not None:
+            rtn.set_results(dev_corr=dev_corr)
         return rtn
 
     def set_results(self, dev_corr: int | float):
@@ -92,9 +136,108 @@ class SimpleArithmeticList(object):
         Setting results does not work (yet) for fractions
         """  # TODO
 
+        self._own()
         for x in range(len(self._list)):
             self._list[x].result = Num(self._list[x].calc() + dev_corr)
 
+    def make_foils(
+        self,
+        strategies: List[str] | Tuple[str, ...] = _foils.STRATEGIES,
+        balance_sign: bool = True,
+        balance_size: bool = False,
+        min_result: Optional[int | float] = None,
+        max_result: Optional[int | float] = None,
+        property_name: Optional[str] = "foil",
+        drop_invalid: bool = False,
+        seed: Optional[int] = None,
+    ) -> SimpleArithmeticList:
+        """copies of all problems with incorrect results (foils), which are
+        created by psychologically motivated strategies in one vectorized
+        pass over the list
+
+        strategies: names of the strategies, which are used in equal shares
+            (random assignment). If a strategy is not applicable for a
+            problem (e.g. "table" for additions), another strategy is used.
+            "table": nearest products of the multiplication table that do
+                not share an operand (e.g. 3 * 8 = 21),
+            "operand": products that share an operand (e.g. 3 * 8 = 32),
+                never zero or with the other sign,
+            "split10": deviation +/-10,
+            "parity": deviation +/-2 or +/-4 (parity preserving)
+        balance_sign: if True, half of the foils are smaller and half are
+            larger than the correct result
+        balance_size: if True, half of the foils are the candidates with the
+            smallest and half with the largest deviation of a strategy,
+            otherwise the deviation is random
+        min_result and max_result: range of the foils
+        property_name: name of the property that stores the strategy of
+            each foil. If None, no property is set.
+        drop_invalid: if True, problems without foil (e.g. fractions) are
+            not included in the returned list
+
+        Foils are never identical with the correct result.
+
+        Raises RuntimeError, if no foil can be created for a problem and
+        drop_invalid is False.
+        """
+        if len(strategies) == 0:
+            raise ValueError("No foil strategies defined")
+        op1, operation, op2 = _operand_arrays(self._list)
+        cand = [_foils.candidates(s, op1, operation, op2) for s in strategies]
+        foils, strategy = _foils.select(
+            _foils.correct_results(op1, operation, op2),
+            cand,
+            balance_sign=balance_sign,
+            balance_size=balance_size,
+            min_result=min_result,
+            max_result=max_result,
+            rng=np.random.default_rng(seed),
+        )
+        if not drop_invalid and np.any(strategy < 0):
+            raise RuntimeError(
+                f"Can't create foils for {np.sum(strategy < 0)} problems, "
+                + "e.g. " + self._list[int(np.argmin(strategy))].label()
+            )
+
+        keep = np.flatnonzero(strategy >= 0)
+        values = [int(r) if r % 1 == 0 else r for r in foils[keep].tolist()]
+        if np.all(np.isfinite(op1[keep]) & (op1[keep] % 1 == 0)) and np.all(
+            np.isfinite(op2[keep]) & (op2[keep] % 1 == 0) & (foils[keep] % 1 == 0)
+        ):
+            lst = _from_int_columns(
+                op1[keep].astype(np.int64).tolist(),
+                operation[keep].tolist(),
+                op2[keep].astype(np.int64).tolist(),
+                values,
+            )
+            number_types = {int} if len(lst) > 0 else set()
+        else:
+            lst = [
+                SimpleArithmetic(
+                    self._list[i].operand1,
+                    self._list[i].operation,
+                    self._list[i].operand2,
+                    result=r,
+                )
+                for i, r in zip(keep.tolist(), values)
+            ]
+            number_types = None
+        for x, i in zip(lst, keep.tolist()):
+            prop = self._list[i].properties
+            if property_name is None:
+                x.properties = copy(prop)
+            else:
+                x.properties = {} if prop is None else dict(prop)
+                x.properties[property_name] = strategies[strategy[i]]
+
+        rtn = SimpleArithmeticList()
+        if number_types is None:
+            rtn.append(lst)
+        else:
+            rtn._list = lst
+            rtn.number_types = number_types
+        return rtn
+
     def find(
         self,
         first_operand: Optional[TNum] = None,
@@ -111,7 +254,14 @@ class SimpleArithmeticList(object):
         problem_size: Optional[float] = None,
         properties: Optional[TProperties] = None,
     ) -> SimpleArithmeticList:
-        lst = self.list
+        lst = self._list
+        if properties is not None:
+            store = self._cached_store()
+            if store is None:  # faster than creating the columns
+                lst = [x for x in lst if x.has_properites(properties)]
+            else:
+                mask = store.mask(properties)
+                lst = [x for x, m in zip(lst, mask.tolist()) if m]
         if first_operand is not None:
             lst = [x for x in lst if x.operand1 == first_operand]
         if operation is not None:
@@ -129,7 +279,8 @@ class SimpleArithmeticList(object):
         if deviation is not None:
             lst = [x for x in lst if x.deviation() == deviation]
         if n_carry is not None:
-            lst = [x for x in lst if x.n_carry() == n_carry]
+            nc = _digits.n_carry(*_operand_arrays(lst))
+            lst = [x for x, c in zip(lst, nc.tolist()) if c == n_carry and c >= 0]
         if negative_result is not None:
             lst = [
                 x
@@ -146,30 +297,607 @@ class SimpleArithmeticList(object):
         if decade_solution is not None:
             lst = [x for x in lst if x.decade_solution() == decade_solution]
 
-        if properties is not None:
-            lst = [x for x in lst if x.has_properites(properties)]
+        return self._view(lst)
 
-        rtn = SimpleArithmeticList()
-        rtn.list = lst
-        return rtn
+    def query(self, expr: Optional[str] = None, **criteria: Any) -> SimpleArithmeticList:
+        """problems that fulfill all criteria. The required attributes are
+        collected in one pass over the list and the criteria are evaluated
+        as vectorized masks.
+
+        expr: boolean expression of attributes (see `pandas.DataFrame.eval`),
+            e.g. "20 <= result <= 50 and problem_size < 8 and
+            category in ['a', 'b']"
+        criteria: attributes and conditions
+            value: equality
+            tuple (min, max): range including min and max. Use None for
+                open ranges, e.g. `problem_size=(None, 8)`.
+            set or list: set membership, e.g. `category={"a", "b"}`
+            function: gets the array of the attribute and returns a
+                boolean mask
+
+        Attributes: see `attribute_frame`
+
+        Example
+        -------
+            lst.query(result=(20, 50), operation={"+", "-"}, correct=True)
+            lst.query("problem_size < 8 and (n_carry > 0 or tie)")
+        """
+        names = list(criteria.keys())
+        if expr is not None:
+            names.extend(_expression_names(expr))
+        df = self.attribute_frame(list(dict.fromkeys(names)))
+
+        mask = np.ones(len(self._list), dtype=bool)
+        for name, condition in criteria.items():
+            mask &= _condition_mask(df[name], condition)
+        if expr is not None and len(df) > 0:
+            mask &= df.eval(expr).to_numpy(dtype=bool)
+
+        return self._view(
+            [x for x, m in zip(self._list, mask.tolist()) if m], np.flatnonzero(mask)
+        )
+
+    def attribute_frame(self, names: List[str]) -> pd.DataFrame:
+        """data frame with attributes of all problems. Numbers are floats,
+        missing values (e.g. results) are nan.
+
+        Attributes: `op1`, `op2`, `operation`, `result`, `correct_result`,
+            `deviation`, `correct`, `problem_size`, `n_carry` (-1, if not
+            defined), `negative_result`, `tie` (same operands),
+            `same_parities`, `decade_solution`, `label` and the names of
+            the properties
+        """
+        numeric = set(_NUMERIC_ATTRIBUTES)
+        props = [x for x in names if x not in numeric and x != "label"]
+        store = self._property_store() if len(props) > 0 else PropertyStore()
+        if len(props) > 0:
+            unknown = set(props) - set(store.keys())
+            if len(unknown) > 0:
+                raise ValueError(f"Unknown attribute: '{unknown.pop()}'")
+
+        rtn = pd.DataFrame(index=range(len(self._list)))
+        if len(numeric.intersection(names)) > 0:
+            # numerators and denominators of all numbers in a single pass
+            rows = [
+                (
+                    x.operand1.numerator,
+                    x.operand1.denominator,
+                    x.operand2.numerator,
+                    x.operand2.denominator,
+                    np.nan if x.result is None else x.result.numerator,
+                    1 if x.result is None else x.result.denominator,
+                    x.operation,
+                )
+                for x in self._list
+            ]
+            if len(rows) > 0:
+                n1, d1, n2, d2, nr, dr, operation = (np.array(x) for x in zip(*rows))
+            else:
+                n1, d1, n2, d2, nr, dr = (np.zeros(0) for _ in range(6))
+                operation = np.zeros(0, dtype="<U1")
+            with np.errstate(invalid="ignore", divide="ignore"):
+                op1 = n1 / d1
+                op2 = n2 / d2
+                res = nr.astype(np.float64) / dr
+                correct = _vector.calc(op1, operation, op2)
+                values = {
+                    "op1": op1,
+                    "op2": op2,
+                    "operation": operation,
+                    "result": res,
+                    "correct_result": correct,
+                    "deviation": res - correct,
+                    "negative_result": res < 0,
+                    "tie": op1 == op2,
+                    "same_parities": op1 % 2 == op2 % 2,
+                    "decade_solution": correct % 10 == 0,
+                }
+            if "correct" in names:
+                if Fraction in self.number_types:  # exact comparison
+                    values["correct"] = np.array([x.is_correct() for x in self._list])
+                else:
+                    values["correct"] = res == correct
+            if "problem_size" in names:
+                values["problem_size"] = (
+                    np.where(d1 == 1, n1, (n1 + d1) / 2)
+                    + np.where(d2 == 1, n2, (n2 + d2) / 2)
+                ) / 2.0
+            if "n_carry" in names:
+                values["n_carry"] = _digits.n_carry(
+                    np.where(d1 == 1, n1, np.nan),
+                    operation,
+                    np.where(d2 == 1, n2, np.nan),
+                )
+            for name in names:
+                if name in numeric:
+                    rtn[name] = values[name]
+
+        if "label" in names:
+            rtn["label"] = [x.label() for x in self._list]
+        for name in props:
+            rtn[name] = pd.Series(store.values(name), dtype=object)
+        return rtn[list(names)]
+
+    def summary(
+        self,
+        by: Optional[str | List[str]] = None,
+        attributes: List[str] | Tuple[str, ...] = (
+            "problem_size",
+            "op1",
+            "op2",
+            "n_carry",
+            "same_parities",
+            "result",
+        ),
+    ) -> pd.DataFrame:
+        """descriptive statistics (count, mean, std, min, max) of numerical
+        attributes (see `attribute_frame`), optionally grouped by one or more
+        attributes or properties
+
+        Problems without carry analysis (`n_carry` -1) and missing values are
+        ignored.
+
+        returns data frame with one row per group (or a single row "all") and
+        the columns (attribute, statistic)
+        """
+        by = _names(by)
+        df = self._statistics_frame(attributes, by)
+        stats = ["count", "mean", "std", "min", "max"]
+        if len(by) == 0:
+            rtn = df[list(attributes)].agg(stats).unstack().to_frame("all").T
+            return rtn
+        return df.groupby(by, sort=True, observed=True, dropna=False)[
+            list(attributes)
+        ].agg(stats)
+
+    def balance(
+        self,
+        by: str | List[str],
+        attributes: List[str] | Tuple[str, ...] = (
+            "problem_size",
+            "op1",
+            "op2",
+            "n_carry",
+            "same_parities",
+            "result",
+        ),
+    ) -> pd.DataFrame:
+        """tests, if the groups (e.g. conditions) are balanced regarding the
+        attributes (see `balance_batch`)
+
+        returns data frame with one row per attribute and the columns F,
+        p and smd
+        """
+        rtn = SimpleArithmeticList.balance_batch([self], by, attributes).iloc[0]
+        return rtn.unstack().loc[list(attributes), ["F", "p", "smd"]]
+
+    @staticmethod
+    def balance_batch(
+        lists: Sequence[SimpleArithmeticList],
+        by: str | List[str],
+        attributes: List[str] | Tuple[str, ...] = (
+            "problem_size",
+            "op1",
+            "op2",
+            "n_carry",
+            "same_parities",
+            "result",
+        ),
+    ) -> pd.DataFrame:
+        """balance tests of many lists, e.g. of candidate selections, in one
+        vectorized pass
+
+        The groups of each list are compared by a one-way analysis of
+        variance for each attribute. Problems without carry analysis
+        (`n_carry` -1) and missing values are ignored.
+
+        by: attribute(s) or property(ies) that define the groups
+        attributes: numerical attributes (see `attribute_frame`)
+
+        returns data frame with one row per list and the columns
+        (attribute, statistic), statistics are the F value, the p value and
+        the maximal standardized mean difference between two groups (smd,
+        difference divided by the pooled standard deviation). Statistics of
+        empty lists are nan.
+        """
+        by = _names(by)
+        if len(by) == 0:
+            raise ValueError("No grouping attribute defined")
+        columns = pd.MultiIndex.from_product([list(attributes), ["F", "p", "smd"]])
+        # a single attribute frame of all problems
+        pooled = SimpleArithmeticList()
+        for lst in lists:
+            pooled._list.extend(lst._list)
+        if len(pooled._list) == 0:
+            return pd.DataFrame(np.nan, index=range(len(lists)), columns=columns)
+        names = set(_NUMERIC_ATTRIBUTES) | {"label"} | set(pooled._property_store().keys())
+        for name in by:
+            if name not in names:
+                raise ValueError(
+                    f"Unknown grouping attribute: '{name}', "
+                    + "it is not a property of the problems"
+                )
+        df = pooled._statistics_frame(attributes, by)
+        groups = (
+            df.groupby(by, sort=False, observed=True, dropna=False)
+            .ngroup()
+            .to_numpy(dtype=np.int64)
+        )
+        n_groups = int(groups.max()) + 1 if len(groups) > 0 else 1
+        list_idx = np.repeat(np.arange(len(lists)), [len(x._list) for x in lists])
+        count, mean, var = _stats.grouped_moments(
+            df[list(attributes)].to_numpy(dtype=np.float64),
+            list_idx * n_groups + groups,
+            len(lists) * n_groups,
+        )
+        shape = (len(lists), n_groups, len(attributes))
+        f, p, smd = _stats.anova(
+            count.reshape(shape), mean.reshape(shape), var.reshape(shape)
+        )
+        return pd.DataFrame(
+            np.stack((f, p, smd), axis=-1).reshape(len(lists), -1), columns=columns
+        )
+
+    def _statistics_frame(
+        self, attributes: List[str] | Tuple[str, ...], by: List[str]
+    ) -> pd.DataFrame:
+        """attribute frame with numerical attributes (floats) and groups"""
+        df = self.attribute_frame(list(dict.fromkeys(list(attributes) + by)))
+        for name in attributes:
+            try:
+                df[name] = df[name].astype(np.float64)
+            except (TypeError, ValueError) as err:
+                raise ValueError(f"Attribute is not numerical: '{name}'") from err
+            if name == "n_carry":
+                df.loc[df[name] < 0, name] = np.nan
+        return df
+
+    def match(
+        self,
+        candidates: SimpleArithmeticList,
+        features: List[str] | Tuple[str, ...] = (
+            "problem_size",
+            "op1",
+            "op2",
+            "n_carry",
+            "same_parities",
+        ),
+        weights: Optional[Dict[str, float]] = None,
+        method: str = "greedy",
+        max_distance: Optional[float] = None,
+    ) -> Tuple[SimpleArithmeticList, SimpleArithmeticList, NDArray[np.float64]]:
+        """matches each problem (target) with a different problem of the
+        candidate list (control) that is most similar regarding the features.
+        Problems that are in both lists (identical objects) are not matched
+        with themselves, e.g. `lst.match(lst)`.
+
+        The features (see `attribute_frame`) are z-standardized over both
+        lists and the euclidean distance between the feature vectors defines
+        the similarity. The nearest neighbours are searched with a k-d tree.
+        Undefined features (e.g. `n_carry` of multiplications) are missing
+        values, as in `summary`. Problems are only matched with problems that
+        have the same defined features and only these features are compared.
+
+        features: numerical attributes or properties
+        weights: optional weights of the features (dict), default is 1
+        method: "greedy" assigns the pairs in the order of their distance
+            (fast, suitable for tens of thousands of problems), "optimal"
+            minimizes the sum of the distances of all pairs (Hungarian
+            algorithm, runtime increases with the square of the number of
+            targets)
+        max_distance: maximum distance of matched pairs
+
+        Targets without matching control (e.g. if there are less candidates
+        or if the distance exceeds max_distance) are not included.
+
+        returns matched targets, matched controls and the distances of the
+        pairs. The i-th target is matched with the i-th control.
+        """
+        if method not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown matching method: '{method}'")
+        if len(features) == 0:
+            raise ValueError("No features defined")
+        feat = [
+            lst._statistics_frame(features, []).to_numpy(dtype=np.float64)
+            for lst in (self, candidates)
+        ]
+        pooled = np.vstack(feat)
+        scale = np.nanstd(pooled, axis=0) if len(pooled) > 0 else np.ones(len(features))
+        scale[~(scale > 0)] = 1
+        w = np.array([1.0 if weights is None else weights.get(x, 1.0) for x in features])
+        tar, cand = ((f - np.nanmean(pooled, axis=0)) / scale * w for f in feat)
+
+        positions: Dict[int, List[int]] = {}  # identical objects
+        for j, x in enumerate(candidates._list):
+            positions.setdefault(id(x), []).append(j)
+        m = np.full(len(tar), -1, dtype=np.int64)
+        dist = np.full(len(tar), np.inf)
+        # groups of problems with the same undefined features
+        tar_nan, cand_nan = np.isnan(tar), np.isnan(cand)
+        for undefined in np.unique(tar_nan, axis=0):
+            cols = ~undefined
+            if not np.any(cols):
+                continue  # no defined features
+            tar_idx = np.flatnonzero((tar_nan == undefined).all(axis=1))
+            cand_idx = np.flatnonzero((cand_nan == undefined).all(axis=1))
+            local = np.full(len(cand), -1, dtype=np.int64)
+            local[cand_idx] = np.arange(len(cand_idx))
+            exclude = np.array(
+                [
+                    (t, local[j])
+                    for t, i in enumerate(tar_idx.tolist())
+                    for j in positions.get(id(self._list[i]), [])
+                    if local[j] >= 0
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            matching = (
+                _matching.greedy_matching
+                if method == "greedy"
+                else _matching.optimal_matching
+            )
+            mm, dd = matching(
+                tar[np.ix_(tar_idx, cols)], cand[np.ix_(cand_idx, cols)], exclude=exclude
+            )
+            found = mm >= 0
+            m[tar_idx[found]] = cand_idx[mm[found]]
+            dist[tar_idx[found]] = dd[found]
+        ok = m >= 0
+        if max_distance is not None:
+            ok &= dist <= max_distance
+
+        idx = np.flatnonzero(ok)
+        targets = self._view([self._list[i] for i in idx.tolist()], idx)
+        idx = m[ok]
+        controls = candidates._view([candidates._list[i] for i in idx.tolist()], idx)
+        return targets, controls, dist[ok]
 
     def shuffel(self):
         shuffle(self._list)
 
+    def constrained_shuffle(
+        self,
+        no_repeat: Optional[List[str]] = None,
+        max_run: Optional[Dict[str, int]] = None,
+        balance_transitions: Optional[str] = None,
+        seed: Optional[int] = None,
+        max_iterations: int = 10000,
+    ):
+        """shuffles the problems with constraints regarding the sequence
+
+        no_repeat: list of attributes that must not be identical on
+            consecutive trials
+        max_run: dict with attributes and the maximum number of consecutive
+            trials with identical value, e.g. `{"correct": 3}`
+        balance_transitions: attribute (e.g. a category), for which the
+            number of transitions between all values should be balanced.
+        seed: seed of the random generator
+
+        Attributes: "op1", "op2", "operands" (any operand), "operation",
+        "result", "correct", "correct_result" or the name of a property
+
+        Raises RuntimeError, if constraints can't be fulfilled.
+        """
+        no_rep = []
+        for attr in [] if no_repeat is None else no_repeat:
+            if attr == "operands":
+                no_rep.append(
+                    _sequence.shared_codes(
+                        self._attributes("op1"), self._attributes("op2")
+                    )
+                )
+            else:
+                no_rep.append(_sequence.codes(self._attributes(attr)))
+        runs = []
+        for attr, m in ({} if max_run is None else max_run).items():
+            runs.append((_sequence.codes(self._attributes(attr)), m))
+        if balance_transitions is None:
+            trans = None
+        else:
+            trans = _sequence.codes(self._attributes(balance_transitions))
+
+        order = _sequence.constrained_order(
+            len(self._list),
+            _sequence.SequenceConstraints(
+                no_repeat=no_rep, max_run=runs, transitions=trans
+            ),
+            rng=np.random.default_rng(seed),
+            max_iterations=max_iterations,
+        )
+        store = self._cached_store()
+        self._list = [self._list[i] for i in order]
+        if store is not None:
+            self._set_store(store.subset(order))
+
+    def n_carry(self, multiplication: bool = False) -> NDArray[np.int64]:
+        """number of carry and borrow operations of all problems (vectorized,
+        see `SimpleArithmetic.n_carry`). Problems without carry analysis
+        (e.g. fractions) are -1.
+
+        multiplication: if True, the carries in the partial products of
+            multiplications (long multiplication) are counted as well
+        """
+        op1, operation, op2 = _operand_arrays(self._list)
+        rtn = _digits.n_carry(op1, operation, op2)
+        if multiplication:
+            i = operation == "*"
+            rtn[i] = _digits.n_multiplication_carry(op1[i], op2[i])
+        return rtn
+
+    def _attributes(self, name: str) -> List:
+        """values of an attribute of all problems (see `constrained_shuffle`)"""
+        if name == "op1":
+            return [x.operand1.label() for x in self._list]
+        elif name == "op2":
+            return [x.operand2.label() for x in self._list]
+        elif name == "operation":
+            return [x.operation for x in self._list]
+        elif name == "result":
+            return [
+                "" if x.result is None else x.result.label() for x in self._list
+            ]
+        elif name == "correct":
+            return [x.is_correct() for x in self._list]
+        elif name == "correct_result":
+            return [x.calc() for x in self._list]
+        else:
+            return self._property_store().values(name).tolist()
+
+    def keys(self, properties: bool = False) -> List[Hashable]:
+        """keys of all problems (see `SimpleArithmetic.key`)
+
+        properties: if True, problems with identical labels but different
+            properties have different keys
+        """
+        if properties:
+            return [_key_with_properties(x) for x in self._list]
+        else:
+            return [x.key() for x in self._list]
+
+    def duplicated(self, properties: bool = False) -> List[bool]:
+        """list of bools, indicating if the problem is a duplicate of a
+        preceding problem in the list"""
+        done = set()
+        rtn = []
+        for k in self.keys(properties=properties):
+            rtn.append(k in done)
+            done.add(k)
+        return rtn
+
+    def unique(self, properties: bool = False) -> SimpleArithmeticList:
+        """returns a list without duplicates, that is, the first occurrence of
+        each problem (see `duplicated`)"""
+        return self._view(
+            [
+                x
+                for x, dup in zip(self._list, self.duplicated(properties=properties))
+                if not dup
+            ]
+        )
+
+    def drop_duplicates(self, properties: bool = False) -> int:
+        """removes all duplicates from the list and returns the number of
+        removed problems"""
+        n = len(self._list)
+        self.list = self.unique(properties=properties).list
+        return n - len(self._list)
+
+    def union(
+        self, other: SimpleArithmeticList, properties: bool = False
+    ) -> SimpleArithmeticList:
+        """unique problems that are in this or the other list"""
+        other._shared = True
+        return self._view(self._list + other.list).unique(properties=properties)
+
+    def intersection(
+        self, other: SimpleArithmeticList, properties: bool = False
+    ) -> SimpleArithmeticList:
+        """unique problems that are in this and the other list"""
+        other_keys = set(other.keys(properties=properties))
+        rtn = self.unique(properties=properties)
+        rtn.list = [
+            x
+            for x, k in zip(rtn.list, rtn.keys(properties=properties))
+            if k in other_keys
+        ]
+        return rtn
+
+    def difference(
+        self, other: SimpleArithmeticList, properties: bool = False
+    ) -> SimpleArithmeticList:
+        """unique problems that are in this but not in the other list"""
+        other_keys = set(other.keys(properties=properties))
+        rtn = self.unique(properties=properties)
+        rtn.list = [
+            x
+            for x, k in zip(rtn.list, rtn.keys(properties=properties))
+            if k not in other_keys
+        ]
+        return rtn
+
     def update_properties(self, properties: TProperties):
         """updates the properties of all problems"""
+        self._own()
+        store = self._cached_store()
         for x in self._list:
             x.update_properties(properties)
+        if store is not None:  # update the columns instead of recreating them
+            for k, v in properties.items():
+                store.set(k, v)
+            self._set_store(store)
+
+    def copy(self) -> SimpleArithmeticList:
+        """independent copy of the list with copies of all problems"""
+        rtn = SimpleArithmeticList()
+        rtn._list = [_copy_problem(x) for x in self._list]
+        rtn.number_types = set(self.number_types)
+        return rtn
+
+    def _view(
+        self, problems: List[SimpleArithmetic], idx: Optional[Sequence[int]] = None
+    ) -> SimpleArithmeticList:
+        """list that shares the problems with this list (copy-on-write)
+
+        idx: index of the problems in this list. The view gets the subset
+            of the property columns, if they are cached.
+        """
+        rtn = SimpleArithmeticList()
+        rtn.list = problems
+        self._shared = True
+        if idx is not None:
+            store = self._cached_store()
+            if store is not None:
+                rtn._set_store(store.subset(np.asarray(idx, dtype=np.intp)))
+        return rtn
+
+    def _property_store(self) -> PropertyStore:
+        """properties as categorical columns (cached, do not change)"""
+        rtn = self._cached_store()
+        if rtn is None:
+            rtn = PropertyStore.from_dicts([x.properties for x in self._list])
+            self._set_store(rtn)
+        return rtn
+
+    def _cached_store(self) -> Optional[PropertyStore]:
+        """cached property columns or None, if the problems of the list or
+        the properties of any problem have been replaced"""
+        if self._store is None:
+            return None
+        changes, problems, store = self._store
+        if (
+            changes != SimpleArithmetic._properties_changes
+            or len(problems) != len(self._list)
+            or not all(map(is_, problems, self._list))
+        ):
+            self._store = None
+            return None
+        return store
+
+    def _set_store(self, store: PropertyStore):
+        self._store = (SimpleArithmetic._properties_changes, list(self._list), store)
+
+    def _own(self):
+        """copies shared problems before they are changed"""
+        if self._shared:
+            store = self._cached_store()
+            self._list = [_copy_problem(x) for x in self._list]
+            self._shared = False
+            if store is not None:  # copies have the same properties
+                self._set_store(store)
 
     def data_frame(
         self, first_id: Optional[int] = None, problem_size=False, n_carry=False
     ) -> pd.DataFrame:
-        """pandas data frame, includes problem ids, if first_id is defined"""
+        """pandas data frame, includes problem ids, if first_id is defined.
+        Properties are categorical columns."""
         dicts = [
-            a.problem_dict(problem_size=problem_size, n_carry=n_carry)
+            a.problem_dict(problem_size=problem_size, n_carry=n_carry, properties=False)
             for a in self._list
         ]
         rtn = pd.DataFrame(dicts)
+        store = self._property_store()
+        for k in store.keys():
+            rtn[k] = store.categorical(k)  # categorical columns
         if first_id is not None:
             rtn["problem_id"] = range(first_id, first_id + len(rtn))
 
@@ -228,6 +956,8 @@ class SimpleArithmeticList(object):
             problem_dict: _description_
             sections: _description_. Defaults to None.
         """
+        import toml
+
         return self.import_dict(toml.load(filename))
 
     def import_markdown_text(self, text: str):
@@ -295,10 +1025,36 @@ class SimpleArithmeticList(object):
                     p.update_properties(prop)
                     self.append(p)
             if "op1" in d and "op2" in d and "operation" in d:
-                for op1 in d["op1"]:
-                    for op2 in d["op2"]:
-                        p = SimpleArithmetic(op1, d["operation"], op2, properties=prop)
-                        self.append(p)
+                operation = d["operation"]
+                operands1, operands2 = list(d["op1"]), list(d["op2"])
+                if all(
+                    type(x) is int for x in chain(operands1, operands2)
+                ) and operation in (
+                    "+", "-", "*", "/", SimpleArithmetic.LABEL_MULTI,
+                    SimpleArithmetic.LABEL_DIVIDE,
+                ):
+                    # fast construction of the grid of integer operands
+                    operation = {
+                        SimpleArithmetic.LABEL_MULTI: "*",
+                        SimpleArithmetic.LABEL_DIVIDE: "/",
+                    }.get(operation, operation)
+                    n = len(operands1) * len(operands2)
+                    lst = _from_int_columns(
+                        [op1 for op1 in operands1 for _ in operands2],
+                        [operation] * n,
+                        operands2 * len(operands1),
+                        properties=prop,
+                    )
+                    self._list.extend(lst)
+                    if n > 0:
+                        self.number_types = self.number_types | {int}
+                else:
+                    for op1 in operands1:
+                        for op2 in operands2:
+                            p = SimpleArithmetic(
+                                op1, d["operation"], op2, properties=prop
+                            )
+                            self.append(p)
 
     def import_data_frame(self, df: pd.DataFrame):
         for _, row in df.iterrows():
@@ -321,6 +1077,7 @@ class SimpleArithmeticList(object):
         min_result: Optional[int | float] = None,
         max_result: Optional[int | float] = None,
         max_iterations: int = 10000,
+        rng: Optional[Random] = None,
     ) -> SimpleArithmeticList:
         """select problems with correct and incorrect results and with a maximum
         deviation of mean operands between correct and incorrect problems
@@ -331,9 +1088,15 @@ class SimpleArithmeticList(object):
         min_result and max_result: the minimum and maximum value of the
         correct and incorrect results
 
+        rng: random generator, if None, the global random state of numpy is
+            used (`DataFrame.sample`)
+
         returns a new MathProblemList with a copies of the selected problems
         """
 
+        def random_state() -> Optional[int]:
+            return None if rng is None else rng.getrandbits(32)
+
         # make lists deviation lists: dcorr
         if isinstance(dev_corr, (int, float)):
             dcorr = np.asarray([dev_corr])
@@ -350,7 +1113,7 @@ class SimpleArithmeticList(object):
             dcorr = np.append(dcorr, dcorr)
 
         # copy all problem, set as correct and create df
-        pl = deepcopy(self)
+        pl = self._view(self._list)
         pl.set_results(dev_corr=0)
         df = pl.data_frame()
         if max_result is not None:
@@ -364,17 +1127,23 @@ class SimpleArithmeticList(object):
                 raise RuntimeError("Can't find a solution")
             n = n + 1
             # smaller
-            df_smaller = df.sample(n=n_smaller, replace=False)
+            df_smaller = df.sample(
+                n=n_smaller, replace=False, random_state=random_state()
+            )
             df_smaller["result"] = df_smaller["result"] - dcorr[:n_smaller]
             if min_result and (df_smaller["result"] < min_result).any():
                 continue
             # larger
-            df_larger = df.sample(n=n_larger, replace=False)
+            df_larger = df.sample(
+                n=n_larger, replace=False, random_state=random_state()
+            )
             df_larger["result"] = df_larger["result"] + dcorr[:n_larger]
             if max_result and (df_larger["result"] > max_result).any():
                 continue
             # correct
-            df_c = df.sample(n=n_correct, replace=False)
+            df_c = df.sample(
+                n=n_correct, replace=False, random_state=random_state()
+            )
 
             if dev_mean_operand is not None:
                 # calc means
@@ -403,3 +1172,109 @@ class SimpleArithmeticList(object):
         rtn.import_data_frame(df_smaller)
         rtn.import_data_frame(df_larger)
         return rtn
+
+
+_NUMERIC_ATTRIBUTES = (
+    "op1",
+    "op2",
+    "operation",
+    "result",
+    "correct_result",
+    "deviation",
+    "correct",
+    "problem_size",
+    "n_carry",
+    "negative_result",
+    "tie",
+    "same_parities",
+    "decade_solution",
+)
+
+
+def _expression_names(expr: str) -> List[str]:
+    """names of the attributes in an expression. Keywords, local variables
+    (`@x`) and attributes of names (`x.y`) are skipped."""
+    rtn = []
+    previous = None
+    for tok in tokenize.generate_tokens(io.StringIO(expr).readline):
+        if (
+            tok.type == tokenize.NAME
+            and not keyword.iskeyword(tok.string)
+            and previous not in ("@", ".")
+        ):
+            rtn.append(tok.string)
+        if tok.type not in (tokenize.NL, tokenize.NEWLINE):
+            previous = tok.string
+    return rtn
+
+
+def _condition_mask(values: pd.Series, condition: Any) -> NDArray[np.bool_]:
+    """boolean mask of the values that fulfill the condition (see `query`)"""
+    if callable(condition):
+        return np.asarray(condition(values.to_numpy()), dtype=bool)
+    elif isinstance(condition, tuple):
+        if len(condition) != 2:
+            raise ValueError(f"Ranges have to be tuples (min, max), not {condition}")
+        rtn = np.ones(len(values), dtype=bool)
+        if condition[0] is not None:
+            rtn &= (values >= condition[0]).to_numpy(dtype=bool)
+        if condition[1] is not None:
+            rtn &= (values <= condition[1]).to_numpy(dtype=bool)
+        return rtn
+    elif isinstance(condition, (set, frozenset, list)):
+        return values.isin(list(condition)).to_numpy(dtype=bool)
+    else:
+        return (values == condition).to_numpy(dtype=bool)
+
+
+def _operand_arrays(
+    problems: List[SimpleArithmetic],
+) -> Tuple[NDArray[np.float64], NDArray[np.str_], NDArray[np.float64]]:
+    """operands (nan for fractions) and operations of the problems"""
+    op1 = np.array(
+        [np.nan if x.operand1.is_fraction() else x.operand1.numerator for x in problems],
+        dtype=np.float64,
+    )
+    op2 = np.array(
+        [np.nan if x.operand2.is_fraction() else x.operand2.numerator for x in problems],
+        dtype=np.float64,
+    )
+    operation = np.array([x.operation for x in problems], dtype="<U1")
+    return op1, operation, op2
+
+
+def _names(names: Optional[str | List[str]]) -> List[str]:
+    if names is None:
+        return []
+    elif isinstance(names, str):
+        return [names]
+    else:
+        return list(names)
+
+
+def _restore_list(
+    state: Dict[str, Any], properties: PropertyStore, number_types: Set[type]
+) -> SimpleArithmeticList:
+    """unpickling of a list (see `SimpleArithmeticList.__reduce__`)"""
+    rtn = SimpleArithmeticList()
+    rtn._list = _pickling.unpack(state, properties.dicts())
+    rtn.number_types = number_types
+    rtn._set_store(properties)
+    return rtn
+
+
+def _copy_problem(problem: SimpleArithmetic) -> SimpleArithmetic:
+    """shallow copy, numbers are not changed in place"""
+    rtn = copy(problem)
+    rtn.properties = copy(problem.properties)
+    return rtn
+
+
+def _key_with_properties(problem: SimpleArithmetic) -> Hashable:
+    if problem.properties is None:
+        return problem.key()
+    else:  # type-tagged values, which might be unhashable (see PropertyStore)
+        return (
+            problem.key(),
+            tuple(sorted((k, _property_key(v)) for k, v in problem.properties.items())),
+        )
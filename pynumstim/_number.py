@@ -36,6 +36,10 @@ class Num(object):
     def __str__(self) -> str:
         return self.text()
 
+    def __reduce__(self):
+        # compact pickling: numerator and denominator only
+        return (_num, (self.numerator, self.denominator))
+
     def __float__(self) -> float:
         return self.numerator / self.denominator
 
@@ -126,6 +130,22 @@ class Num(object):
             return f"{self.numerator}"
 
 
+def _num(numerator: int | float, denominator: int | float) -> Num:
+    """fast construction without type checks"""
+    rtn = Num.__new__(Num)
+    rtn.numerator = numerator
+    rtn.denominator = denominator
+    return rtn
+
+
+def _int_num(value: int) -> Num:
+    """fast construction of integer numbers without type checks"""
+    rtn = Num.__new__(Num)
+    rtn.numerator = value
+    rtn.denominator = 1
+    return rtn
+
+
 def _parse(txt: str) -> Tuple[int | float, int | float]:
     """return numerator, denominator
     converts 1_2 to Num(1, 2) or '3' to Num(3,1)
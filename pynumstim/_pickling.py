@@ -0,0 +1,115 @@
+"""compact pickling of problem lists
+
+The problems of a list are packed into a few columns (numpy arrays of
+numerators, denominators and a string of operations) instead of pickling
+every problem and number as separate object.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ._number import Num, _num
+from ._simple import SimpleArithmetic, TProperties, _new
+
+
+def pack(problems: List[SimpleArithmetic]) -> Dict[str, Any]:
+    """numbers and operations of the problems as columns (without
+    properties, see `unpack`)
+
+    Columns of integers or floats are numpy arrays, columns of mixed types
+    remain lists.
+    """
+    has_result = [x._result is not None for x in problems]
+    nums = {
+        "op1": [x.operand1 for x in problems],
+        "op2": [x.operand2 for x in problems],
+        "result": [x._result for x in problems if x._result is not None],
+    }
+    rtn: Dict[str, Any] = {
+        "n": len(problems),
+        "operation": "".join(x.operation for x in problems),
+        "has_result": np.packbits(np.array(has_result, dtype=bool)),
+        "empty_properties": np.packbits(  # {}, which the store can't tell from None
+            np.array([x.properties == {} for x in problems], dtype=bool)
+        ),
+    }
+    for name, col in nums.items():
+        rtn[name + "_n"] = _column([x.numerator for x in col])
+        rtn[name + "_d"] = _column([x.denominator for x in col])
+    return rtn
+
+
+def unpack(
+    state: Dict[str, Any], properties: Optional[List[Optional[TProperties]]] = None
+) -> List[SimpleArithmetic]:
+    """problems of packed columns (see `pack`)"""
+    n = state["n"]
+    if properties is None:
+        properties = [None] * n
+    empty = np.unpackbits(state["empty_properties"], count=n).astype(bool)
+    for i in np.flatnonzero(empty).tolist():
+        properties[i] = {}
+    has_result = np.unpackbits(state["has_result"], count=n).astype(bool).tolist()
+    op1, op2, res = (
+        _numbers(state[name + "_n"], state[name + "_d"])
+        for name in ("op1", "op2", "result")
+    )
+    results = iter(res)
+    return [
+        _new(o1, op, o2, next(results) if r else None, props)
+        for o1, op, o2, r, props in zip(
+            op1, state["operation"], op2, has_result, properties
+        )
+    ]
+
+
+def _numbers(
+    numerators: NDArray | List[Any], denominators: NDArray | List[Any]
+) -> List[Num]:
+    """numbers of a packed column. Identical numbers of array columns are
+    the same object (numbers are not changed in place)."""
+    if isinstance(numerators, np.ndarray) and isinstance(denominators, np.ndarray):
+        num_values, num_idx = np.unique(numerators, return_inverse=True)
+        den_values, den_idx = np.unique(denominators, return_inverse=True)
+        codes, inverse = np.unique(
+            num_idx.ravel() * len(den_values) + den_idx.ravel(), return_inverse=True
+        )
+        num_list, den_list = num_values.tolist(), den_values.tolist()
+        nums = [
+            _num(num_list[c // len(den_list)], den_list[c % len(den_list)])
+            for c in codes.tolist()
+        ]
+        return [nums[i] for i in inverse.ravel().tolist()]
+    return [_num(a, b) for a, b in zip(_values(numerators), _values(denominators))]
+
+
+def _column(values: List[Any]) -> NDArray | List[Any]:
+    """array, if all values are integers (smallest integer type) or floats"""
+    types = set(map(type, values))
+    try:
+        if types == {int}:
+            return _smallest_int(np.array(values, dtype=np.int64))
+        elif types == {float}:
+            return np.array(values, dtype=np.float64)
+    except OverflowError:
+        pass
+    return values
+
+
+def _values(column: NDArray | List[Any]) -> List[Any]:
+    if isinstance(column, np.ndarray):
+        return column.tolist()  # Python ints and floats
+    return column
+
+
+def _smallest_int(values: NDArray[np.integer]) -> NDArray[np.integer]:
+    if len(values) == 0:
+        return values
+    dtype = np.result_type(
+        np.min_scalar_type(values.min()), np.min_scalar_type(values.max())
+    )
+    return values.astype(dtype)
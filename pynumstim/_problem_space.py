@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from . import _digits, _vector
+from ._mplist import SimpleArithmeticList
+from ._number import Num
+from ._simple import SimpleArithmetic, TProperties, _from_int_columns
+from ._two_step_list import TwoStepArithmeticList
+
+TColumns = Dict[str, NDArray]
+TPredicate = Callable[[TColumns], NDArray[np.bool_]]
+
+
+class ProblemSpace(object):
+    """Declarative definition of a space of simple or two step problems
+
+    The problem space is the Cartesian product of operands, operations and
+    deviations of the results from the correct results. Constraints (see
+    `where` and `filter`) are evaluated as vectorized masks over the whole
+    product.
+
+    Example
+    -------
+        space = ProblemSpace(range(5, 10), "*", range(5, 10), "-", range(15, 20),
+                             deviations=[-2, 2])
+        space.where(tie=False, min_step1=30, min_result=1, carry=True)
+        problems = space.two_step_arithmetic()
+    """
+
+    def __init__(
+        self,
+        operand1: ArrayLike,
+        operation1: str | List[str],
+        operand2: ArrayLike,
+        operation2: Optional[str | List[str]] = None,
+        operand3: Optional[ArrayLike] = None,
+        deviations: Optional[ArrayLike] = None,
+    ) -> None:
+        """operands: values of the operands
+        operations: operation or list of operations
+        operation2 and operand3: define two step problems
+            `(operand1 operation1 operand2) operation2 operand3`
+        deviations: deviations of the result from correct result.
+            Correct results (deviation=0) are always included.
+        """
+        if (operation2 is None) != (operand3 is None):
+            raise ValueError(
+                "operation2 and operand3 have to be defined for two step problems"
+            )
+        self.operand1 = np.atleast_1d(np.asarray(operand1))
+        self.operand2 = np.atleast_1d(np.asarray(operand2))
+        self.operation1 = _operation_axis(operation1)
+        if operand3 is None:
+            self.operand3 = None
+            self.operation2 = None
+        else:
+            self.operand3 = np.atleast_1d(np.asarray(operand3))
+            self.operation2 = _operation_axis(operation2)  # type: ignore
+
+        devs = [0]
+        if deviations is not None:
+            for x in np.atleast_1d(np.asarray(deviations)).tolist():
+                if x not in devs:
+                    devs.append(x)
+        self.deviations = np.asarray(devs)
+        # constraints of `where` (name, value) and custom predicates
+        self._constraints: List[Tuple[str, Any] | TPredicate] = []
+
+    @property
+    def two_step(self) -> bool:
+        return self.operand3 is not None
+
+    def where(
+        self,
+        tie: Optional[bool] = None,
+        carry: Optional[bool] = None,
+        carry_step1: Optional[bool] = None,
+        same_parities: Optional[bool] = None,
+        even_result: Optional[bool] = None,
+        decade_result: Optional[bool] = None,
+        negative_result: Optional[bool] = None,
+        min_result: Optional[int | float] = None,
+        max_result: Optional[int | float] = None,
+        min_step1: Optional[int | float] = None,
+        max_step1: Optional[int | float] = None,
+    ) -> ProblemSpace:
+        """adds constraints to the problem space and returns itself
+
+        tie: problems with identical first and second operand
+        carry: problems with carry (addition) or borrow (subtraction)
+            operations in the last step (see `SimpleArithmetic.n_carry`).
+            Problems with other operations never fulfill this constraint.
+        carry_step1: carry or borrow operations in the first step of two
+            step problems
+        same_parities: first and second operand have the same parity
+        even_result: correct result is even
+        decade_result: correct result or result is a multiple of 10
+        negative_result: correct result or result is negative
+        min_result, max_result: minimum and maximum value of correct result
+            and result
+        min_step1, max_step1: minimum and maximum value of the result of
+            the first step of two step problems
+        """
+        kwargs = {
+            "tie": tie,
+            "carry": carry,
+            "carry_step1": carry_step1,
+            "same_parities": same_parities,
+            "even_result": even_result,
+            "decade_result": decade_result,
+            "negative_result": negative_result,
+            "min_result": min_result,
+            "max_result": max_result,
+            "min_step1": min_step1,
+            "max_step1": max_step1,
+        }
+        for name, value in kwargs.items():
+            if value is not None:
+                if name in ("carry_step1", "min_step1", "max_step1"):
+                    self._require_two_step(name)
+                self._constraints.append((name, value))
+        return self
+
+    def filter(self, predicate: TPredicate) -> ProblemSpace:
+        """adds a custom constraint and returns itself
+
+        predicate: function that gets a dict of arrays (see `columns`) and
+            returns a boolean mask of the admissible problems. For parallel
+            generation (`n_jobs`), the predicate has to be picklable
+            (i.e. a module-level function).
+        """
+        self._constraints.append(predicate)
+        return self
+
+    def columns(self, n_jobs: Optional[int] = 1) -> TColumns:
+        """dict of arrays of all admissible problems
+
+        Keys: `op1`, `operation1`, `op2`, (`operation2`, `op3`, `step1`),
+        `correct`, `result`, `dev`, `n_carry`, (`n_carry_step1`)
+
+        n_jobs: number of worker processes. If not 1, the problem space is
+            split into shards of operand1 values (see `shards`), which are
+            generated and filtered in parallel. The order of the problems
+            does not depend on n_jobs. If None, the number of available CPUs is
+            used (see `n_cpus`).
+        """
+        if n_jobs is None:
+            n_jobs = n_cpus()
+        if n_jobs == 1 or len(self.operand1) < 2:
+            return self._columns()
+        shards = self.shards(min(len(self.operand1), 4 * n_jobs))
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(_shard_columns, shards))
+        return {k: np.concatenate([x[k] for x in parts]) for k in parts[0]}
+
+    def shards(self, n: int) -> List[ProblemSpace]:
+        """splits the problem space into n problem spaces with consecutive
+        parts of the operand1 values and identical constraints"""
+        rtn = []
+        for op1 in np.array_split(self.operand1, n):
+            if len(op1) > 0:
+                x = copy(self)
+                x.operand1 = op1
+                x._constraints = list(self._constraints)
+                rtn.append(x)
+        return rtn
+
+    def _columns(self) -> TColumns:
+        axes = [self.operand1, self.operation1, self.operand2]
+        names = ["op1", "operation1", "op2"]
+        if self.two_step:
+            axes += [self.operation2, self.operand3]
+            names += ["operation2", "op3"]
+        axes.append(self.deviations)
+        names.append("dev")
+        grid = np.meshgrid(*[np.arange(len(x)) for x in axes], indexing="ij")
+        d = {n: a[g.ravel()] for n, a, g in zip(names, axes, grid)}
+
+        d["correct"] = _vector.calc(d["op1"], d["operation1"], d["op2"])
+        d["n_carry"] = _digits.n_carry(d["op1"], d["operation1"], d["op2"])
+        if self.two_step:
+            d["step1"] = d["correct"]
+            d["n_carry_step1"] = d["n_carry"]
+            d["correct"] = _vector.calc(d["step1"], d["operation2"], d["op3"])
+            d["n_carry"] = _digits.n_carry(d["step1"], d["operation2"], d["op3"])
+        d["result"] = d["correct"] + d["dev"]
+
+        mask = ~np.isnan(d["correct"])  # e.g. division by zero
+        for c in self._constraints:
+            if isinstance(c, tuple):
+                mask &= _WHERE[c[0]](d, c[1])
+            else:
+                mask &= c(d)
+        return {k: v[mask] for k, v in d.items()}
+
+    def size(self, n_jobs: Optional[int] = 1) -> int:
+        """number of admissible problems"""
+        return len(self.columns(n_jobs)["op1"])
+
+    def simple_arithmetic(
+        self, properties: Optional[TProperties] = None, n_jobs: Optional[int] = 1
+    ) -> SimpleArithmeticList:
+        """SimpleArithmeticList of all admissible problems
+
+        n_jobs: number of worker processes (see `columns`)
+        """
+        if self.two_step:
+            raise ValueError("Two step problem space. Use `two_step_arithmetic`.")
+        d = self.columns(n_jobs)
+        rtn = SimpleArithmeticList()
+        if (
+            np.issubdtype(d["op1"].dtype, np.integer)
+            and np.issubdtype(d["op2"].dtype, np.integer)
+            and np.issubdtype(d["dev"].dtype, np.integer)
+            and np.all(np.isin(self.operation1, ["+", "-", "*"]))
+        ):
+            # integer results, fast construction
+            rtn._list = _from_int_columns(
+                d["op1"].tolist(),
+                d["operation1"].tolist(),
+                d["op2"].tolist(),
+                result=_int_results(d["op1"], d["operation1"], d["op2"], d["dev"]),
+                properties=properties,
+            )
+            rtn.number_types = {int} if len(rtn._list) > 0 else set()
+            return rtn
+
+        lst = []
+        for o1, op, o2, dev in zip(
+            d["op1"].tolist(),
+            d["operation1"].tolist(),
+            d["op2"].tolist(),
+            d["dev"].tolist(),
+        ):
+            p = SimpleArithmetic(o1, op, o2, properties=properties)
+            p.result = Num(p.calc() + dev)  # exact, also for fractions
+            lst.append(p)
+        rtn.append(lst)
+        return rtn
+
+    def two_step_arithmetic(
+        self, properties: Optional[TProperties] = None, n_jobs: Optional[int] = 1
+    ) -> TwoStepArithmeticList:
+        """TwoStepArithmeticList of all admissible problems
+
+        n_jobs: number of worker processes (see `columns`)
+        """
+        self._require_two_step("two_step_arithmetic")
+        d = self.columns(n_jobs)
+        rtn = TwoStepArithmeticList()
+        rtn.append_arrays(
+            d["op1"],
+            d["operation1"],
+            d["op2"],
+            d["operation2"],
+            d["op3"],
+            result=d["result"],
+            properties=properties,
+        )
+        return rtn
+
+    def _require_two_step(self, name: str):
+        if not self.two_step:
+            raise ValueError(f"'{name}' is only possible for two step problems")
+
+
+def _operation_axis(operation: str | List[str]) -> NDArray[np.str_]:
+    ops = np.atleast_1d(np.asarray(operation))
+    ops = _vector.operations(ops, len(ops))
+    return np.asarray(list(dict.fromkeys(ops.tolist())))  # unique, keep order
+
+
+def n_cpus() -> int:
+    """number of CPUs available to the process"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _shard_columns(space: ProblemSpace) -> TColumns:
+    return space._columns()
+
+
+def _int_results(
+    op1: NDArray, operation: NDArray[np.str_], op2: NDArray, dev: NDArray
+) -> List[int]:
+    """exact results of additions, subtractions and multiplications of
+    integers"""
+    op1 = op1.astype(np.int64)
+    op2 = op2.astype(np.int64)
+    rtn = np.where(
+        operation == "+", op1 + op2, np.where(operation == "-", op1 - op2, op1 * op2)
+    )
+    return (rtn + dev).tolist()
+
+
+def _has_carry(n_carry: NDArray[np.int64], carry: bool) -> NDArray[np.bool_]:
+    # n_carry = -1: carry not defined
+    if carry:
+        return n_carry > 0
+    else:
+        return n_carry == 0
+
+
+# evaluation of the constraints of `ProblemSpace.where`
+_WHERE: Dict[str, Callable[[TColumns, Any], NDArray[np.bool_]]] = {
+    "tie": lambda d, v: (d["op1"] == d["op2"]) == v,
+    "carry": lambda d, v: _has_carry(d["n_carry"], v),
+    "carry_step1": lambda d, v: _has_carry(d["n_carry_step1"], v),
+    "same_parities": lambda d, v: (d["op1"] % 2 == d["op2"] % 2) == v,
+    "even_result": lambda d, v: (d["correct"] % 2 == 0) == v,
+    "decade_result": lambda d, v: (
+        (d["result"] % 10 == 0) | (d["correct"] % 10 == 0)
+    ) == v,
+    "negative_result": lambda d, v: ((d["result"] < 0) | (d["correct"] < 0)) == v,
+    "min_result": lambda d, v: (d["result"] >= v) & (d["correct"] >= v),
+    "max_result": lambda d, v: (d["result"] <= v) & (d["correct"] <= v),
+    "min_step1": lambda d, v: d["step1"] >= v,
+    "max_step1": lambda d, v: d["step1"] <= v,
+}
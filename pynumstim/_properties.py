@@ -0,0 +1,219 @@
+"""categorical storage of the properties of problem lists"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from ._simple import TProperties
+
+TCodes = NDArray[np.int32]
+
+
+class PropertyStore(object):
+    """Properties of a list of problems as categorical columns. Each
+    property has a list of categories (the distinct values) and an array of
+    integer codes (index of the category, -1: property not defined). Values
+    None and nan are categories as well, but are missing values in pandas
+    categoricals.
+
+    n: number of problems
+    """
+
+    def __init__(self, n: int = 0) -> None:
+        self.n = n
+        self.categories: Dict[str, List[Any]] = {}
+        self.codes: Dict[str, TCodes] = {}
+        self._lookup: Dict[str, Dict[Hashable, int]] = {}
+
+    @staticmethod
+    def from_dicts(properties: Sequence[Optional[TProperties]]) -> PropertyStore:
+        """store of the property dicts of problems (None: no properties)
+
+        Problems usually share few distinct combinations of properties, the
+        codes are thus determined once per combination.
+        """
+        rtn = PropertyStore(len(properties))
+        combinations: Dict[Hashable, int] = {}
+        dicts: List[TProperties] = []
+        combi_codes = np.empty(len(properties), dtype=np.int64)
+        for i, p in enumerate(properties):
+            if p is None:
+                p = {}
+            key = tuple((k, _key(v)) for k, v in p.items())
+            c = combinations.get(key)
+            if c is None:
+                c = combinations[key] = len(dicts)
+                dicts.append(p)
+            combi_codes[i] = c
+        for k in dict.fromkeys(k for p in dicts for k in p):
+            codes = np.array(
+                [rtn._code(k, p[k]) if k in p else -1 for p in dicts],
+                dtype=np.int32,
+            )
+            rtn.codes[k] = codes[combi_codes]
+        return rtn
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # compact pickling: smallest integer type of the codes, no lookup
+        codes = {}
+        for k, v in self.codes.items():
+            dtype = np.result_type(
+                np.min_scalar_type(-1),
+                np.min_scalar_type(len(self.categories.get(k, []))),
+            )
+            codes[k] = v.astype(dtype)
+        return {"n": self.n, "categories": self.categories, "codes": codes}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.n = state["n"]
+        self.categories = state["categories"]
+        self.codes = {k: v.astype(np.int32) for k, v in state["codes"].items()}
+        self._lookup = {
+            k: {_key(v): i for i, v in enumerate(cats)}
+            for k, cats in self.categories.items()
+        }
+
+    def keys(self) -> List[str]:
+        return list(self.codes.keys())
+
+    def set(self, key: str, value: Any, idx: Optional[NDArray] = None):
+        """sets the property of all problems or of the problems at the
+        index or boolean mask"""
+        if key not in self.codes:
+            self.codes[key] = np.full(self.n, -1, dtype=np.int32)
+        code = self._code(key, value)
+        if idx is None:
+            self.codes[key][:] = code
+        else:
+            self.codes[key][idx] = code
+
+    def mask(self, properties: TProperties) -> NDArray[np.bool_]:
+        """boolean mask of the problems that have all properties (integer
+        comparisons of the codes). Values match all equal categories, e.g.
+        1 matches 1, 1.0 and True. Problems without the property never
+        match."""
+        rtn = np.ones(self.n, dtype=bool)
+        for k, v in properties.items():
+            if k not in self.codes:
+                rtn[:] = False
+            else:
+                cats = self.categories.get(k, [])
+                codes = [i for i, c in enumerate(cats) if _equal(c, v)]
+                rtn &= np.isin(self.codes[k], codes)
+        return rtn
+
+    def values(self, key: str) -> NDArray[np.object_]:
+        """values of a property (None: not defined)"""
+        cats = _object_array(self.categories.get(key, []) + [None])
+        if key not in self.codes:
+            return np.full(self.n, None, dtype=object)
+        return cats[self.codes[key]]  # code -1 is the last element (None)
+
+    def categorical(self, key: str) -> pd.Categorical | NDArray[np.object_]:
+        """pandas categorical of a property (nan: not defined or missing
+        value). Properties with unhashable values are returned as object
+        array."""
+        cats = self.categories.get(key, [])
+        valid = [i for i, c in enumerate(cats) if not _is_missing(c)]
+        recode = np.full(len(cats) + 1, -1, dtype=np.int32)  # last: code -1
+        recode[valid] = np.arange(len(valid))
+        try:
+            return pd.Categorical.from_codes(
+                recode[self.codes[key]],
+                categories=pd.Index([cats[i] for i in valid], dtype=object),
+            )
+        except (TypeError, ValueError):
+            return self.values(key)
+
+    def dicts(self) -> List[Optional[TProperties]]:
+        """property dicts of all problems (None: no properties)
+
+        The dicts are created once per combination of properties and copied.
+        """
+        if self.n == 0 or len(self.codes) == 0:
+            return [None] * self.n
+        keys = list(self.codes.keys())
+        cats = [_object_array(self.categories.get(k, [])) for k in keys]
+        combinations, inverse = np.unique(
+            np.stack([self.codes[k] for k in keys], axis=1), axis=0, return_inverse=True
+        )
+        templates: List[Optional[TProperties]] = []
+        for codes in combinations.tolist():
+            d = {k: cats[j][c] for j, (k, c) in enumerate(zip(keys, codes)) if c >= 0}
+            templates.append(d if len(d) > 0 else None)
+        return [
+            None if d is None else d.copy()
+            for d in (templates[i] for i in inverse.ravel().tolist())
+        ]
+
+    def subset(self, idx: NDArray) -> PropertyStore:
+        """store of the problems at the index or boolean mask"""
+        rtn = PropertyStore(len(np.arange(self.n)[idx]))
+        rtn.codes = {k: v[idx] for k, v in self.codes.items()}
+        rtn.categories = {k: list(v) for k, v in self.categories.items()}
+        rtn._lookup = {k: dict(v) for k, v in self._lookup.items()}
+        return rtn
+
+    def copy(self) -> PropertyStore:
+        return self.subset(np.arange(self.n))
+
+    def extend(self, other: PropertyStore):
+        """appends the problems of another store"""
+        for k in set(self.codes.keys()) | set(other.codes.keys()):
+            old = self.codes.get(k, np.full(self.n, -1, dtype=np.int32))
+            if k in other.codes:
+                # recode: categories of other -> categories of self, -1 stays
+                recode = np.array(
+                    [self._code(k, v) for v in other.categories[k]] + [-1],
+                    dtype=np.int32,
+                )
+                new = recode[other.codes[k]]
+            else:
+                new = np.full(other.n, -1, dtype=np.int32)
+            self.codes[k] = np.concatenate((old, new))
+        self.n += other.n
+
+    def _code(self, key: str, value: Any) -> int:
+        """code of the value, adds new categories"""
+        lookup = self._lookup.setdefault(key, {})
+        k = _key(value)
+        if k in lookup:
+            return lookup[k]
+        cats = self.categories.setdefault(key, [])
+        lookup[k] = len(cats)
+        cats.append(value)
+        return lookup[k]
+
+
+def _key(value: Any) -> Hashable:
+    """hashable lookup key of a value. The key includes the type, since
+    e.g. True, 1 and 1.0 are equal but different categories."""
+    if isinstance(value, float) and value != value:
+        return (float, "nan")  # nan objects are not equal
+    try:
+        hash(value)
+        return (type(value), value)
+    except TypeError:
+        return (type(value), repr(value))
+
+
+def _equal(a: Any, b: Any) -> bool:
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):  # e.g. arrays
+        return False
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _object_array(values: List[Any]) -> NDArray[np.object_]:
+    rtn = np.empty(len(values), dtype=object)
+    for i, x in enumerate(values):  # values might be sequences
+        rtn[i] = x
+    return rtn
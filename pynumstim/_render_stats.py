@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, Iterator, Optional
+
+TProgress = Callable[[str, int, int], None]
+
+
+def print_progress(label: str, counter: int, total: int) -> None:
+    """default progress callback of the writer functions"""
+    print("png: " + label)
+
+
+class RenderStats(object):
+    """Collects the number of calls, the durations and the written bytes of
+    each stage of the render pipeline.
+
+    Stages:
+        tex: latex and dvipng (`sympy.preview`)
+        draw: drawing with a renderer backend (e.g. `FontRenderer`)
+        decode: PNG decoding and conversion to RGBA
+        composite: pasting on background images, stacking and recoloring
+        resample: downsampling of high-resolution master images
+        write: saving images
+    """
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self.durations: Dict[str, float] = {}  # in seconds
+        self.bytes: Dict[str, int] = {}
+
+    def __str__(self) -> str:
+        rtn = f"{'stage':<12}{'count':>8}{'total [s]':>12}{'mean [ms]':>12}{'bytes':>14}\n"
+        for stage, cnt in self.counts.items():
+            dur = self.durations[stage]
+            rtn += (
+                f"{stage:<12}{cnt:>8}{dur:>12.3f}{1000 * dur / cnt:>12.3f}"
+                + f"{self.bytes.get(stage, 0):>14}\n"
+            )
+        return rtn
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """context manager that measures the duration of a stage"""
+        t = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, perf_counter() - t)
+
+    def add(self, stage: str, duration: float, n_bytes: int = 0):
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self.durations[stage] = self.durations.get(stage, 0.0) + duration
+        if n_bytes > 0:
+            self.add_bytes(stage, n_bytes)
+
+    def add_bytes(self, stage: str, n_bytes: int):
+        self.bytes[stage] = self.bytes.get(stage, 0) + n_bytes
+
+    def reset(self):
+        self.counts = {}
+        self.durations = {}
+        self.bytes = {}
+
+    def summary(self):
+        """summary table as pandas data frame"""
+        import pandas as pd
+
+        rows = []
+        for stage, cnt in self.counts.items():
+            dur = self.durations[stage]
+            rows.append(
+                {
+                    "stage": stage,
+                    "count": cnt,
+                    "total": dur,
+                    "mean": dur / cnt,
+                    "bytes": self.bytes.get(stage, 0),
+                }
+            )
+        return pd.DataFrame(
+            rows, columns=["stage", "count", "total", "mean", "bytes"]
+        )
+
+
+@contextmanager
+def measure(stats: Optional[RenderStats], stage: str) -> Iterator[None]:
+    """measures stage, if stats is defined"""
+    if stats is None:
+        yield
+    else:
+        with stats.measure(stage):
+            yield
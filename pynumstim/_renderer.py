@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import re
+from abc import ABCMeta, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+TColor = Tuple[int, int, int, int]
+TToken = Union[str, Tuple[str, str]]  # text or fraction (numerator, denominator)
+
+# latex commands and symbols of the tex code of numbers and problems
+TEX_SYMBOLS = {
+    "\\times": "\u00d7",
+    "\\cdot": "\u00b7",
+    "\\div": "\u00f7",
+    "-": "\u2212",
+}
+# ASCII replacements, if symbols are not supported by the font
+_FALLBACK = {"\u00d7": "x", "\u00b7": ".", "\u00f7": ":", "\u2212": "-"}
+_TEX_TOKENS = re.compile(
+    r"\\frac\s*\{(?P<num>[^{}]*)\}\s*\{(?P<den>[^{}]*)\}"
+    r"|(?P<cmd>\\[a-zA-Z]+)"
+    r"|(?P<chr>[^\s\\])"
+)
+
+
+class Renderer(metaclass=ABCMeta):
+    """Interface of renderer backends, which draw tex code of math problems
+    and numbers (see `writer.tex_to_pillow`). If no renderer is defined,
+    the writer functions use LaTeX and dvipng.
+    """
+
+    @abstractmethod
+    def render(
+        self,
+        tex_code: str,
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+    ) -> Image.Image:
+        """returns RGBA image of the tex code"""
+
+    def __repr__(self) -> str:
+        """repr has to define all parameters that affect the output, it is
+        used to identify changed stimuli for incremental builds"""
+        return f"{type(self).__name__}()"
+
+
+class FontRenderer(Renderer):
+    """Fast renderer that draws numbers and arithmetic problems with a
+    TrueType font and does not require a TeX installation.
+
+    Only the subset of tex code that is created by `Num`,
+    `SimpleArithmetic` and `TwoStepArithmetic` is supported: numbers,
+    operators, brackets and `\\frac`, which is drawn as stacked fraction.
+
+    font: path of a TrueType or OpenType font. If None, the scalable
+        default font of Pillow is used.
+    font_size: font size in points (LaTeX default is 12pt). The size in
+        pixel depends on the resolution (dpi).
+    """
+
+    def __init__(
+        self, font: Optional[Union[Path, str]] = None, font_size: float = 12
+    ) -> None:
+        self.font = None if font is None else str(font)
+        self.font_size = font_size
+
+    def __repr__(self) -> str:
+        return f"FontRenderer(font={self.font!r}, font_size={self.font_size})"
+
+    def render(
+        self,
+        tex_code: str,
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+    ) -> Image.Image:
+        size = max(1, round(self.font_size * resolution / 72))
+        font, table = _load_font(self.font, size)
+        tokens = [
+            t.translate(table) if isinstance(t, str)
+            else (t[0].translate(table), t[1].translate(table))
+            for t in tex_tokens(tex_code)
+        ]
+        ascent, descent = font.getmetrics()
+        space = font.getlength(" ")
+        line = max(1, round(size / 20))  # fraction bar
+        gap = 2 * line
+        axis = round(size * 0.3)  # height of the fraction bar above the baseline
+
+        # first pass: widths
+        widths = []
+        for t in tokens:
+            if isinstance(t, tuple):
+                widths.append(max(font.getlength(t[0]), font.getlength(t[1])) + space)
+            else:
+                widths.append(font.getlength(t))
+        if any(isinstance(t, tuple) for t in tokens):
+            above = axis + gap + ascent + descent
+            below = line + gap + ascent + descent - axis
+        else:
+            above, below = ascent, descent
+        pad = size // 4  # glyphs might exceed their metrics
+        width = round(sum(widths) + space * (len(tokens) - 1)) + 2 * pad
+        height = above + below + 2 * pad
+        baseline = pad + above
+
+        # second pass: draw the mask
+        mask = Image.new("L", (width, height), 0)
+        x = float(pad)
+        for t, w in zip(tokens, widths):
+            if isinstance(t, tuple):
+                bar = baseline - axis
+                for txt, y in (
+                    (t[0], bar - gap - descent),
+                    (t[1], bar + line + gap + ascent),
+                ):
+                    _paste_text(mask, self.font, size, txt, x + (w - font.getlength(txt)) / 2, y)
+                mask.paste(
+                    255,
+                    (round(x + space / 4), bar, round(x + w - space / 4), bar + line),
+                )
+            else:
+                _paste_text(mask, self.font, size, t, x, baseline)
+            x += w + space
+
+        bbox = mask.getbbox()
+        if bbox is None:
+            raise ValueError(f"Nothing to draw: '{tex_code}'")
+        mask = mask.crop(bbox)
+        fg_color = _color(fg)
+        bg_color = _color(bg)
+        if bg_color[3] == 0:
+            rtn = Image.new("RGBA", mask.size, fg_color)
+            rtn.putalpha(mask)
+            return rtn
+        else:
+            return Image.composite(
+                Image.new("RGBA", mask.size, fg_color),
+                Image.new("RGBA", mask.size, bg_color),
+                mask,
+            )
+
+
+def tex_tokens(tex_code: str) -> List[TToken]:
+    """splits tex code of numbers and problems into text and fractions
+    (tuples). Digits are joined to numbers.
+
+    Raises ValueError for unsupported latex commands.
+    """
+    rtn: List[TToken] = []
+    for m in _TEX_TOKENS.finditer(tex_code.replace("$", "")):
+        if m.group("num") is not None:
+            rtn.append((m.group("num").strip(), m.group("den").strip()))
+            continue
+        txt = m.group("cmd") or m.group("chr")
+        if txt.startswith("\\"):
+            try:
+                txt = TEX_SYMBOLS[txt]
+            except KeyError as err:
+                raise ValueError(f"Unsupported latex command: {txt}") from err
+        elif txt == "-" and (
+            len(rtn) == 0
+            or rtn[-1] in ("=", "+", "/", *TEX_SYMBOLS.values())
+            or rtn[-1] == "("
+        ):
+            pass  # sign of a number
+        elif txt in TEX_SYMBOLS:
+            txt = TEX_SYMBOLS[txt]
+
+        prev = rtn[-1] if len(rtn) > 0 else None
+        if isinstance(prev, str) and (
+            prev[-1] == "("
+            or txt == ")"
+            or ((txt[0].isdigit() or txt == ".") and prev[-1] in "0123456789.-")
+        ):
+            rtn[-1] = prev + txt  # number or brackets
+        else:
+            rtn.append(txt)
+    return [_minus(t) if isinstance(t, str) else (_minus(t[0]), _minus(t[1]))
+            for t in rtn]
+
+
+def _minus(txt: str) -> str:
+    return txt.replace("-", TEX_SYMBOLS["-"])
+
+
+@lru_cache(maxsize=32)
+def _load_font(
+    font: Optional[str], size: int
+) -> Tuple[ImageFont.FreeTypeFont, Dict[int, str]]:
+    """returns font and translation table for unsupported symbols"""
+    if font is None:
+        rtn = ImageFont.load_default(size)
+        if not isinstance(rtn, ImageFont.FreeTypeFont):
+            raise RuntimeError("FontRenderer requires Pillow with FreeType support")
+    else:
+        rtn = ImageFont.truetype(font, size)
+    missing = bytes(rtn.getmask("\uffff"))  # glyph of unsupported characters
+    table = {
+        ord(c): fb for c, fb in _FALLBACK.items() if bytes(rtn.getmask(c)) == missing
+    }
+    return rtn, table
+
+
+def _paste_text(
+    mask: Image.Image, font: Optional[str], size: int, text: str, x: float, y: int
+) -> None:
+    """pastes the text with the left baseline at x, y"""
+    im, (left, top) = _text_mask(font, size, text)
+    mask.paste(im, (round(x) + left, y + top))
+
+
+@lru_cache(maxsize=4096)
+def _text_mask(
+    font: Optional[str], size: int, text: str
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """rendered text and its offset to the left baseline. Numbers and
+    symbols recur in problem lists and are thus rendered only once."""
+    fnt = _load_font(font, size)[0]
+    left, top, right, bottom = fnt.getbbox(text, anchor="ls")
+    im = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(im).text((-left, -top), text, fill=255, font=fnt, anchor="ls")
+    return im, (left, top)
+
+
+def _color(color: str) -> TColor:
+    """RGBA of dvipng and Pillow color names"""
+    if color.lower() == "transparent":
+        return (0, 0, 0, 0)
+    if color.lower().startswith("rgb "):  # dvipng: "rgb 1.0 0.5 0"
+        rgb = [round(float(x) * 255) for x in color.split()[1:4]]
+        return (rgb[0], rgb[1], rgb[2], 255)
+    return ImageColor.getcolor(color, "RGBA")  # type: ignore
@@ -0,0 +1,219 @@
+"""constrained randomization of trial sequences via swap repair"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+TCodes = NDArray[np.int64]
+
+
+class SequenceConstraints(object):
+    """Constraints of trial sequences. Trial attributes are represented by
+    integer codes (see `codes`).
+
+    no_repeat: codes of attributes, which must not be identical on
+        consecutive trials. Tuples of codes define attributes with several
+        values (e.g. the operands), consecutive trials must then not share
+        any value.
+    max_run: codes of attributes and the maximum number of consecutive
+        trials with identical value
+    transitions: codes of the attribute, for which the transitions between
+        consecutive trials should be balanced (soft constraint)
+    """
+
+    def __init__(
+        self,
+        no_repeat: Optional[List[TCodes | Tuple[TCodes, ...]]] = None,
+        max_run: Optional[List[Tuple[TCodes, int]]] = None,
+        transitions: Optional[TCodes] = None,
+    ) -> None:
+        self.no_repeat = [] if no_repeat is None else [
+            x if isinstance(x, tuple) else (x,) for x in no_repeat
+        ]
+        self.max_run = [] if max_run is None else max_run
+        for _, m in self.max_run:
+            if m < 1:
+                raise ValueError("maximum run length has to be at least 1")
+        self.transitions = transitions
+        # number of preceding trials that affect the violations of a trial
+        self.window = max([1] + [m for _, m in self.max_run])
+
+    def violations(
+        self, order: NDArray[np.intp], positions: Optional[NDArray[np.intp]] = None
+    ) -> NDArray[np.int64]:
+        """number of violated constraints of the trials at the positions (default:
+        all trials) of the sequence"""
+        if positions is None:
+            positions = np.arange(len(order))
+        rtn = np.zeros(len(positions), dtype=np.int64)
+        has_prev = positions >= 1
+        curr = order[positions]
+        prev = order[np.maximum(positions - 1, 0)]
+        for codes in self.no_repeat:
+            same = np.zeros(len(positions), dtype=bool)
+            for a in codes:
+                for b in codes:
+                    same |= a[curr] == b[prev]
+            rtn += same & has_prev
+        for codes, m in self.max_run:
+            run = positions >= m
+            for t in range(1, m + 1):
+                run &= codes[order[np.maximum(positions - t, 0)]] == codes[curr]
+            rtn += run
+        return rtn
+
+    def transition_counts(self, order: NDArray[np.intp]) -> NDArray[np.int64]:
+        """matrix of the transition counts between the codes of the
+        `transitions` attribute"""
+        if self.transitions is None:
+            raise RuntimeError("No transitions attribute defined")
+        k = self.transitions.max() + 1
+        c = self.transitions[order]
+        rtn = np.zeros((k, k), dtype=np.int64)
+        np.add.at(rtn, (c[:-1], c[1:]), 1)
+        return rtn
+
+
+def codes(values: Sequence) -> TCodes:
+    """integer codes of the values"""
+    _, rtn = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return rtn.astype(np.int64)
+
+
+def shared_codes(*values: Sequence) -> Tuple[TCodes, ...]:
+    """integer codes of several attributes with common coding"""
+    all_codes = codes(np.concatenate([np.asarray(x, dtype=str) for x in values]))
+    return tuple(np.split(all_codes, np.cumsum([len(x) for x in values])[:-1]))
+
+
+def constrained_order(
+    n: int,
+    constraints: SequenceConstraints,
+    rng: Optional[np.random.Generator] = None,
+    max_iterations: int = 10000,
+    n_candidates: int = 16,
+) -> NDArray[np.intp]:
+    """random order of n trials that fulfills the constraints
+
+    The algorithm starts with a random permutation and repairs violations by
+    swapping trials (min-conflicts local search). Transitions are balanced
+    after all constraints are fulfilled, until the balance does not improve
+    anymore. Swaps of the balancing phase never impair the balance, and the
+    best balanced order is returned.
+
+    Raises RuntimeError, if no solution has been found after max_iterations.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    order = rng.permutation(n)
+    if n < 2:
+        return order
+
+    viol = constraints.violations(order)
+    balance = constraints.transitions is not None
+    if balance:
+        counts = constraints.transition_counts(order)
+        expected = (n - 1) / counts.size
+        imbalance = np.abs(counts - expected).sum()
+        tolerance = counts.size  # on average one trial per cell
+    else:
+        counts, expected, imbalance, tolerance = None, 0.0, 0.0, 0.0
+    best_order = order
+    best_imbalance = np.inf
+    n_no_improvement = 0
+
+    for _ in range(max_iterations):
+        bad = np.flatnonzero(viol)
+        if len(bad) > 0:
+            i = bad[rng.integers(len(bad))]
+        elif balance and imbalance > tolerance and n_no_improvement < 1000:
+            i = rng.integers(n)
+            if imbalance < best_imbalance:
+                best_imbalance = imbalance
+                best_order = order.copy()
+                n_no_improvement = 0
+            else:
+                n_no_improvement += 1
+        else:
+            return order if imbalance <= best_imbalance else best_order
+
+        best = None
+        for j in rng.integers(n, size=n_candidates):
+            if j == i:
+                continue
+            d_viol, affected, new_viol = _swap_delta(constraints, order, viol, i, j)
+            if balance:
+                new_counts = _swapped_counts(constraints, order, counts, i, j)
+                d_imb = np.abs(new_counts - expected).sum() - imbalance
+            else:
+                new_counts, d_imb = None, 0.0
+            if best is None or (d_viol, d_imb) < best[0]:
+                best = ((d_viol, d_imb), j, affected, new_viol, new_counts)
+
+        if best is None:
+            continue
+        (d_viol, d_imb), j, affected, new_viol, new_counts = best
+        if len(bad) > 0:  # repair, sideways moves escape plateaus
+            accept = d_viol < 0 or (d_viol == 0 and (d_imb < 0 or rng.random() < 0.1))
+        else:  # balance, constraints stay fulfilled
+            accept = d_viol == 0 and d_imb <= 0
+        if accept:
+            order[i], order[j] = order[j], order[i]
+            viol[affected] = new_viol
+            if balance:
+                counts = new_counts
+                imbalance += d_imb
+
+    if np.any(viol):
+        raise RuntimeError("Can't find a solution")
+    # transitions are not perfectly balanced
+    return order if imbalance <= best_imbalance else best_order
+
+
+def _affected(constraints: SequenceConstraints, n: int, *positions: int) -> NDArray:
+    """positions with violations that might change, if trials at the positions
+    are swapped"""
+    rtn = set()
+    for p in positions:
+        rtn.update(range(p, min(p + constraints.window + 1, n)))
+    return np.fromiter(rtn, dtype=np.intp)
+
+
+def _swap_delta(
+    constraints: SequenceConstraints,
+    order: NDArray[np.intp],
+    viol: NDArray[np.int64],
+    i: int,
+    j: int,
+):
+    """returns change of violations, affected positions and their new
+    violations"""
+    affected = _affected(constraints, len(order), i, j)
+    order[i], order[j] = order[j], order[i]  # swap temporarily
+    new_viol = constraints.violations(order, affected)
+    order[i], order[j] = order[j], order[i]
+    return new_viol.sum() - viol[affected].sum(), affected, new_viol
+
+
+def _swapped_counts(
+    constraints: SequenceConstraints,
+    order: NDArray[np.intp],
+    counts: NDArray[np.int64],
+    i: int,
+    j: int,
+) -> NDArray[np.int64]:
+    """transition counts after swapping trial i and j"""
+    c = constraints.transitions
+    n = len(order)
+    pairs = set(k for k in (i, i + 1, j, j + 1) if 1 <= k < n)  # (k-1, k)
+    rtn = counts.copy()
+    for k in pairs:
+        rtn[c[order[k - 1]], c[order[k]]] -= 1  # type: ignore
+    order[i], order[j] = order[j], order[i]  # swap temporarily
+    for k in pairs:
+        rtn[c[order[k - 1]], c[order[k]]] += 1  # type: ignore
+    order[i], order[j] = order[j], order[i]
+    return rtn
@@ -3,10 +3,10 @@ from __future__ import annotations
 import re
 from copy import copy
 from fractions import Fraction
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
 from ._math_problem import MathProblem
-from ._number import Num, TNum, TPyNum
+from ._number import Num, TNum, TPyNum, _int_num
 
 LATEX_TIMES = "\\times"  # "\\cdot"
 LATEX_SYMBOL_NAMES = {
@@ -24,6 +24,9 @@ class SimpleArithmetic(MathProblem):
     LABEL_MULTI = "t"  # multiplication, times
     LABEL_DIVIDE = "d"  # divide
     OPERATIONS = ["+", "-", "*", "/", LABEL_MULTI, LABEL_DIVIDE]
+    # number of property changes of all problems, invalidates the property
+    # columns of lists (see `SimpleArithmeticList._property_store`)
+    _properties_changes = 0
 
     def __init__(
         self,
@@ -37,31 +40,93 @@ class SimpleArithmetic(MathProblem):
         Keys represent the property name and must be text strings
         """
 
-        self.operand1 = Num(operand1)
-        self.operand2 = Num(operand2)
-
         if operation not in SimpleArithmetic.OPERATIONS:
             raise ValueError(f"Unknown operation: '{operation}'")
         if operation == SimpleArithmetic.LABEL_MULTI:
-            self.operation = "*"
+            operation = "*"
         elif operation == SimpleArithmetic.LABEL_DIVIDE:
-            self.operation = "/"
-        else:
-            self.operation = operation
-
-        if result is None:
-            self.result = None
-        else:
-            self.result = Num(result)
-        self.properties = copy(properties)
+            operation = "/"
+        self._init(
+            Num(operand1),
+            operation,
+            Num(operand2),
+            None if result is None else Num(result),
+            copy(properties),
+        )
+
+    def _init(
+        self,
+        operand1: Num,
+        operation: str,
+        operand2: Num,
+        result: Optional[Num],
+        properties: Optional[TProperties],
+    ) -> None:
+        """sets all attributes without checks (see `_new`)"""
+        self._label: Optional[str] = None  # cache, see label()
+        self._operand1 = operand1
+        self._operation = operation
+        self._operand2 = operand2
+        self._result = result
+        self._properties = properties
+
+    def __reduce__(self):
+        # compact pickling: numbers and properties, without caches
+        return (
+            _new,
+            (self.operand1, self.operation, self.operand2, self._result, self.properties),
+        )
+
+    @property
+    def operand1(self) -> Num:
+        return self._operand1
+
+    @operand1.setter
+    def operand1(self, val: Num):
+        self._operand1 = val
+        self._label = None  # reset cache
+
+    @property
+    def operation(self) -> str:
+        return self._operation
+
+    @operation.setter
+    def operation(self, val: str):
+        self._operation = val
+        self._label = None  # reset cache
+
+    @property
+    def operand2(self) -> Num:
+        return self._operand2
+
+    @operand2.setter
+    def operand2(self, val: Num):
+        self._operand2 = val
+        self._label = None  # reset cache
+
+    @property
+    def result(self) -> Optional[Num]:
+        return self._result
+
+    @result.setter
+    def result(self, val: Optional[Num]):
+        self._result = val
+        self._label = None  # reset cache
+
+    @property
+    def properties(self) -> Optional[TProperties]:
+        return self._properties
+
+    @properties.setter
+    def properties(self, val: Optional[TProperties]):
+        self._properties = val
+        SimpleArithmetic._properties_changes += 1
 
     def number_types(self) -> Set[type]:
-        rtn = set((self.operand1.number_type(), self.operand2.number_type()))
-        if self.result is not None:
-            rtn.add(self.result.number_type())
-            return rtn
-        else:
-            return rtn
+        rtn = {self._operand1.number_type(), self._operand2.number_type()}
+        if self._result is not None:
+            rtn.add(self._result.number_type())
+        return rtn
 
     def operation_label(self) -> str:
         if self.operation == "*":
@@ -72,17 +137,19 @@ class SimpleArithmetic(MathProblem):
             return self.operation
 
     def update_properties(self, props: Dict[str, Any]):
-        if isinstance(self.properties, dict):
-            self.properties.update(props.copy())
+        if isinstance(self._properties, dict):
+            self._properties.update(props.copy())
+            SimpleArithmetic._properties_changes += 1
         else:
             self.properties = props.copy()
 
     def has_properites(self, props: TProperties) -> bool:
         """returns if problem is the properties defined in props"""
-        if self.properties is None:
+        properties = self._properties
+        if properties is None:
             return False
         for key, value in props.items():
-            if key not in self.properties or self.properties[key] != value:
+            if key not in properties or properties[key] != value:
                 return False
         return True
 
@@ -101,7 +168,7 @@ class SimpleArithmetic(MathProblem):
         return rtn
 
     def problem_dict(
-        self, incl_hash=False, problem_size=False, n_carry=False
+        self, incl_hash=False, problem_size=False, n_carry=False, properties=True
     ) -> Dict[str, str | int | float]:
         rtn = self._as_dict()
         if self.result is not None:
@@ -116,7 +183,7 @@ class SimpleArithmetic(MathProblem):
                 rtn["n_carry"] = nc
 
         rtn["label"] = self.label()
-        if isinstance(self.properties, dict):
+        if properties and isinstance(self.properties, dict):
             rtn.update(self.properties)
         if incl_hash:
             rtn["hash"] = self.hash()
@@ -166,13 +233,19 @@ class SimpleArithmetic(MathProblem):
     def label(self) -> str:
         """labels not not have no spaces and not the characters \\*{}=
         They can thus be used for filenames and as ids in data tables
+
+        Note
+        ----
+        The label is cached. It will be updated, if operands, operation or
+        result are set, but not if numbers are changed in place.
         """
-        o1 = self.operand1.label()
-        o2 = self.operand2.label()
-        rtn = f"{o1}{self.operation_label()}{o2}"
-        if self.result is not None:
-            rtn += f"={self.result.label()}"
-        return rtn
+        if self._label is None:
+            o1 = self.operand1.label()
+            o2 = self.operand2.label()
+            self._label = f"{o1}{self.operation_label()}{o2}"
+            if self.result is not None:
+                self._label += f"={self.result.label()}"
+        return self._label
 
     def __str__(self) -> str:
         """text representation"""
@@ -189,43 +262,41 @@ class SimpleArithmetic(MathProblem):
         return self.calc() == self.result.py_number()
 
     def n_carry(self) -> Optional[int]:
-        """number of carry operations for addition and subtraction
-        else None"""
+        """number of carry operations for addition and borrow operations for
+        subtraction, else None
 
-        if self.operand1.is_fraction() or self.operand2.is_fraction():
+        Problems with negative operands are analysed with the operation on
+        the absolute values that is required to solve the problem, e.g.
+        `-23 + 8` is a subtraction of 8 from 23. Use
+        `SimpleArithmeticList.n_carry` for the analysis of many problems.
+        """
+        if self.operation not in ("+", "-"):
             return None
-        if self.operation == "+":
-            subtraction = False
-        elif self.operation == "-":
-            subtraction = True
-        else:
+        a = self.operand1.py_number()
+        b = self.operand2.py_number()
+        if isinstance(a, Fraction) or isinstance(b, Fraction):
+            return None
+        if a % 1 != 0 or b % 1 != 0:
             return None
+        a, b = int(a), int(b)
 
-        str_op1 = str(self.operand1)
-        str_op2 = str(self.operand2)
-        # Get the length of the longer number
-        max_length = max(len(str_op1), len(str_op2))
-        # Add leading zeros to make the numbers have the same length
-        str_op1 = str_op1.zfill(max_length)
-        str_op2 = str_op2.zfill(max_length)
+        subtraction = (self.operation == "-") == ((a < 0) == (b < 0))
+        if subtraction and (a < 0 or b < 0):
+            a, b = max(abs(a), abs(b)), min(abs(a), abs(b))  # larger minus smaller
+        else:
+            a, b = abs(a), abs(b)
 
-        current_carry = 0
+        carry = 0
         ncarry = 0
         # Iterate over digits from right to left
-        for i in range(max_length - 1, -1, -1):
+        while a > 0 or b > 0:
+            a, digit_a = divmod(a, 10)
+            b, digit_b = divmod(b, 10)
             if subtraction:
-                res = int(str_op1[i]) - int(str_op2[i])
-                res -= current_carry
-            else:
-                res = int(str_op1[i]) + int(str_op2[i])
-                res += current_carry
-
-            if (subtraction and res < 0) or (not subtraction and res >= 10):
-                ncarry += 1
-                current_carry = 1
+                carry = int(digit_a - digit_b - carry < 0)
             else:
-                current_carry = 0
-
+                carry = int(digit_a + digit_b + carry >= 10)
+            ncarry += carry
         return ncarry
 
     def problem_size(self) -> float:
@@ -267,6 +338,44 @@ class SimpleArithmetic(MathProblem):
         return self.operand1.py_number() % 2 == self.operand2.py_number() % 2
 
 
+def _from_int_columns(
+    op1: List[int],
+    operation: List[str],
+    op2: List[int],
+    result: Optional[List[int]] = None,
+    properties: Optional[TProperties] = None,
+) -> List[SimpleArithmetic]:
+    """fast construction of problems with integer operands and results from
+    columns. Operations have to be one of '+-*/' and are not checked.
+    """
+    if result is None:
+        result = [None] * len(op1)  # type: ignore
+    return [
+        _new(
+            _int_num(o1),
+            op,
+            _int_num(o2),
+            None if r is None else _int_num(r),
+            copy(properties),
+        )
+        for o1, op, o2, r in zip(op1, operation, op2, result)  # type: ignore
+    ]
+
+
+def _new(
+    operand1: Num,
+    operation: str,
+    operand2: Num,
+    result: Optional[Num],
+    properties: Optional[TProperties],
+) -> SimpleArithmetic:
+    """fast construction of a problem without checks and conversions, e.g.
+    for unpickling (see `SimpleArithmetic.__reduce__`)"""
+    rtn = SimpleArithmetic.__new__(SimpleArithmetic)
+    rtn._init(operand1, operation, operand2, result, properties)
+    return rtn
+
+
 def _split_after_digit(txt: str, letter: str):
     # splits txt at letter only if a digit proceeds the letter
     if letter in ["+", "*", "\\"]:  # escaping required
@@ -0,0 +1,109 @@
+"""vectorized grouped statistics and balance tests"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+TFloat = NDArray[np.float64]
+
+
+def grouped_moments(
+    values: TFloat, groups: NDArray[np.int64], n_groups: int
+) -> Tuple[TFloat, TFloat, TFloat]:
+    """number of values, means and variances (ddof=1) of each group
+
+    values: array (n_values, n_attributes), nan values are ignored
+    groups: group code of each value (0 ... n_groups-1)
+
+    returns arrays (n_groups, n_attributes)
+    """
+    shape = (n_groups, values.shape[1])
+    count, mean, var = np.zeros(shape), np.full(shape, np.nan), np.full(shape, np.nan)
+    for a in range(values.shape[1]):
+        x = values[:, a]
+        ok = ~np.isnan(x)
+        g, x = groups[ok], x[ok]
+        count[:, a] = np.bincount(g, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean[:, a] = np.bincount(g, weights=x, minlength=n_groups) / count[:, a]
+            ss = np.bincount(g, weights=(x - mean[g, a]) ** 2, minlength=n_groups)
+            var[:, a] = ss / (count[:, a] - 1)
+    return count, mean, var
+
+
+def anova(count: TFloat, mean: TFloat, var: TFloat) -> Tuple[TFloat, TFloat, TFloat]:
+    """one-way analysis of variance between groups (axis -2) of the
+    grouped moments (see `grouped_moments`)
+
+    returns F values, p values and the maximal standardized mean difference
+    between two groups (difference divided by the pooled standard deviation)
+    """
+    has = count > 0
+    k = has.sum(axis=-2)
+    n = count.sum(axis=-2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grand = np.nansum(count * mean, axis=-2) / n
+        ssb = np.nansum(count * (mean - np.expand_dims(grand, -2)) ** 2, axis=-2)
+        ssw = np.nansum(np.where(count > 1, (count - 1) * var, 0), axis=-2)
+        df1, df2 = k - 1, n - k
+        msw = ssw / df2
+        f = (ssb / df1) / msw
+        f = np.where((df1 > 0) & (df2 > 0), f, np.nan)
+        m = np.where(has, mean, np.nan)
+        smd = (np.nanmax(m, axis=-2, initial=-np.inf) - np.nanmin(m, axis=-2, initial=np.inf)) / np.sqrt(msw)
+        smd = np.where(k > 1, smd, np.nan)
+    p = f_sf(f, df1, df2)
+    return f, p, smd
+
+
+def f_sf(f: TFloat, df1: TFloat, df2: TFloat) -> TFloat:
+    """survival function (p value) of the F distribution"""
+    f, df1, df2 = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (f, df1, df2)))
+    rtn = np.full(f.shape, np.nan)
+    ok = ~np.isnan(f) & (df1 > 0) & (df2 > 0)
+    rtn[ok & np.isinf(f)] = 0.0
+    for i in zip(*np.nonzero(ok & np.isfinite(f))):
+        x = df2[i] / (df2[i] + df1[i] * f[i])
+        rtn[i] = betainc(df2[i] / 2, df1[i] / 2, x)
+    return rtn
+
+
+def betainc(a: float, b: float, x: float) -> float:
+    """regularized incomplete beta function I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    ln_front = (
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+        + a * math.log(x) + b * math.log1p(-x)
+    )
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(ln_front) * _beta_cf(a, b, x) / a
+    else:  # symmetry, faster convergence
+        return 1 - math.exp(ln_front) * _beta_cf(b, a, 1 - x) / b
+
+
+def _beta_cf(a: float, b: float, x: float, max_iter: int = 300) -> float:
+    """continued fraction of the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    rtn = d
+    for m in range(1, max_iter + 1):
+        for num in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1 + num * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + num / c
+            c = c if abs(c) > tiny else tiny
+            rtn *= c * d
+        if abs(c * d - 1) < 1e-12:
+            break
+    return rtn
@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from pathlib import Path
+from random import sample, shuffle
+from typing import Dict, List, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike, NDArray
+
+from . import _vector
+from ._number import Num, TNum
+from ._properties import PropertyStore
+from ._simple import SimpleArithmetic, TProperties
+from ._two_step_problem import TwoStepArithmetic
+
+NUMBER_COLUMNS = ("op1", "op2", "op3", "result")
+OPERATION_COLUMNS = ("operation1", "operation2")
+
+
+class TwoStepArithmeticList(object):
+    """List of two step problems, `(op1 operation1 op2) operation2 op3 = result`
+
+    Problems are stored as columns (numpy arrays) and `TwoStepArithmetic`
+    objects are only created, if required (see `list`). Problems without
+    result have nan as result. Properties are stored as categorical
+    columns (integer codes, see `PropertyStore`).
+
+    Random selections use the module `random`, like `SimpleArithmeticList`,
+    and are thus reproducible via `random.seed`.
+
+    Note
+    ----
+    Fractions are not supported. Divisions are calculated as floats.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, NDArray] = {}
+        for x in NUMBER_COLUMNS:
+            self._data[x] = np.empty(0, dtype=np.float64)
+        for x in OPERATION_COLUMNS:
+            self._data[x] = np.empty(0, dtype="<U1")
+        self._properties = PropertyStore()
+        self.number_types: Set[type] = set()  # involved number types
+
+    def __len__(self) -> int:
+        return len(self._data["op1"])
+
+    def __str__(self):
+        rtn = ""
+        for x in self.texts():
+            rtn += x + "\n"
+        return rtn
+
+    @property
+    def list(self) -> List[TwoStepArithmetic]:
+        """list of TwoStepArithmetic objects
+
+        Note: objects are newly created and changes do not affect the list
+        """
+        o1, o2, o3, res = [self._numbers(x) for x in NUMBER_COLUMNS]
+        props = self._properties.dicts()
+        rtn = []
+        for i in range(len(self)):
+            rtn.append(
+                TwoStepArithmetic(
+                    o1[i],
+                    o2[i],
+                    o3[i],
+                    operation1=self._data["operation1"][i],
+                    operation2=self._data["operation2"][i],
+                    result=res[i],
+                    properties=props[i],
+                )
+            )
+        return rtn
+
+    def column(self, name: str) -> NDArray:
+        """read-only array of a column (`op1`, `op2`, `op3`, `result`,
+        `operation1`, `operation2` or the name of a property)"""
+        if name in self._data:
+            rtn = self._data[name].view()
+        elif name in self._properties.codes:
+            rtn = self._properties.values(name)
+        else:
+            raise KeyError(name)
+        rtn.flags.writeable = False
+        return rtn
+
+    def append(
+        self,
+        problem: TwoStepArithmetic
+        | TwoStepArithmeticList
+        | List[TwoStepArithmetic],
+    ):
+        if isinstance(problem, TwoStepArithmeticList):
+            self._extend(problem._data, problem._properties)
+            self.number_types = self.number_types | problem.number_types
+            return
+        if isinstance(problem, TwoStepArithmetic):
+            problem = [problem]
+
+        columns = {x: [] for x in NUMBER_COLUMNS + OPERATION_COLUMNS}
+        props = []
+        for p in problem:
+            for num in (p.operand1, p.operand2, p.operand3, p.result):
+                if num is not None and num.number_type() is Fraction:
+                    raise ValueError(
+                        "Fractions are not supported by TwoStepArithmeticList"
+                    )
+            columns["op1"].append(float(p.operand1))
+            columns["op2"].append(float(p.operand2))
+            columns["op3"].append(float(p.operand3))
+            columns["result"].append(np.nan if p.result is None else float(p.result))
+            columns["operation1"].append(p.operation1)
+            columns["operation2"].append(p.operation2)
+            props.append(p.step2.properties)
+            self.number_types = self.number_types | p.step1.number_types()
+            self.number_types = self.number_types | p.step2.number_types()
+        self.number_types.discard(Fraction)  # from step1 division
+
+        data = {
+            x: np.asarray(columns[x], dtype=self._data[x].dtype) for x in columns
+        }
+        self._extend(data, PropertyStore.from_dicts(props))
+
+    def append_arrays(
+        self,
+        operand1: ArrayLike,
+        operation1: str | ArrayLike,
+        operand2: ArrayLike,
+        operation2: str | ArrayLike,
+        operand3: ArrayLike,
+        result: Optional[ArrayLike] = None,
+        properties: Optional[TProperties] = None,
+    ):
+        """appends problems defined by arrays of operands, operations and
+        results. Scalars will be broadcast.
+
+        Note: Fractions are not supported
+        """
+        o1, o2, o3 = np.broadcast_arrays(
+            *[
+                np.atleast_1d(np.asarray(x, dtype=np.float64))
+                for x in (operand1, operand2, operand3)
+            ]
+        )
+        n = len(o1)
+        if result is None:
+            result = np.nan
+        data = {
+            "op1": o1.copy(),
+            "op2": o2.copy(),
+            "op3": o3.copy(),
+            "result": np.broadcast_to(np.asarray(result, dtype=np.float64), (n,)).copy(),
+            "operation1": _vector.operations(operation1, n),
+            "operation2": _vector.operations(operation2, n),
+        }
+        props = PropertyStore(n)
+        if properties is not None:
+            for k, v in properties.items():
+                props.set(k, v)
+
+        for x in NUMBER_COLUMNS:
+            self.number_types = self.number_types | _vector.number_types(data[x])
+        self._extend(data, props)
+
+    def calc(self) -> NDArray[np.float64]:
+        """array of correct results"""
+        step1 = _vector.calc(
+            self._data["op1"], self._data["operation1"], self._data["op2"]
+        )
+        return _vector.calc(step1, self._data["operation2"], self._data["op3"])
+
+    def deviation(self) -> NDArray[np.float64]:
+        """array of deviations from correct results"""
+        return self._data["result"] - self.calc()
+
+    def is_correct(self) -> NDArray[np.bool_]:
+        return self.deviation() == 0
+
+    def set_results(self, dev_corr: int | float):
+        """Sets results of all problem to a value that deviation from
+        correct result by `dev_corr`. Thus, `dev_corr=0` returns correct problems.
+        """
+        self._data["result"] = self.calc() + dev_corr
+        self.number_types = self.number_types | _vector.number_types(
+            self._data["result"]
+        )
+
+    def get_random(
+        self, n: int = 1, dev_corr: Optional[int | float] = None
+    ) -> TwoStepArithmeticList:
+        """Get x random problems
+
+        Optionally set results via `dev_cor`, which defined the deviation from
+        correct (see `set_results`)
+        """
+        idx = np.array(sample(range(len(self)), min(n, len(self))), dtype=np.intp)
+        rtn = self._subset(idx)
+        if dev_corr is not None:
+            rtn.set_results(dev_corr=dev_corr)
+        return rtn
+
+    def pop_random(
+        self, n: int = 1, dev_corr: Optional[int | float] = None
+    ) -> TwoStepArithmeticList:
+        """Pop x random problems
+
+        Optionally set results via `dev_cor`, which defined the deviation from
+        correct (see `set_results`)
+        """
+        idx = np.array(sample(range(len(self)), n), dtype=np.intp)
+        rtn = self._subset(idx)
+        if dev_corr is not None:
+            rtn.set_results(dev_corr=dev_corr)
+        keep = np.ones(len(self), dtype=bool)
+        keep[idx] = False
+        self._keep(keep)
+        return rtn
+
+    def shuffel(self):
+        order = list(range(len(self)))
+        shuffle(order)
+        self._keep(np.array(order, dtype=np.intp))
+
+    def update_properties(self, properties: TProperties):
+        """updates the properties of all problems"""
+        for k, v in properties.items():
+            self._properties.set(k, v)
+
+    def find(
+        self,
+        first_operand: Optional[TNum] = None,
+        operation1: Optional[str] = None,
+        second_operand: Optional[TNum] = None,
+        operation2: Optional[str] = None,
+        third_operand: Optional[TNum] = None,
+        correct: Optional[bool] = None,
+        result: Optional[TNum] = None,
+        deviation: Optional[TNum] = None,
+        negative_result: Optional[bool] = None,
+        properties: Optional[TProperties] = None,
+    ) -> TwoStepArithmeticList:
+        d = self._data
+        mask = np.ones(len(self), dtype=bool)
+        if first_operand is not None:
+            mask &= d["op1"] == float(Num(first_operand))
+        if operation1 is not None:
+            mask &= d["operation1"] == _vector.operations(operation1, 1)[0]
+        if second_operand is not None:
+            mask &= d["op2"] == float(Num(second_operand))
+        if operation2 is not None:
+            mask &= d["operation2"] == _vector.operations(operation2, 1)[0]
+        if third_operand is not None:
+            mask &= d["op3"] == float(Num(third_operand))
+        if correct is not None:
+            mask &= self.is_correct() == correct
+        if result is not None:
+            mask &= d["result"] == float(Num(result))
+        if deviation is not None:
+            mask &= self.deviation() == float(Num(deviation))
+        if negative_result is not None:
+            mask &= ~np.isnan(d["result"]) & ((d["result"] < 0) == negative_result)
+        if properties is not None:
+            mask &= self._properties.mask(properties)
+
+        return self._subset(np.flatnonzero(mask))
+
+    def labels(self) -> NDArray[np.str_]:
+        """labels of all problems (see `TwoStepArithmetic.label`)"""
+        o1, o2, o3, res = [
+            _vector.number_labels(self._data[x], self.number_types)
+            for x in NUMBER_COLUMNS
+        ]
+        op1 = _operation_labels(self._data["operation1"])
+        op2 = _operation_labels(self._data["operation2"])
+        rtn = np.char.add(np.char.add(np.char.add(o1, op1), o2), op2)
+        rtn = np.char.add(rtn, o3)
+        has_res = ~np.isnan(self._data["result"])
+        rtn[has_res] = np.char.add(np.char.add(rtn[has_res], "="), res[has_res])
+        return rtn
+
+    def texts(self) -> List[str]:
+        """text representations of all problems (see `TwoStepArithmetic.__str__`)"""
+        o1, o2, o3, res = [
+            _vector.number_labels(self._data[x], self.number_types)
+            for x in NUMBER_COLUMNS
+        ]
+        rtn = []
+        for i in range(len(self)):
+            txt = (
+                f"({o1[i]} {self._data['operation1'][i]} {o2[i]}) "
+                + f"{self._data['operation2'][i]} {o3[i]}"
+            )
+            if len(res[i]) > 0:
+                txt += f" = {res[i]}"
+            rtn.append(txt)
+        return rtn
+
+    def data_frame(self, first_id: Optional[int] = None) -> pd.DataFrame:
+        """pandas data frame, includes problem ids, if first_id is defined"""
+        d = self._data
+        if float in self.number_types:
+            t = float
+        else:
+            t = "Int64"  # nullable int
+        rtn = pd.DataFrame(
+            {
+                "op1": pd.array(d["op1"]).astype(t),
+                "operation1": d["operation1"],
+                "op2": pd.array(d["op2"]).astype(t),
+                "operation2": d["operation2"],
+                "op3": pd.array(d["op3"]).astype(t),
+                "result": pd.array(d["result"]).astype(t),
+            }
+        )
+        has_res = ~np.isnan(d["result"])
+        rtn["correct"] = pd.array(self.is_correct().astype(int)).astype("Int64")
+        rtn.loc[~has_res, "correct"] = pd.NA
+        rtn["dev"] = self.deviation()
+        rtn["label"] = self.labels()
+        for k in self._properties.keys():
+            rtn[k] = self._properties.categorical(k)
+        if first_id is not None:
+            rtn["problem_id"] = range(first_id, first_id + len(rtn))
+        return rtn
+
+    def to_csv(
+        self,
+        filename: Union[Path, str],
+        first_id: Optional[int] = None,
+        rounding_digits: int = 2,
+        sep: str = "\t",
+    ) -> pd.DataFrame:
+        """pandas data frame, includes problem ids, if first_id is defined"""
+        df = self.data_frame(first_id=first_id)
+        df = df.round(rounding_digits)
+        df.to_csv(filename, sep=sep, index=False, lineterminator="\n")
+        return df
+
+    def copy(self) -> TwoStepArithmeticList:
+        """independent copy of the list"""
+        return self._subset(np.arange(len(self)))
+
+    def _numbers(self, column: str) -> List[Optional[int | float]]:
+        """python numbers of a column, None for nan"""
+        vals = self._data[column]
+        if float in self.number_types:
+            return [None if np.isnan(x) else float(x) for x in vals]
+        else:
+            return [None if np.isnan(x) else int(x) for x in vals]
+
+    def _subset(self, idx: NDArray[np.intp]) -> TwoStepArithmeticList:
+        """new list with the problems at the indices"""
+        rtn = TwoStepArithmeticList()
+        rtn._data = {k: v[idx] for k, v in self._data.items()}
+        rtn._properties = self._properties.subset(idx)
+        rtn.number_types = set(self.number_types)
+        return rtn
+
+    def _keep(self, idx: NDArray):
+        """keeps only the problems of the index or boolean mask"""
+        self._data = {k: v[idx] for k, v in self._data.items()}
+        self._properties = self._properties.subset(idx)
+
+    def _extend(self, data: Dict[str, NDArray], properties: PropertyStore):
+        for k in self._data:
+            self._data[k] = np.concatenate((self._data[k], data[k]))
+        self._properties.extend(properties)
+
+
+def _operation_labels(operations: NDArray[np.str_]) -> NDArray[np.str_]:
+    rtn = operations.copy()
+    rtn[rtn == "*"] = SimpleArithmetic.LABEL_MULTI
+    rtn[rtn == "/"] = SimpleArithmetic.LABEL_DIVIDE
+    return rtn
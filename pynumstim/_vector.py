@@ -0,0 +1,67 @@
+"""vectorized helper functions for problems stored as numpy arrays"""
+
+from __future__ import annotations
+
+from typing import Set
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._simple import SimpleArithmetic
+
+NUMPY_OPERATIONS = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.true_divide,
+}
+
+
+def operations(operation: str | ArrayLike, n: int) -> NDArray[np.str_]:
+    """array of n operations. Operation labels (`t`, `d`) will be converted
+    into operation symbols"""
+    rtn = np.broadcast_to(np.asarray(operation, dtype="<U1"), (n,)).copy()
+    unknown = set(np.unique(rtn)) - set(SimpleArithmetic.OPERATIONS)
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown operation: '{unknown.pop()}'")
+    rtn[rtn == SimpleArithmetic.LABEL_MULTI] = "*"
+    rtn[rtn == SimpleArithmetic.LABEL_DIVIDE] = "/"
+    return rtn
+
+
+def calc(
+    operand1: NDArray, operation: NDArray[np.str_], operand2: NDArray
+) -> NDArray[np.float64]:
+    """correct results of the problems as float array. Divisions by zero
+    result in nan"""
+    rtn = np.full(len(operand1), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for op, fnc in NUMPY_OPERATIONS.items():
+            i = operation == op
+            if i.any():
+                rtn[i] = fnc(operand1[i], operand2[i])
+    rtn[~np.isfinite(rtn)] = np.nan
+    return rtn
+
+
+def number_types(values: NDArray[np.float64]) -> Set[type]:
+    """number types required to represent the (non-nan) values"""
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return set()
+    elif np.all(np.mod(values, 1) == 0):
+        return set([int])
+    else:
+        return set([float])
+
+
+def number_labels(values: NDArray[np.float64], types: Set[type]) -> NDArray[np.str_]:
+    """labels of numbers (see `Num.label`), empty labels for nan"""
+    missing = np.isnan(values)
+    if float in types:
+        rtn = values.astype(str)
+    else:
+        rtn = np.where(missing, 0, values).astype(np.int64).astype(str)
+    rtn[missing] = ""
+    return rtn
+
@@ -1,6 +1,6 @@
 from typing import Dict, List
 
-from pynumstim import Num, TNum, TwoStepArithmetic
+from pynumstim import Num, ProblemSpace, TNum, TwoStepArithmetic
 
 
 def make_problem_Lyons_Beilock(
@@ -20,61 +20,33 @@ def make_problem_Lyons_Beilock(
     return rtn
 
 
-def _is_admissible(prob: TwoStepArithmetic) -> bool:
-    """admissible regarding criteria of  Lyons and Beilock
+def problem_space() -> ProblemSpace:
+    """admissible problems regarding criteria of  Lyons and Beilock
 
     (a*b) – c = d, where a ≠ b, 5≤ a ≤ 9, 5≤ b ≤ 9, a*b ≥ 30, 15 ≤ c ≤19,
     and d > 0. Moreover, subtracting c from a*b always involved a
     borrow operation (e.g., “borrowing” from the tens place when
     subtracting 5 from 32). Half of the trials were valid (correct = ‘Yes’)
     and half were invalid (correct = ‘No’).
-    """
-
-    if prob.result is None:
-        return False
-    a = prob.operand1.py_number()
-    b = prob.operand2.py_number()
-    c = prob.operand3.py_number()
-    if (
-        a >= 5
-        and a <= 9
-        and b >= 5
-        and b <= 9
-        and c >= 15
-        and c <= 19
-        and a != b
-        and a * b >= 30
-        and prob.result > 0
-    ):
-        x = a * b
-        # check require borrowing
-        while x > 0 or c > 0:
-            digit_x = x % 10  # Extract the least digit
-            digit_c = c % 10
-            if digit_c > digit_x:
-                return True  # requires borrowing
-            x //= 10
 
-    return False
+    Invalid results deviate by -2 or +2 from the correct result.
+    """
+    space = ProblemSpace(
+        operand1=range(5, 9 + 1),
+        operation1="*",
+        operand2=range(5, 9 + 1),
+        operation2="-",
+        operand3=range(15, 19 + 1),
+        deviations=[-2, 2],
+    )
+    # carry: borrow operation in the subtraction (vectorized digit analysis)
+    return space.where(tie=False, min_step1=30, min_result=1, carry=True)
 
 
 def all_problems() -> Dict[str, List[TwoStepArithmetic]]:
-    correct = []
-    too_small_result = []
-    too_large_result = []
-    for a in range(5, 9 + 1):
-        for b in range(5, 9 + 1):
-            for c in range(15, 19 + 1):
-                p = make_problem_Lyons_Beilock(a, b, c)
-                if _is_admissible(p):
-                    correct.append(p)
-                    s = make_problem_Lyons_Beilock(a, b, c, int(float(p.result) - 2))  # type: ignore
-                    l = make_problem_Lyons_Beilock(a, b, c, int(float(p.result) + 2))  # type: ignore
-                    too_small_result.append(s)
-                    too_large_result.append(l)
-
+    problems = problem_space().two_step_arithmetic()
     return {
-        "correct": correct,
-        "too_small_result": too_small_result,
-        "too_large_result": too_large_result,
+        "correct": problems.find(deviation=0).list,
+        "too_small_result": problems.find(deviation=-2).list,
+        "too_large_result": problems.find(deviation=2).list,
     }
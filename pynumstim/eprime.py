@@ -1,7 +1,21 @@
 """creating trial list from data_frame for e-prime"""
 
+import random as _random
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from time import perf_counter as _perf_counter
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+
 import pandas as _pd
 
+from ._mplist import SimpleArithmeticList as _SimpleArithmeticList
+from ._problem_space import n_cpus as _n_cpus
+
+# read-only source list of the worker processes (see `write_trial_lists`)
+_source: _Optional[_SimpleArithmeticList] = None
+
 
 def write_trial_list(
     df: _pd.DataFrame,
@@ -25,3 +39,131 @@ def write_trial_list(
     content = df.to_csv(sep="\t", index=False, lineterminator="\n")
     with open(filename, "w", encoding="utf-8") as fl:
         fl.write(content[:-1])
+
+
+def write_trial_lists(
+    problems: _SimpleArithmeticList,
+    filename: str,
+    procedure: str,
+    subjects: int | _List[int],
+    selection: _Optional[_Dict[str, _Any]] = None,
+    sequence: _Optional[_Dict[str, _Any]] = None,
+    seed: _Optional[int] = None,
+    n_jobs: _Optional[int] = None,
+    weight: int = 1,
+    nested: str = "",
+    rounding_digits: int = 2,
+    problem_size: bool = False,
+    n_carry: bool = False,
+) -> _pd.DataFrame:
+    """creates and saves a randomized e-prime trial list for each subject
+
+    The problem list is send only once to each worker process and is
+    not modified.
+
+    filename: file name that contains the placeholder `{subject}`,
+        e.g. "lists/trial_list_{subject}.txt"
+    subjects: number of subjects or list of subject ids
+    selection: keyword arguments for `SimpleArithmeticList.rand_selection`.
+        If the dict contains the key `n`, `SimpleArithmeticList.get_random`
+        is used instead. If None, all problems will be shuffled.
+    sequence: keyword arguments for `SimpleArithmeticList.constrained_shuffle`
+        to constrain the order of the trials of each list
+    seed: if defined, the list of subject `i` (i-th subject) is
+        created with the seed `seed + i` and is thus reproducible
+    n_jobs: number of worker processes. If 1, all lists are created in the
+        current process. If None, the number of available CPUs is used
+        (i.e. serial creation on single CPU machines).
+
+    returns a data frame with the timing (in seconds) of each list
+    """
+
+    if "{subject}" not in filename:
+        raise ValueError("filename has to contain the placeholder '{subject}'")
+    if isinstance(subjects, int):
+        subjects = list(range(1, subjects + 1))
+    if selection is None:
+        selection = {}
+
+    tasks = []
+    for i, sub in enumerate(subjects):
+        tasks.append(
+            {
+                "subject": sub,
+                "seed": None if seed is None else seed + i,
+                "filename": filename.replace("{subject}", str(sub)),
+                "procedure": procedure,
+                "selection": selection,
+                "sequence": sequence,
+                "weight": weight,
+                "nested": nested,
+                "rounding_digits": rounding_digits,
+                "problem_size": problem_size,
+                "n_carry": n_carry,
+            }
+        )
+
+    if n_jobs is None:
+        n_jobs = _n_cpus()
+    if n_jobs == 1:
+        timing = [_make_trial_list(t, problems) for t in tasks]
+    else:
+        with _ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(problems,)
+        ) as executor:
+            timing = list(executor.map(_make_trial_list, tasks))
+
+    return _pd.DataFrame(timing)
+
+
+def _init_worker(problems: _SimpleArithmeticList):
+    global _source
+    _source = problems
+
+
+def _make_trial_list(
+    task: _Dict[str, _Any], source: _Optional[_SimpleArithmeticList] = None
+) -> _Dict[str, _Any]:
+    """creates a single trial list from the source list (default: source
+    list of the worker process)"""
+    if source is None:
+        source = _source
+    if source is None:
+        raise RuntimeError("Worker process has not been initialized")
+
+    t0 = _perf_counter()
+    # local generator, since forked processes inherit the global random state
+    rng = _random.Random(task["seed"])
+    selection = dict(task["selection"])
+    if "n" in selection:
+        lst = source.get_random(**selection, rng=rng)
+    elif len(selection) > 0:
+        lst = source.rand_selection(**selection, rng=rng)
+    else:
+        lst = source.get_random(n=len(source.list), rng=rng)
+    if task["sequence"] is not None:
+        lst.constrained_shuffle(**task["sequence"], seed=task["seed"])
+    lst.update_properties({"subject": task["subject"]})
+    t1 = _perf_counter()
+    df = lst.data_frame(problem_size=task["problem_size"], n_carry=task["n_carry"])
+    t2 = _perf_counter()
+    write_trial_list(
+        df,
+        filename=task["filename"],
+        procedure=task["procedure"],
+        weight=task["weight"],
+        nested=task["nested"],
+        rounding_digits=task["rounding_digits"],
+    )
+    t3 = _perf_counter()
+
+    return {
+        "subject": task["subject"],
+        "seed": task["seed"],
+        "filename": task["filename"],
+        "n_trials": len(df),
+        "selection": t1 - t0,
+        "data_frame": t2 - t1,
+        "write": t3 - t2,
+        "total": t3 - t0,
+    }
@@ -0,0 +1,512 @@
+"""local render server and client
+
+The server keeps warm worker processes, batches concurrent requests into
+single LaTeX runs and shares one render cache between all clients.
+
+Start the server with
+
+    python -m pynumstim.server --port 8765
+
+and use `RenderClient` in the experiment scripts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib import request
+
+from PIL import Image
+
+from ._math_problem import MathProblem
+from ._mplist import SimpleArithmeticList
+from ._render_stats import TProgress, print_progress
+from ._simple import SimpleArithmetic
+from ._two_step_problem import TwoStepArithmetic
+from .writer import _paste_centered, _problem_file, _tex_code
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 600.0  # seconds
+
+TParams = Tuple[int, str, str]  # resolution, fg, bg
+TKey = Tuple[str, int, str, str]  # tex code, resolution, fg, bg
+
+# identical to the preamble of `sympy.preview`, but one page per stimulus
+_PREAMBLE = r"""\documentclass[varwidth,12pt,multi=stimulus]{standalone}
+\usepackage{amsmath}
+\usepackage{amsfonts}
+
+\begin{document}
+"""
+
+
+class RenderServer(object):
+    """Local HTTP server that renders tex code to PNG images
+
+    Requests, which arrive within `batch_delay` seconds, are collected and
+    rendered with a single LaTeX and dvipng run per parameter set (up to
+    `batch_size` stimuli) in one of the worker processes. Rendered images
+    are kept in a cache (least recently used images are removed, if the
+    cache contains more than `cache_size` images).
+
+    Pending requests fail with a `RuntimeError`, if the server is closed.
+    The server binds to localhost by default and has no authentication.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        n_workers: Optional[int] = None,
+        batch_size: int = 32,
+        batch_delay: float = 0.01,
+        cache_size: int = 10000,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size has to be at least 1")
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.cache_size = cache_size
+        self.counter = {"requests": 0, "images": 0, "cache_hits": 0, "batches": 0,
+                        "rendered": 0}
+
+        self._cache: OrderedDict[TKey, bytes] = OrderedDict()
+        self._pending: Dict[TKey, Future] = {}
+        self._queue: queue.Queue[TKey] = queue.Queue()
+        self._lock = threading.Lock()
+        self._running = True
+
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=n_workers)
+        for _ in range(n_workers):  # start worker processes
+            self._executor.submit(_warm_up)
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.render_server = self  # type: ignore
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """stops the dispatcher and the worker processes. Pending requests
+        fail with a `RuntimeError`."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._dispatcher.join()
+        self._executor.shutdown(cancel_futures=True)
+        with self._lock:  # stimuli that have not been sent to a worker
+            err = RuntimeError("Render server has been closed")
+            for fut in self._pending.values():
+                fut.set_exception(err)
+            self._pending.clear()
+        self.httpd.server_close()
+
+    def shutdown(self) -> None:
+        """stops `serve_forever` (call from another thread)"""
+        self.httpd.shutdown()
+
+    def render(
+        self,
+        tex_codes: List[str],
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> List[bytes]:
+        """returns PNG data of the tex codes (blocking)
+
+        timeout: seconds to wait for the images (None: no limit)
+        """
+        futures = []
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Render server has been closed")
+            self.counter["requests"] += 1
+            self.counter["images"] += len(tex_codes)
+            for tex in tex_codes:
+                key = (tex, resolution, fg, bg)
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = Future()
+                    png = self._cache.get(key)
+                    if png is None:
+                        self._pending[key] = fut
+                        self._queue.put(key)
+                    else:
+                        self._cache.move_to_end(key)
+                        self.counter["cache_hits"] += 1
+                        fut.set_result(png)
+                futures.append(fut)
+        return [f.result(timeout=timeout) for f in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rtn: Dict[str, Any] = dict(self.counter)
+            rtn["cache_size"] = len(self._cache)
+            rtn["pending"] = len(self._pending)
+        return rtn
+
+    def _dispatch(self) -> None:
+        """collects pending stimuli and sends batches to the workers"""
+        while self._running:
+            try:
+                keys = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            deadline = time.perf_counter() + self.batch_delay
+            while self._running:
+                wait = min(deadline - time.perf_counter(), 0.1)
+                if wait <= 0:
+                    break
+                try:
+                    keys.append(self._queue.get(timeout=wait))
+                except queue.Empty:
+                    if time.perf_counter() >= deadline:
+                        break
+            if not self._running:
+                break  # pending stimuli fail in close()
+
+            batches: Dict[TParams, List[str]] = {}
+            for tex, *params in keys:
+                batches.setdefault(tuple(params), []).append(tex)  # type: ignore
+            for params, codes in batches.items():
+                for i in range(0, len(codes), self.batch_size):
+                    self._submit(codes[i : i + self.batch_size], params)
+
+    def _submit(self, tex_codes: List[str], params: TParams) -> None:
+        try:
+            worker = self._executor.submit(_render_batch, tex_codes, *params)
+        except RuntimeError as err:  # executor has been shut down
+            self._done(tex_codes, params, [err] * len(tex_codes))
+            return
+        with self._lock:
+            self.counter["batches"] += 1
+
+        def callback(f: Future) -> None:
+            if f.cancelled():
+                err = RuntimeError("Render server has been closed")
+            else:
+                err = f.exception()
+            if err is None:
+                self._done(tex_codes, params, f.result())
+            else:
+                self._done(tex_codes, params, [err] * len(tex_codes))
+
+        worker.add_done_callback(callback)
+
+    def _done(
+        self,
+        tex_codes: List[str],
+        params: TParams,
+        results: List[Union[bytes, BaseException]],
+    ) -> None:
+        with self._lock:
+            for tex, png in zip(tex_codes, results):
+                key = (tex, *params)
+                fut = self._pending.pop(key, None)
+                if fut is None:  # failed by close()
+                    continue
+                if isinstance(png, BaseException):
+                    fut.set_exception(png)
+                    continue
+                self.counter["rendered"] += 1
+                self._cache[key] = png  # type: ignore
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                fut.set_result(png)
+
+
+class RenderClient(object):
+    """Client of a `RenderServer`. The methods mirror the functions of the
+    `writer` module.
+    """
+
+    def __init__(
+        self,
+        url: str = f"http://127.0.0.1:{DEFAULT_PORT}",
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def render(
+        self,
+        tex_codes: List[str],
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+    ) -> List[bytes]:
+        """returns PNG data of the tex codes"""
+        data = json.dumps(
+            {"tex": tex_codes, "resolution": resolution, "fg": fg, "bg": bg}
+        ).encode()
+        rtn = self._request("/render", data)
+        return [base64.b64decode(x) for x in rtn["images"]]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request("/stats")
+
+    def tex_to_pillow(
+        self,
+        source: Union[str, MathProblem],
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+        background_image: Optional[Image.Image] = None,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> Image.Image:
+        if isinstance(source, MathProblem):
+            source = _tex_code(source)
+        png = self.render([source], resolution=resolution, fg=fg, bg=bg)[0]
+        im = Image.open(io.BytesIO(png)).convert("RGBA")
+        if isinstance(background_image, Image.Image):
+            return _paste_centered(im, background_image, offset)
+        else:
+            return im
+
+    def tex_to_image(
+        self,
+        source: Union[str, MathProblem],
+        path: Optional[Union[Path, str]] = None,
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+        background_image: Optional[Image.Image] = None,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> str:
+        if path is None:
+            if isinstance(source, MathProblem):
+                path = source.label() + ".png"
+            else:
+                raise ValueError(
+                    f"Path is required, if you create images from {type(source)}"
+                )
+        if isinstance(source, MathProblem):
+            os.makedirs(path, exist_ok=True)  # folder, see `writer.tex_to_image`
+            path, source = _problem_file(source, path)
+        if isinstance(background_image, Image.Image):
+            self.tex_to_pillow(
+                source, resolution=resolution, fg=fg, bg=bg,
+                background_image=background_image, offset=offset,
+            ).save(path)
+        else:
+            png = self.render([source], resolution=resolution, fg=fg, bg=bg)[0]
+            with open(path, "wb") as fl:
+                fl.write(png)
+        return str(path)
+
+    def problem_list_to_images(
+        self,
+        problems: SimpleArithmeticList | List[TwoStepArithmetic] | List[SimpleArithmetic],
+        folder: Union[Path, str],
+        resolution: int = 400,
+        fg: str = "White",
+        bg: str = "Transparent",
+        background_image: Optional[Image.Image] = None,
+        progress: Optional[TProgress] = print_progress,
+    ) -> List[str]:
+        """renders all problems with a single request
+
+        returns list of the saved files
+        """
+        os.makedirs(folder, exist_ok=True)
+        if isinstance(problems, SimpleArithmeticList):
+            problem_list = problems.list
+        else:
+            problem_list = problems
+        files: Dict[str, str] = {}  # tex code: filename
+        for x in problem_list:
+            flname, tex_code = _problem_file(x, folder)
+            files[tex_code] = flname
+        pngs = self.render(list(files.keys()), resolution=resolution, fg=fg, bg=bg)
+
+        rtn = []
+        for i, ((tex_code, flname), png) in enumerate(zip(files.items(), pngs)):
+            if progress is not None:
+                progress(os.path.basename(flname), i + 1, len(files))
+            if isinstance(background_image, Image.Image):
+                im = Image.open(io.BytesIO(png)).convert("RGBA")
+                _paste_centered(im, background_image.copy()).save(flname)
+            else:
+                with open(flname, "wb") as fl:
+                    fl.write(png)
+            rtn.append(flname)
+        return rtn
+
+    def _request(self, path: str, data: Optional[bytes] = None) -> Dict[str, Any]:
+        req = request.Request(
+            self.url + path, data=data, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except request.HTTPError as err:
+            msg = json.loads(err.read()).get("error", str(err))
+            raise RuntimeError(f"Render server: {msg}") from err
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv: RenderServer = self.server.render_server  # type: ignore
+        if self.path == "/stats":
+            self._send(200, srv.stats())
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        srv: RenderServer = self.server.render_server  # type: ignore
+        if self.path != "/render":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            pngs = srv.render(
+                [str(x) for x in req["tex"]],
+                resolution=int(req.get("resolution", 400)),
+                fg=str(req.get("fg", "White")),
+                bg=str(req.get("bg", "Transparent")),
+            )
+        except (ValueError, KeyError, TypeError) as err:
+            self._send(400, {"error": str(err)})
+            return
+        except FutureTimeoutError:
+            self._send(504, {"error": "Rendering timed out"})
+            return
+        except (RuntimeError, OSError) as err:
+            self._send(500, {"error": str(err)})
+            return
+        self._send(200, {"images": [base64.b64encode(x).decode() for x in pngs]})
+
+    def _send(self, code: int, content: Dict[str, Any]):
+        data = json.dumps(content).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _warm_up() -> None:
+    """runs LaTeX once to load the TeX format and fonts into the OS cache"""
+    try:
+        _latex_pages(["$$1$$"], 100, "Black", "Transparent")
+    except RuntimeError:
+        pass  # errors are reported with the first request
+
+
+def _render_batch(
+    tex_codes: List[str], resolution: int, fg: str, bg: str
+) -> List[Union[bytes, RuntimeError]]:
+    """renders the tex codes with a single latex and dvipng run. If the
+    batch fails, the stimuli are rendered separately to find the invalid
+    tex codes.
+
+    returns PNG data or the error of each stimulus
+    """
+    try:
+        return list(_latex_pages(tex_codes, resolution, fg, bg))
+    except RuntimeError as err:
+        if len(tex_codes) == 1:
+            return [err]
+    rtn: List[Union[bytes, RuntimeError]] = []
+    for tex in tex_codes:
+        rtn += _render_batch([tex], resolution, fg, bg)
+    return rtn
+
+
+def _latex_pages(
+    tex_codes: List[str], resolution: int, fg: str, bg: str
+) -> List[bytes]:
+    """latex to PNG, one page per tex code"""
+    body = "\n".join(
+        f"\\begin{{stimulus}}\n{tex}\n\\end{{stimulus}}" for tex in tex_codes
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        Path(workdir, "texput.tex").write_text(
+            _PREAMBLE + body + "\n\n\\end{document}", encoding="utf-8"
+        )
+        for cmd in (
+            ["latex", "-halt-on-error", "-interaction=nonstopmode", "texput.tex"],
+            ["dvipng", "-D", str(resolution), "-fg", fg, "-bg", bg,
+             "-o", "texput%d.png", "texput.dvi"],
+        ):
+            try:
+                subprocess.run(cmd, cwd=workdir, check=True, capture_output=True)
+            except FileNotFoundError as err:
+                raise RuntimeError(f"{cmd[0]} is not installed") from err
+            except subprocess.CalledProcessError as err:
+                raise RuntimeError(
+                    f"'{cmd[0]}' exited abnormally with the following output:\n"
+                    + err.stdout.decode(errors="replace")
+                ) from err
+        n_pages = len(list(Path(workdir).glob("texput*.png")))
+        if n_pages != len(tex_codes):  # pages can't be assigned to tex codes
+            raise RuntimeError(
+                f"dvipng created {n_pages} pages for {len(tex_codes)} stimuli"
+            )
+        return [
+            Path(workdir, f"texput{i}.png").read_bytes()
+            for i in range(1, len(tex_codes) + 1)
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pynumstim render server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-delay", type=float, default=0.01,
+                        help="seconds to collect requests for a batch")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="maximum number of cached images")
+    args = parser.parse_args()
+
+    srv = RenderServer(
+        host=args.host,
+        port=args.port,
+        n_workers=args.workers,
+        batch_size=args.batch_size,
+        batch_delay=args.batch_delay,
+        cache_size=args.cache_size,
+    )
+    print(f"pynumstim render server: {srv.url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
 import io
 import os
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+from numpy.typing import NDArray
 from PIL import Image
-from sympy import preview
 
+from ._atlas import save_atlas
+from ._manifest import BuildManifest, image_hash
+from ._mask import TColorSpec, colorize
 from ._math_problem import LaTexProblem, MathProblem
 from ._mplist import SimpleArithmeticList
+from ._renderer import Renderer
+from ._render_stats import RenderStats, TProgress, measure, print_progress
 from ._simple import LATEX_SYMBOL_NAMES, SimpleArithmetic
 from ._two_step_problem import TwoStepArithmetic
 
@@ -19,7 +25,14 @@ def tex_to_pillow(
     bg: str = "Transparent",
     background_image: Optional[Image.Image] = None,
     offset: Tuple[int, int] = (0, 0),
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
 ) -> Image.Image:
+    """stats: optional RenderStats object to collect the duration of the
+        render stages
+    renderer: renderer backend, e.g. `FontRenderer()` for fast rendering
+        without LaTeX. If None, LaTeX and dvipng are used.
+    """
     if isinstance(source, MathProblem):
         if isinstance(source, LaTexProblem):
             tex_code = source.tex()
@@ -33,23 +46,49 @@ def tex_to_pillow(
             bg=bg,
             background_image=background_image,
             offset=offset,
+            stats=stats,
+            renderer=renderer,
         )
 
     elif isinstance(source, str):
-        im = _from_tex_pillow(source, resolution=resolution, fg=fg, bg=bg)
+        im = _from_tex_pillow(source, resolution=resolution, fg=fg, bg=bg, stats=stats,
+                             renderer=renderer)
         if isinstance(background_image, Image.Image):
-            canvas_size = background_image.size
-            position = (
-                (canvas_size[0] - im.size[0]) // 2,
-                (canvas_size[1] - im.size[1]) // 2,
-            )
-            position = (position[0] + offset[0], position[1] + offset[1])
-            background_image.paste(im, position, im)
-            return background_image
+            with measure(stats, "composite"):
+                return _paste_centered(im, background_image, offset)
         else:
             return im
 
 
+def tex_to_array(
+    source: Union[str, MathProblem],
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
+) -> NDArray[np.uint8]:
+    """renders the source in memory and returns a read-only RGBA array
+    (height, width, 4)
+
+    This is a convenience wrapper of `np.asarray(tex_to_pillow(source))`
+    and does not save copies: the PNG is decoded by Pillow and copied into
+    the array. Use `problem_list_to_arrays` to render many stimuli.
+
+    stats: optional RenderStats object to collect the duration of the
+        render stages
+    renderer: renderer backend, e.g. `FontRenderer()` for fast rendering
+        without LaTeX. If None, LaTeX and dvipng are used.
+    """
+    if isinstance(source, MathProblem):
+        tex_code = _tex_code(source)
+    else:
+        tex_code = source
+    return _from_tex_array(
+        tex_code, resolution=resolution, fg=fg, bg=bg, stats=stats, renderer=renderer
+    )
+
+
 def tex_to_image(
     source: Union[str, MathProblem],
     path: Optional[Union[Path, str]] = None,
@@ -59,7 +98,14 @@ def tex_to_image(
     bg: str = "Transparent",
     background_image: Optional[Image.Image] = None,
     offset: Tuple[int, int] = (0, 0),
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
 ) -> str:
+    """stats: optional RenderStats object to collect the duration of the
+        render stages
+    renderer: renderer backend, e.g. `FontRenderer()` for fast rendering
+        without LaTeX. If None, LaTeX and dvipng are used.
+    """
     if path is None:
         if isinstance(source, MathProblem):
             path = source.label() + ".png"  # use label
@@ -78,6 +124,8 @@ def tex_to_image(
             bg=bg,
             background_image=background_image,
             offset=offset,
+            stats=stats,
+            renderer=renderer,
         )
     elif isinstance(source, str):
         if isinstance(background_image, Image.Image):
@@ -85,10 +133,16 @@ def tex_to_image(
                 resolution=resolution,
                 fg=fg,bg=bg,
                 background_image=background_image,
-                offset=offset)
-            im.save(path)
+                offset=offset,
+                stats=stats,
+                renderer=renderer)
+            with measure(stats, "write"):
+                im.save(path)
+            if stats is not None:
+                stats.add_bytes("write", os.path.getsize(path))
         else:
-            _from_tex(source, filename=path, resolution=resolution, fg=fg, bg=bg)
+            _from_tex(source, filename=path, resolution=resolution, fg=fg, bg=bg,
+                      stats=stats, renderer=renderer)
 
     return str(path)
 
@@ -101,25 +155,60 @@ def problem_list_to_images(
     fg: str = "White",
     bg: str = "Transparent",
     background_image: Optional[Image.Image] = None,
-):
-    """segmented: single files for each number and operation"""
+    stats: Optional[RenderStats] = None,
+    progress: Optional[TProgress] = print_progress,
+    renderer: Optional[Renderer] = None,
+    incremental: bool = False,
+    prune: bool = False,
+) -> List[str]:
+    """segmented: single files for each number and operation
+
+    stats: optional RenderStats object to collect the duration of the
+        render stages
+    renderer: renderer backend, e.g. `FontRenderer()` for fast rendering
+        without LaTeX. If None, LaTeX and dvipng are used.
+    progress: callback function `progress(label, counter, total)`, which is
+        called for each image. Default prints the labels.
+    incremental: if True, only new stimuli or stimuli with changed
+        parameters will be rendered. The parameters of all stimuli are
+        stored in a manifest file in the folder (see `BuildManifest`).
+    prune: if True (and incremental), files of previous builds that are
+        not part of the current build will be removed
+
+    returns list of the rendered files
+    """
     # make pictures
     os.makedirs(folder, exist_ok=True)
     if isinstance(problems, SimpleArithmeticList):
         problem_list = problems.list
     else:
         problem_list = problems
+    if incremental:
+        manifest = BuildManifest(folder)
+    else:
+        manifest = None
+    rendered = []
 
     if not segmented:
+        bkg_hash = image_hash(background_image)
         done = set()
-        for x in problem_list:
-            print("png: ", x.label())
-            if x.label() not in done:
+        for i, x in enumerate(problem_list):
+            if progress is not None:
+                progress(x.label(), i + 1, len(problem_list))
+            if x.key() not in done:
+                done.add(x.key())
+                if manifest is not None:
+                    flname, tex_code = _problem_file(x, folder)
+                    entry = manifest.entry(
+                        x.label(), tex_code, resolution, fg, bg, bkg_hash, renderer
+                    )
+                    if manifest.is_current(flname, entry):
+                        continue
                 if isinstance(background_image, Image.Image):
                     bkg = background_image.copy()
                 else:
                     bkg = None
-                _from_problem(
+                flname = _from_problem(
                     x,
                     folder=folder,
                     segmented=False,
@@ -127,14 +216,24 @@ def problem_list_to_images(
                     fg=fg,
                     bg=bg,
                     background_image=bkg,
+                    stats=stats,
+                    renderer=renderer,
                 )
-                done.add(x.label())
+                rendered.append(flname)
     else:
         if background_image is not None:
             raise ValueError(
                 "background images only possible for not segmented problems"
             )
-        _create_opertion_symbols(folder=folder, resolution=resolution, fg=fg, bg=bg)
+        rendered += _create_opertion_symbols(
+            folder=folder,
+            resolution=resolution,
+            fg=fg,
+            bg=bg,
+            stats=stats,
+            renderer=renderer,
+            manifest=manifest,
+        )
         # problem_stimuli
         stim = set()
         for x in problem_list:
@@ -143,15 +242,297 @@ def problem_list_to_images(
             if x.result is not None:
                 stim.add((x.result.tex(), x.result.label()))
 
-        for tex, label in stim:
-            print("png: " + label)
+        for i, (tex, label) in enumerate(stim):
+            if progress is not None:
+                progress(label, i + 1, len(stim))
+            flname = os.path.join(folder, "n" + f"{label}.png")
+            if manifest is not None:
+                entry = manifest.entry(
+                    label, f"$${tex}$$", resolution, fg, bg, renderer=renderer
+                )
+                if manifest.is_current(flname, entry):
+                    continue
             _from_tex(
                 f"$${tex}$$",
-                filename=os.path.join(folder, "n" + f"{label}.png"),
+                filename=flname,
+                resolution=resolution,
+                fg=fg,
+                bg=bg,
+                stats=stats,
+                renderer=renderer,
+            )
+            rendered.append(flname)
+
+    if manifest is not None:
+        manifest.save(prune=prune)
+    return rendered
+
+
+def problem_list_to_atlas(
+    problems: SimpleArithmeticList | List[TwoStepArithmetic] | List[SimpleArithmetic],
+    filename: Union[Path, str],
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    background_image: Optional[Image.Image] = None,
+    max_size: int = 4096,
+    padding: int = 2,
+    stats: Optional[RenderStats] = None,
+    progress: Optional[TProgress] = print_progress,
+    renderer: Optional[Renderer] = None,
+) -> List[str]:
+    """renders all problems and packs them into one or a few images (texture
+    atlas) to speed up the loading of the stimuli
+
+    filename: name of the JSON index file with the rectangles of the problems
+        (labels). The atlas pages are saved as PNG files in the same
+        folder (`{name}_0.png`, `{name}_1.png`, ...).
+    max_size: maximum width and height of an atlas page
+    padding: space between the stimuli in pixel
+    renderer: renderer backend (see `tex_to_pillow`)
+
+    Use `TextureAtlas` to load the atlas.
+
+    returns list of the saved files
+    """
+    if isinstance(problems, SimpleArithmeticList):
+        problem_list = problems.list
+    else:
+        problem_list = problems
+
+    images = {}
+    for i, x in enumerate(problem_list):
+        if progress is not None:
+            progress(x.label(), i + 1, len(problem_list))
+        if x.label() not in images:
+            if isinstance(background_image, Image.Image):
+                bkg = background_image.copy()
+            else:
+                bkg = None
+            images[x.label()] = tex_to_pillow(
+                x,
                 resolution=resolution,
                 fg=fg,
                 bg=bg,
+                background_image=bkg,
+                stats=stats,
+                renderer=renderer,
+            )
+    with measure(stats, "write"):
+        rtn = save_atlas(images, filename, max_size=max_size, padding=padding)
+    if stats is not None:
+        stats.add_bytes("write", sum(os.path.getsize(x) for x in rtn))
+    return rtn
+
+
+def problem_list_to_arrays(
+    problems: SimpleArithmeticList | List[TwoStepArithmetic] | List[SimpleArithmetic],
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stack: bool = False,
+    align: str = "center",
+    stats: Optional[RenderStats] = None,
+    progress: Optional[TProgress] = print_progress,
+    renderer: Optional[Renderer] = None,
+) -> List[NDArray[np.uint8]] | NDArray[np.uint8]:
+    """renders all problems in memory (see `tex_to_array`)
+
+    Identical problems are rendered and decoded only once and share the
+    same array. With `stack=True`, each distinct image is copied once into
+    the batch array, no Pillow images are composited.
+
+    stack: if True, the images are returned as a single array
+        (n_problems, height, width, 4) with the size of the largest image.
+        Smaller images are padded with transparent pixels.
+    align: position of smaller images in the stacked array, "center" or
+        "topleft"
+    renderer: renderer backend (see `tex_to_pillow`)
+
+    returns list of RGBA arrays or the stacked array
+    """
+    if align not in ("center", "topleft"):
+        raise ValueError(f"Unknown alignment: {align}")
+    if isinstance(problems, SimpleArithmeticList):
+        problem_list = problems.list
+    else:
+        problem_list = problems
+
+    arrays = {}
+    rtn = []
+    for i, x in enumerate(problem_list):
+        if progress is not None:
+            progress(x.label(), i + 1, len(problem_list))
+        if x.key() not in arrays:
+            arrays[x.key()] = tex_to_array(
+                x, resolution=resolution, fg=fg, bg=bg, stats=stats,
+                renderer=renderer,
             )
+        rtn.append(arrays[x.key()])
+    if not stack:
+        return rtn
+
+    with measure(stats, "composite"):
+        height = max([a.shape[0] for a in rtn], default=0)
+        width = max([a.shape[1] for a in rtn], default=0)
+        batch = np.zeros((len(rtn), height, width, 4), dtype=np.uint8)
+        for i, a in enumerate(rtn):
+            h, w = a.shape[:2]
+            if align == "center":
+                y, x = (height - h) // 2, (width - w) // 2
+            else:
+                y, x = 0, 0
+            batch[i, y : y + h, x : x + w] = a
+    return batch
+
+
+def tex_to_mask(
+    source: Union[str, MathProblem],
+    resolution: int = 400,
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
+) -> NDArray[np.uint8]:
+    """renders the source once as grayscale coverage mask (height, width),
+    i.e. the alpha channel of the stimulus on a transparent background.
+
+    Use `colorize(mask, fg, bg)` to create colored RGBA images from the mask
+    without rendering the stimulus again.
+    """
+    return tex_to_array(
+        source, resolution=resolution, fg="White", bg="Transparent", stats=stats,
+        renderer=renderer,
+    )[..., 3]
+
+
+def problem_list_to_color_variants(
+    problems: SimpleArithmeticList | List[TwoStepArithmetic] | List[SimpleArithmetic],
+    folder: Union[Path, str],
+    colors: Dict[str, Tuple[TColorSpec, TColorSpec]],
+    resolution: int = 400,
+    stats: Optional[RenderStats] = None,
+    progress: Optional[TProgress] = print_progress,
+    renderer: Optional[Renderer] = None,
+) -> Dict[str, List[str]]:
+    """creates images of the problems in several color schemes
+
+    Each problem is rendered only once as coverage mask (see `tex_to_mask`)
+    and recolored for all color schemes, that is, N variants require one
+    LaTeX run and N array operations.
+
+    colors: dict of color schemes, name: (fg, bg), e.g.
+        `{"dark": ("White", "Black"), "light": ("Black", "White")}`. The
+        images of each scheme are saved in the subfolder `name`.
+
+    returns dict of the lists of the created files for each color scheme
+    """
+    if len(colors) == 0:
+        raise ValueError("No color schemes defined")
+    if isinstance(problems, SimpleArithmeticList):
+        problem_list = problems.list
+    else:
+        problem_list = problems
+    for name in colors:
+        os.makedirs(os.path.join(folder, name), exist_ok=True)
+
+    rtn: Dict[str, List[str]] = {name: [] for name in colors}
+    done = set()
+    for i, x in enumerate(problem_list):
+        if progress is not None:
+            progress(x.label(), i + 1, len(problem_list))
+        if x.key() in done:
+            continue
+        done.add(x.key())
+        mask = tex_to_mask(x, resolution=resolution, stats=stats, renderer=renderer)
+        for name, (fg, bg) in colors.items():
+            flname = _problem_file(x, os.path.join(folder, name))[0]
+            with measure(stats, "composite"):
+                im = Image.fromarray(colorize(mask, fg, bg), "RGBA")
+            with measure(stats, "write"):
+                im.save(flname)
+            if stats is not None:
+                stats.add_bytes("write", os.path.getsize(flname))
+            rtn[name].append(flname)
+    return rtn
+
+
+def tex_to_resolutions(
+    source: Union[str, MathProblem],
+    resolutions: Sequence[int],
+    fg: str = "White",
+    bg: str = "Transparent",
+    master_resolution: Optional[int] = None,
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
+) -> Dict[int, Image.Image]:
+    """renders the source once as high-resolution master and creates the
+    images for all resolutions by downsampling the master
+
+    master_resolution: resolution of the master image. If None, the
+        highest of the requested resolutions is used.
+
+    returns dict of RGBA images for each resolution
+    """
+    if len(resolutions) == 0:
+        raise ValueError("No resolutions defined")
+    if master_resolution is None:
+        master_resolution = max(resolutions)
+    elif master_resolution < max(resolutions):
+        raise ValueError(
+            "Master resolution must not be smaller than the requested resolutions"
+        )
+    if isinstance(source, MathProblem):
+        source = _tex_code(source)
+    master = _from_tex_pillow(source, resolution=master_resolution, fg=fg, bg=bg,
+                              stats=stats, renderer=renderer)
+    return {r: _resample(master, r / master_resolution, stats) for r in resolutions}
+
+
+def problem_list_to_resolutions(
+    problems: SimpleArithmeticList | List[TwoStepArithmetic] | List[SimpleArithmetic],
+    folder: Union[Path, str],
+    resolutions: Sequence[int],
+    fg: str = "White",
+    bg: str = "Transparent",
+    master_resolution: Optional[int] = None,
+    stats: Optional[RenderStats] = None,
+    progress: Optional[TProgress] = print_progress,
+    renderer: Optional[Renderer] = None,
+) -> Dict[int, List[str]]:
+    """creates images of the problems in several resolutions (see
+    `tex_to_resolutions`), each problem is rendered only once.
+
+    The images of each resolution are saved in the subfolder `<resolution>dpi`.
+
+    returns dict of the lists of the created files for each resolution
+    """
+    if isinstance(problems, SimpleArithmeticList):
+        problem_list = problems.list
+    else:
+        problem_list = problems
+    folders = {r: os.path.join(folder, f"{r}dpi") for r in resolutions}
+    for x in folders.values():
+        os.makedirs(x, exist_ok=True)
+
+    rtn: Dict[int, List[str]] = {r: [] for r in resolutions}
+    done = set()
+    for i, x in enumerate(problem_list):
+        if progress is not None:
+            progress(x.label(), i + 1, len(problem_list))
+        if x.key() in done:
+            continue
+        done.add(x.key())
+        images = tex_to_resolutions(
+            x, resolutions, fg=fg, bg=bg, master_resolution=master_resolution,
+            stats=stats, renderer=renderer,
+        )
+        for r, im in images.items():
+            flname = _problem_file(x, folders[r])[0]
+            with measure(stats, "write"):
+                im.save(flname)
+            if stats is not None:
+                stats.add_bytes("write", os.path.getsize(flname))
+            rtn[r].append(flname)
+    return rtn
 
 
 def _from_tex(
@@ -160,31 +541,129 @@ def _from_tex(
     resolution: int = 400,
     fg: str = "White",
     bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
 ) -> None:
     """latex to PNG"""
-    return preview(
-        tex_str,
-        dvioptions=["-D", str(resolution), "-fg", fg, "-bg", bg],
-        viewer="file",
-        filename=filename,
-        euler=False,
-    )
+    if renderer is not None:
+        im = _render(renderer, tex_str, resolution=resolution, fg=fg, bg=bg,
+                     stats=stats)
+        with measure(stats, "write"):
+            im.save(filename)
+        if stats is not None:
+            stats.add_bytes("write", os.path.getsize(filename))
+        return
+
+    from sympy import preview  # slow import, only required for rendering
+
+    with measure(stats, "tex"):
+        preview(
+            tex_str,
+            dvioptions=["-D", str(resolution), "-fg", fg, "-bg", bg],
+            viewer="file",
+            filename=filename,
+            euler=False,
+        )
+    if stats is not None:
+        stats.add_bytes("tex", os.path.getsize(filename))
+
+
+def _from_tex_png(
+    tex_str: str,
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+) -> io.BytesIO:
+    """latex to PNG in memory"""
+    from sympy import preview
+
+    buf = io.BytesIO()
+    with measure(stats, "tex"):
+        preview(
+            tex_str,
+            dvioptions=["-D", str(resolution), "-fg", fg, "-bg", bg],
+            viewer="BytesIO",
+            outputbuffer=buf,
+            euler=False,
+        )
+    if stats is not None:
+        stats.add_bytes("tex", buf.tell())
+    buf.seek(0)
+    return buf
 
 
 def _from_tex_pillow(
-    tex_str: str, resolution: int = 400, fg: str = "White", bg: str = "Transparent"
+    tex_str: str,
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
 ) -> Image.Image:
     """latex to Image.Image"""
-    buf = io.BytesIO()
-    preview(
-        tex_str,
-        dvioptions=["-D", str(resolution), "-fg", fg, "-bg", bg],
-        viewer="BytesIO",
-        outputbuffer=buf,
-        euler=False,
+    if renderer is not None:
+        return _render(renderer, tex_str, resolution=resolution, fg=fg, bg=bg,
+                       stats=stats)
+    buf = _from_tex_png(tex_str, resolution=resolution, fg=fg, bg=bg, stats=stats)
+    with measure(stats, "decode"):
+        return Image.open(buf).convert("RGBA")
+
+
+def _from_tex_array(
+    tex_str: str,
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
+) -> NDArray[np.uint8]:
+    """latex to RGBA array"""
+    if renderer is not None:
+        return np.asarray(_render(renderer, tex_str, resolution=resolution, fg=fg,
+                                  bg=bg, stats=stats))
+    buf = _from_tex_png(tex_str, resolution=resolution, fg=fg, bg=bg, stats=stats)
+    with measure(stats, "decode"):
+        with Image.open(buf) as im:
+            if im.mode != "RGBA":
+                im = im.convert("RGBA")
+            return np.asarray(im)  # copies the image data
+
+
+def _render(
+    renderer: Renderer,
+    tex_str: str,
+    resolution: int = 400,
+    fg: str = "White",
+    bg: str = "Transparent",
+    stats: Optional[RenderStats] = None,
+) -> Image.Image:
+    with measure(stats, "draw"):
+        return renderer.render(tex_str, resolution=resolution, fg=fg, bg=bg)
+
+
+def _resample(
+    im: Image.Image, scale: float, stats: Optional[RenderStats] = None
+) -> Image.Image:
+    """downsampled image (Lanczos filter, alpha is premultiplied by Pillow)"""
+    if scale == 1:
+        return im
+    size = (max(1, round(im.size[0] * scale)), max(1, round(im.size[1] * scale)))
+    with measure(stats, "resample"):
+        return im.resize(size, Image.Resampling.LANCZOS)
+
+
+def _paste_centered(
+    im: Image.Image, background_image: Image.Image, offset: Tuple[int, int] = (0, 0)
+) -> Image.Image:
+    """pastes the image in the center (plus offset) of the background image"""
+    canvas_size = background_image.size
+    position = (
+        (canvas_size[0] - im.size[0]) // 2 + offset[0],
+        (canvas_size[1] - im.size[1]) // 2 + offset[1],
     )
-    buf.seek(0)
-    return Image.open(buf).convert("RGBA")
+    background_image.paste(im, position, im)
+    return background_image
 
 
 def _from_problem(
@@ -196,6 +675,8 @@ def _from_problem(
     bg: str = "Transparent",
     background_image: Optional[Image.Image] = None,
     offset: Tuple[int, int] = (0, 0),
+    stats: Optional[RenderStats] = None,
+    renderer: Optional[Renderer] = None,
 ) -> str:
     """returns the filename"""
 
@@ -203,18 +684,13 @@ def _from_problem(
         raise ValueError("background images only possible for not segmented problems")
 
     os.makedirs(folder, exist_ok=True)
-    if isinstance(problem, LaTexProblem):
-        flname = problem.label()
-        tex_code = problem.tex()
-    else:
-        flname = f"p{problem.label()}"
-        tex_code = f"$${problem.tex()}$$"
-    flname = os.path.join(folder, f"{flname}.png")
+    flname, tex_code = _problem_file(problem, folder)
 
     if not segmented:
         tex_to_image(tex_code, path=flname,
             resolution=resolution, fg=fg,bg=bg,
-            background_image=background_image, offset=offset)
+            background_image=background_image, offset=offset, stats=stats,
+            renderer=renderer)
     else:
         # segmented
         if not isinstance(problem, SimpleArithmetic):
@@ -224,36 +700,72 @@ def _from_problem(
             )
 
         os.makedirs(folder, exist_ok=True)
-        _create_opertion_symbols(folder, resolution=resolution, fg=fg, bg=bg)
+        _create_opertion_symbols(
+            folder, resolution=resolution, fg=fg, bg=bg, stats=stats,
+            renderer=renderer,
+        )
         stim = set()
         stim.add((problem.operand1.tex(), problem.operand1.label()))
         stim.add((problem.operand2.tex(), problem.operand2.label()))
         if problem.result is not None:
             stim.add((problem.result.tex(), problem.result.label()))
         for tex, label in stim:
-            print("png: " + label)
             _from_tex(
                 f"$${tex}$$",
                 filename=os.path.join(folder, "n" + f"{label}.png"),
                 resolution=resolution,
                 fg=fg,
                 bg=bg,
+                stats=stats,
+                renderer=renderer,
             )
     return flname
 
 
+def _problem_file(problem: MathProblem, folder: Union[Path, str]) -> Tuple[str, str]:
+    """returns filename and tex code of the problem image"""
+    if isinstance(problem, LaTexProblem):
+        flname = problem.label()
+    else:
+        flname = f"p{problem.label()}"
+    return os.path.join(folder, f"{flname}.png"), _tex_code(problem)
+
+
+def _tex_code(problem: MathProblem) -> str:
+    if isinstance(problem, LaTexProblem):
+        return problem.tex()
+    else:
+        return f"$${problem.tex()}$$"
+
+
 def _create_opertion_symbols(
     folder: Union[Path, str],
     resolution: int = 400,
     fg: str = "White",
     bg: str = "Transparent",
-):
+    stats: Optional[RenderStats] = None,
+    manifest: Optional[BuildManifest] = None,
+    renderer: Optional[Renderer] = None,
+) -> List[str]:
+    """returns list of the rendered files"""
     # create symbols, segmented
+    rtn = []
     for symbol, name in LATEX_SYMBOL_NAMES.items():
+        flname = os.path.join(folder, f"{name}.png")
+        if manifest is not None:
+            entry = manifest.entry(
+                name, f"$${symbol}$$", resolution, fg, bg, renderer=renderer
+            )
+            if manifest.is_current(flname, entry):
+                continue
         _from_tex(
             f"$${symbol}$$",
-            filename=os.path.join(folder, f"{name}.png"),
+            filename=flname,
             resolution=resolution,
             fg=fg,
             bg=bg,
+            stats=stats,
+            renderer=renderer,
         )
+        rtn.append(flname)
+    return rtn
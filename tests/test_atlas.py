@@ -0,0 +1,23 @@
+from pynumstim._atlas import pack
+
+
+def test_pack_shelves_and_pages():
+    rects, pages = pack({"a": (60, 40), "b": (60, 40), "c": (60, 40)}, max_size=100)
+    assert rects["a"][0] == 0
+    assert {r[0] for r in rects.values()} == {0, 1}
+    for page, x, y, w, h in rects.values():
+        assert x + w <= pages[page][0] <= 100
+        assert y + h <= pages[page][1] <= 100
+
+
+def test_pack_large_rectangles_get_own_page():
+    rects, pages = pack({"big": (150, 30), "a": (20, 20), "b": (20, 20)}, max_size=100)
+    assert rects["big"] == (0, 0, 0, 150, 30)
+    assert pages[0] == (150, 30)
+    assert rects["a"][0] == rects["b"][0] == 1
+    assert len(pages) == 2
+    rects, pages = pack({"a": (20, 40), "big": (30, 150)}, max_size=100)
+    assert rects["big"] == (0, 0, 0, 30, 150)
+    assert rects["a"][0] == 1 and len(pages) == 2
+    rects, pages = pack({"a": (20, 200), "big": (300, 150)}, max_size=100)
+    assert len(pages) == 2
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from pynumstim import Datasets, SimpleArithmeticList
+
+
+def _conditions():
+    lst = Datasets.problem_space("+", range(1, 10), range(1, 10))
+    for i, p in enumerate(lst.list):
+        p.properties = {"cat": "abc"[i % 3]}
+    return lst
+
+
+def test_balance_equals_one_way_anova():
+    lst = _conditions()
+    rtn = lst.balance("cat", attributes=["problem_size"])
+    groups = [
+        np.array([p.problem_size() for p in lst.list if p.properties["cat"] == c])
+        for c in "abc"
+    ]
+    values = np.concatenate(groups)
+    ssb = sum(len(g) * (g.mean() - values.mean()) ** 2 for g in groups)
+    ssw = sum(((g - g.mean()) ** 2).sum() for g in groups)
+    df1, df2 = len(groups) - 1, len(values) - len(groups)
+    f = (ssb / df1) / (ssw / df2)
+    p = (1 + df1 * f / df2) ** (-df2 / 2)  # F distribution with df1 = 2
+    assert rtn.loc["problem_size", "F"] == pytest.approx(f)
+    assert rtn.loc["problem_size", "p"] == pytest.approx(p)
+
+
+def test_balance_batch_empty():
+    rtn = SimpleArithmeticList.balance_batch([], "cat")
+    assert len(rtn) == 0
+    assert ("problem_size", "F") in rtn.columns
+    rtn = SimpleArithmeticList.balance_batch([SimpleArithmeticList()] * 2, "cat")
+    assert len(rtn) == 2 and rtn.isna().all().all()
+
+
+def test_balance_batch_unknown_grouping_attribute():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4))
+    with pytest.raises(ValueError, match="grouping attribute: 'cat'"):
+        SimpleArithmeticList.balance_batch([lst], "cat")
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from pynumstim import Datasets
+
+
+def test_lyons_bielock_deprecated_dict():
+    with pytest.warns(DeprecationWarning):
+        d = Datasets.Lyons_Bielock_12()
+    assert list(d.keys()) == ["correct", "too_small_result", "too_large_result"]
+    assert len(d["correct"]) == len(d["too_small_result"]) == 84
+    assert all(p.calc() == p.result for p in d["correct"])
+
+
+def test_lyons_bielock_list():
+    lst = Datasets.Lyons_Bielock_12_list()
+    assert len(lst) == 252
+    lst.set_results(5)
+    assert Datasets.Lyons_Bielock_12_list().is_correct().sum() == 84
+
+
+def test_two_step_list_seeded_with_random():
+    lst = Datasets.Lyons_Bielock_12_list()
+    random.seed(2)
+    a = list(lst.get_random(n=10).labels())
+    random.seed(2)
+    b = list(lst.get_random(n=10).labels())
+    assert a == b
+
+
+def test_read_dataset_user_file_not_cached(tmp_path):
+    flname = tmp_path / "problems.toml"
+    flname.write_text('[a]\nop1 = [1, 2]\nop2 = [3]\noperation = "+"\n')
+    assert len(Datasets.read_dataset(flname).list) == 2
+    flname.write_text('[a]\nop1 = [1, 2, 3]\nop2 = [3]\noperation = "+"\n')
+    assert len(Datasets.read_dataset(flname).list) == 3
+
+
+def test_read_dataset_bundled_copy():
+    lst = Datasets.read_dataset("Ahren_Jackson_79.toml")
+    n = len(lst.list)
+    lst.pop_random(n=1)
+    assert len(Datasets.Ahren_Jackson_79().list) == n
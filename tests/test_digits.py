@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+
+from pynumstim import SimpleArithmetic, SimpleArithmeticList
+from pynumstim import _digits
+
+OPERANDS = [-1234, -507, -99, -18, -7, 0, 3, 9, 10, 28, 95, 101, 999, 4567]
+
+
+def _scalar(op1, operation, op2):
+    rtn = SimpleArithmetic(op1, operation, op2).n_carry()
+    return -1 if rtn is None else rtn
+
+
+def test_n_carry_equals_scalar_analysis():
+    pairs = list(itertools.product(OPERANDS, repeat=2))
+    op1 = np.array([a for a, _ in pairs])
+    op2 = np.array([b for _, b in pairs])
+    for operation in ("+", "-", "*"):
+        expected = [_scalar(a, operation, b) for a, b in pairs]
+        assert _digits.n_carry(op1, operation, op2).tolist() == expected, operation
+
+
+def test_n_borrow_equals_scalar_subtraction():
+    pairs = list(itertools.product(OPERANDS, repeat=2))
+    op1 = np.array([a for a, _ in pairs])
+    op2 = np.array([b for _, b in pairs])
+    expected = [_scalar(a, "-", b) for a, b in pairs]
+    assert _digits.n_borrow(op1, op2).tolist() == expected
+
+
+def test_list_n_carry_with_fractions():
+    lst = SimpleArithmeticList()
+    lst.append([SimpleArithmetic(-23, "+", 8), SimpleArithmetic("1/2", "+", 3),
+                SimpleArithmetic(1.5, "+", 3), SimpleArithmetic(58, "-", -7)])
+    assert lst.n_carry().tolist() == [
+        _scalar(-23, "+", 8), -1, -1, _scalar(58, "-", -7)
+    ]
@@ -0,0 +1,41 @@
+import random
+
+from pynumstim import Datasets
+from pynumstim.eprime import write_trial_lists
+
+
+def test_trial_lists_keep_global_random_state(tmp_path):
+    problems = Datasets.problem_space("+", range(1, 6), range(1, 6))
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    write_trial_lists(
+        problems,
+        str(tmp_path / "{braces}_{subject}.txt"),
+        procedure="trial",
+        subjects=2,
+        selection={"n": 5},
+        seed=3,
+        n_jobs=1,
+    )
+    assert random.random() == expected
+    assert (tmp_path / "{braces}_1.txt").exists()
+    assert (tmp_path / "{braces}_2.txt").exists()
+
+
+def test_trial_lists_reproducible(tmp_path):
+    problems = Datasets.problem_space("+", range(1, 6), range(1, 6))
+    contents = []
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        write_trial_lists(
+            problems,
+            str(tmp_path / folder / "list_{subject}.txt"),
+            procedure="trial",
+            subjects=1,
+            selection={"n_correct": 4, "n_smaller": 2, "n_larger": 2},
+            seed=3,
+            n_jobs=1,
+        )
+        contents.append((tmp_path / folder / "list_1.txt").read_text())
+    assert contents[0] == contents[1]
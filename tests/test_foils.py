@@ -0,0 +1,41 @@
+from pynumstim import Datasets
+
+
+def _problems():
+    lst = Datasets.problem_space("*", range(2, 10), range(2, 10))
+    lst.append(Datasets.problem_space("+", range(1, 10), range(1, 10)))
+    return lst
+
+
+def test_foils_are_incorrect():
+    for seed in range(5):
+        foils = _problems().make_foils(seed=seed)
+        assert len(foils.list) == len(_problems().list)
+        assert not any(p.is_correct() for p in foils.list)
+
+
+def test_sign_balance():
+    for seed in range(5):
+        # as far as possible, the strategy of a problem is preferred
+        foils = _problems().make_foils(seed=seed)
+        larger = sum(p.deviation() > 0 for p in foils.list)
+        assert abs(larger - len(foils.list) / 2) <= 3
+    foils = _problems().make_foils(strategies=["parity"], seed=1)
+    larger = sum(p.deviation() > 0 for p in foils.list)
+    assert abs(larger - len(foils.list) / 2) <= 0.5
+
+
+def test_operand_foils_are_positive():
+    lst = Datasets.problem_space("*", range(1, 10), range(1, 10))
+    for seed in range(10):
+        foils = lst.make_foils(strategies=["operand"], seed=seed)
+        assert all(p.result.py_number() > 0 for p in foils.list)
+        assert all(p.properties["foil"] == "operand" for p in foils.list)
+
+
+def test_seed_gives_same_foils():
+    a = [p.label() for p in _problems().make_foils(seed=4).list]
+    b = [p.label() for p in _problems().make_foils(seed=4).list]
+    c = [p.label() for p in _problems().make_foils(seed=5).list]
+    assert a == b
+    assert a != c
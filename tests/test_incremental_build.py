@@ -0,0 +1,46 @@
+import os
+
+from pynumstim import FontRenderer, SimpleArithmetic
+from pynumstim import writer
+
+
+def _build(problems, folder, **kwargs):
+    return writer.problem_list_to_images(
+        problems, folder, renderer=FontRenderer(), progress=None, incremental=True,
+        **kwargs,
+    )
+
+
+def _names(files):
+    return sorted(os.path.basename(x) for x in files)
+
+
+def test_incremental_build_renders_changed_entries(tmp_path):
+    problems = [SimpleArithmetic(1, "+", 2), SimpleArithmetic(3, "*", 4, result=12)]
+    assert len(_build(problems, tmp_path)) == 2
+    assert _build(problems, tmp_path) == []
+
+    new = SimpleArithmetic(5, "-", 1)
+    rendered = _build(problems + [new], tmp_path)
+    assert _names(rendered) == ["p" + new.label() + ".png"]
+
+    # changed parameter: all entries are rendered again
+    assert len(_build(problems + [new], tmp_path, fg="Red")) == 3
+    assert _build(problems + [new], tmp_path, fg="Red") == []
+
+    os.remove(rendered[0])  # missing file
+    assert _build(problems + [new], tmp_path, fg="Red") == rendered
+
+
+def test_prune_removes_only_manifest_files(tmp_path):
+    problems = [SimpleArithmetic(1, "+", 2), SimpleArithmetic(3, "+", 4)]
+    files = _build(problems, tmp_path)
+    other = tmp_path / "other.png"
+    other.write_bytes(b"not part of any build")
+
+    _build(problems[:1], tmp_path, prune=True)
+    remaining = sorted(os.listdir(tmp_path))
+    assert os.path.basename(files[1]) not in remaining
+    assert os.path.basename(files[0]) in remaining
+    assert "other.png" in remaining
+    assert _build(problems[:1], tmp_path) == []
@@ -0,0 +1,9 @@
+import pynumstim
+
+
+def test_star_import_exports_lazy_names():
+    namespace = {}
+    exec("from pynumstim import *", namespace)
+    for name in ("Datasets", "SimpleArithmeticList", "TwoStepArithmeticList",
+                 "SimpleArithmetic", "Num", "MathProblem"):
+        assert namespace[name] is getattr(pynumstim, name)
@@ -0,0 +1,55 @@
+import math
+import pickle
+from fractions import Fraction
+
+from pynumstim import Num, SimpleArithmetic, SimpleArithmeticList
+
+
+def _numbers(p):
+    return [
+        None if x is None else (type(x.numerator), x.numerator, type(x.denominator), x.denominator)
+        for x in (p.operand1, p.operand2, p.result)
+    ]
+
+
+def _same_properties(a, b):
+    if a is None or b is None:
+        return a is b
+    if list(a.keys()) != list(b.keys()):
+        return False
+    for k in a:
+        x, y = a[k], b[k]
+        if isinstance(x, float) and math.isnan(x):
+            if not (isinstance(y, float) and math.isnan(y)):
+                return False
+        elif type(x) is not type(y) or x != y:
+            return False
+    return True
+
+
+def test_round_trip():
+    problems = [
+        SimpleArithmetic(Num(1, 2), "+", Fraction(3, 4)),
+        SimpleArithmetic(1.5, "*", 2, result=3.0, properties={"a": [1, 2]}),
+        SimpleArithmetic(2**70, "-", 1, result=2**70 - 1, properties={}),
+        SimpleArithmetic(-7, "-", 300, result=-307, properties={"z": None}),
+        SimpleArithmetic(3, "/", 4, properties={"n": float("nan"), "c": 1}),
+        SimpleArithmetic(3, "+", 4, properties={"c": True}),
+        SimpleArithmetic(3, "+", 4, properties={"c": 1.0}),
+    ]
+    lst = SimpleArithmeticList()
+    lst.append(problems)
+    rtn = pickle.loads(pickle.dumps(lst))
+    assert rtn.number_types == lst.number_types
+    assert len(rtn.list) == len(problems)
+    for a, b in zip(problems, rtn.list):
+        assert b.label() == a.label()
+        assert _numbers(b) == _numbers(a)
+        assert _same_properties(a.properties, b.properties)
+
+
+def test_round_trip_problem():
+    p = SimpleArithmetic(3, "t", 4, 7, {"a": 1})
+    rtn = pickle.loads(pickle.dumps(p))
+    assert rtn.label() == p.label()
+    assert rtn.properties == p.properties
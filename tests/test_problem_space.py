@@ -0,0 +1,50 @@
+import itertools
+
+from pynumstim import Datasets, Num, SimpleArithmetic
+
+
+def _reference(operation, operand1, operand2, incorrect_deviations, decade_results,
+               tie_problem, negative_results, carry_problems):
+    """problem space created problem by problem (previous implementation)"""
+    rtn = []
+    for op1 in operand1:
+        for op2 in operand2:
+            if not tie_problem and op1 == op2:
+                continue
+            for dev in {0, *incorrect_deviations}:
+                p = SimpleArithmetic(op1, operation, op2)
+                correct = p.calc()
+                result = correct + dev
+                if not decade_results and (result % 10 == 0 or correct % 10 == 0):
+                    continue
+                if not negative_results and (result < 0 or correct < 0):
+                    continue
+                n_carry = p.n_carry()
+                if not carry_problems and (n_carry is None or n_carry > 0):
+                    continue
+                p.result = Num(result)
+                rtn.append(p.label())
+    return sorted(rtn)
+
+
+def test_problem_space_equals_reference():
+    operands1 = [-12, -3, 0, 4, 7, 15, 28]
+    operands2 = [-5, 0, 3, 7, 16, 25]
+    deviations = [-10, -1, 2]
+    for operation in ("+", "-", "*"):
+        for flags in itertools.product((True, False), repeat=4):
+            decade, tie, negative, carry = flags
+            lst = Datasets.problem_space(
+                operation, operands1, operands2, incorrect_deviations=deviations,
+                decade_results=decade, tie_problem=tie, negative_results=negative,
+                carry_problems=carry,
+            )
+            expected = _reference(operation, operands1, operands2, deviations, *flags)
+            assert sorted(p.label() for p in lst.list) == expected, (operation, flags)
+
+
+def test_problem_space_in_parallel():
+    kwargs = dict(incorrect_deviations=[-2, 2], carry_problems=False)
+    serial = Datasets.problem_space("+", range(1, 60), range(1, 60), **kwargs)
+    parallel = Datasets.problem_space("+", range(1, 60), range(1, 60), n_jobs=2, **kwargs)
+    assert [p.label() for p in parallel.list] == [p.label() for p in serial.list]
@@ -0,0 +1,20 @@
+from pynumstim import SimpleArithmetic, SimpleArithmeticList
+
+
+def _list(values):
+    lst = SimpleArithmeticList()
+    for v in values:
+        lst.append(SimpleArithmetic(1, "+", 2, properties={"level": v}))
+    return lst
+
+
+def test_equal_values_of_different_types_are_distinct():
+    df = _list([True, 1, 1.0]).data_frame()
+    assert [type(x) for x in df["level"]] == [bool, int, float]
+
+
+def test_find_matches_equal_values():
+    lst = _list([True, 1, 1.0, 2])
+    assert len(lst.find(properties={"level": 1}).list) == 3
+    assert len(lst.find(properties={"level": 2}).list) == 1
+    assert len(lst.find(properties={"level": 3}).list) == 0
@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+
+import numpy as np
+
+from pynumstim import Datasets, SimpleArithmeticList
+from pynumstim import _sequence
+
+
+def _trials(n_per_category=32):
+    random.seed(1)
+    lst = SimpleArithmeticList()
+    for cat, op in (("a", "+"), ("b", "-"), ("c", "*")):
+        sub = Datasets.problem_space(op, range(2, 10), range(2, 10),
+                                     incorrect_deviations=[-2, 2])
+        sub = sub.get_random(n=n_per_category).copy()
+        sub.update_properties({"category": cat})
+        lst.append(sub)
+    return lst
+
+
+def _labels(lst):
+    return [p.label() for p in lst.list]
+
+
+def _categories(lst):
+    return [p.properties["category"] for p in lst.list]
+
+
+def _shuffled(seed):
+    lst = _trials()
+    lst.constrained_shuffle(
+        no_repeat=["result", "operands"],
+        max_run={"correct": 3},
+        balance_transitions="category",
+        seed=seed,
+    )
+    return lst
+
+
+def test_constraints_are_fulfilled():
+    lst = _shuffled(seed=3)
+    probs = lst.list
+    for a, b in zip(probs[:-1], probs[1:]):
+        assert a.result.py_number() != b.result.py_number()
+        assert not {a.operand1.py_number(), a.operand2.py_number()} & {
+            b.operand1.py_number(), b.operand2.py_number()}
+    correct = [p.is_correct() for p in probs]
+    assert all(len(set(correct[i:i + 4])) > 1 for i in range(len(correct) - 3))
+
+
+def test_trials_are_only_reordered():
+    lst = _trials()
+    before = Counter(zip(_labels(lst), _categories(lst)))
+    lst.constrained_shuffle(no_repeat=["result"], max_run={"correct": 3}, seed=1)
+    assert Counter(zip(_labels(lst), _categories(lst))) == before
+
+
+def test_seed_gives_same_order():
+    assert _labels(_shuffled(seed=7)) == _labels(_shuffled(seed=7))
+    assert _labels(_shuffled(seed=7)) != _labels(_shuffled(seed=8))
+
+
+def test_balanced_transitions():
+    lst = _shuffled(seed=0)
+    cat = _categories(lst)
+    counts = Counter(zip(cat[:-1], cat[1:]))
+    expected = (len(cat) - 1) / 9
+    assert len(counts) == 9
+    assert all(abs(c - expected) <= 4 for c in counts.values())
+
+
+def test_balance_never_gets_worse():
+    codes = np.repeat(np.arange(3), 20)
+    constraints = _sequence.SequenceConstraints(transitions=codes)
+    expected = (len(codes) - 1) / 9
+    previous = np.inf
+    for max_iterations in range(0, 400, 10):  # same random stream
+        order = _sequence.constrained_order(
+            len(codes), constraints, rng=np.random.default_rng(3),
+            max_iterations=max_iterations,
+        )
+        assert sorted(order.tolist()) == list(range(len(codes)))
+        imbalance = np.abs(constraints.transition_counts(order) - expected).sum()
+        assert imbalance <= previous
+        previous = imbalance
@@ -0,0 +1,53 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from pynumstim import server
+from pynumstim.server import RenderServer
+
+
+def test_close_fails_pending_requests():
+    srv = RenderServer(port=0, n_workers=1, batch_delay=60)  # keys stay queued
+    errors = []
+
+    def render():
+        try:
+            srv.render(["$$1+1$$"], timeout=30)
+        except BaseException as err:
+            errors.append(err)
+
+    thread = threading.Thread(target=render)
+    thread.start()
+    while srv.stats()["pending"] == 0:
+        thread.join(0.01)
+    srv.close()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], RuntimeError)
+    assert srv.stats()["pending"] == 0
+    with pytest.raises(RuntimeError):
+        srv.render(["$$2+2$$"])
+
+
+def _fake_run(cmd, cwd, check, capture_output):
+    """latex and dvipng replacement: one page per stimulus, two pages for
+    stimuli containing 'EXTRA', page content is the tex code"""
+    if cmd[0] != "dvipng":
+        return
+    tex = Path(cwd, "texput.tex").read_text(encoding="utf-8")
+    pages = []
+    for part in tex.split("\\begin{stimulus}\n")[1:]:
+        code = part.split("\n\\end{stimulus}")[0]
+        pages += [code] * (2 if "EXTRA" in code else 1)
+    for i, code in enumerate(pages, 1):
+        Path(cwd, f"texput{i}.png").write_bytes(code.encode())
+
+
+def test_render_batch_with_wrong_number_of_pages(monkeypatch):
+    monkeypatch.setattr(server.subprocess, "run", _fake_run)
+    with pytest.raises(RuntimeError):
+        server._latex_pages(["a", "EXTRA", "b"], 100, "Black", "White")
+    rtn = server._render_batch(["a", "EXTRA", "b"], 100, "Black", "White")
+    assert rtn[0] == b"a" and rtn[2] == b"b"
+    assert isinstance(rtn[1], RuntimeError)
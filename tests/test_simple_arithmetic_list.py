@@ -0,0 +1,139 @@
+from pynumstim import Datasets, Num, SimpleArithmetic, SimpleArithmeticList
+
+
+def test_import_dict_ranges_and_tuples():
+    lst = SimpleArithmeticList()
+    lst.import_dict(
+        {
+            "a": {"op1": range(1, 5), "op2": (5, 6, 7, 8), "operation": "+"},
+            "b": {"op1": [2, 3], "op2": range(3, 5), "operation": "t"},
+        }
+    )
+    assert len(lst.list) == 20
+    assert lst.list[0].label() == "1+5"
+    assert lst.list[-1].label() == "3t4"
+    assert lst.list[-1].properties == {"category": "b"}
+
+
+def test_label_updated_after_changing_operands():
+    p = SimpleArithmetic(3, "+", 4, result=7)
+    assert p.label() == "3+4=7"
+    p.operand1 = Num(5)
+    assert p.label() == "5+4=7"
+    assert p.key() == "5+4=7"
+    p.operation = "*"
+    p.operand2 = Num(2)
+    assert p.label() == "5t2=7"
+
+
+def test_unique_after_changing_operands():
+    lst = SimpleArithmeticList()
+    lst.append([SimpleArithmetic(3, "+", 4), SimpleArithmetic(5, "+", 4)])
+    lst.list[0].label()  # cache
+    lst.list[0].operand1 = Num(5)
+    assert lst.duplicated() == [False, True]
+
+
+def test_properties_changed_via_view():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4), properties={"category": "x"})
+    for p in lst.find(first_operand=1).list:
+        p.update_properties({"category": "ones"})
+    assert list(lst.data_frame()["category"]) == ["ones"] * 3 + ["x"] * 6
+    assert len(lst.find(properties={"category": "ones"}).list) == 3
+    assert len(lst.query("category == 'ones'").list) == 3
+
+
+def test_cached_property_columns_are_updated():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4), properties={"category": "x"})
+    assert len(lst.query("category == 'x'").list) == 9  # columns cached
+    for p in lst.find(first_operand=1).list:
+        p.update_properties({"category": "ones"})
+    assert len(lst.find(properties={"category": "ones"}).list) == 3
+    lst.list[3].properties = {"category": "y"}
+    assert list(lst.data_frame()["category"][2:5]) == ["ones", "y", "x"]
+    lst.update_properties({"block": 1})
+    assert len(lst.find(properties={"block": 1, "category": "x"}).list) == 5
+    lst.list.append(SimpleArithmetic(1, "+", 1, properties={"block": 2}))
+    assert len(lst.query("block == 2").list) == 1
+
+
+def _labels(lst):
+    return [p.label() for p in lst.list]
+
+
+def test_copy_on_write_view_does_not_change_source():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4))
+    before = _labels(lst)
+    view = lst.find(first_operand=1)
+    view.set_results(dev_corr=1)
+    view.update_properties({"category": "x"})
+    assert _labels(lst) == before
+    assert all(p.properties is None for p in lst.list)
+    assert _labels(view) == ["1+1=3", "1+2=4", "1+3=5"]
+
+
+def test_copy_on_write_source_does_not_change_view():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4))
+    view = lst.get_random(n=9)
+    before = _labels(view)
+    lst.set_results(dev_corr=0)
+    lst.update_properties({"category": "x"})
+    assert _labels(view) == before
+    assert all(p.properties is None for p in view.list)
+
+
+def test_copy_on_write_pop_random():
+    lst = Datasets.problem_space("+", range(1, 4), range(1, 4))
+    view = lst.get_random(n=9)
+    before = _labels(view)
+    popped = lst.pop_random(2)
+    popped.set_results(dev_corr=1)
+    assert _labels(view) == before
+    popped = lst.pop_random(2, dev_corr=1)
+    assert _labels(view) == before
+
+
+def test_query_number_literals_and_strings():
+    lst = Datasets.problem_space(
+        "+", range(1, 10), range(1, 10), properties={"category": "e1"}
+    )
+    assert len(lst.query("result > 1e1").list) == len(lst.query("result > 10").list)
+    assert len(lst.query("category == 'e1' and op1 < 2").list) == 9
+
+
+def test_match_excludes_identical_problems():
+    lst = Datasets.problem_space("+", range(1, 8), range(1, 8))
+    for method, n_unmatched in (("greedy", 1), ("optimal", 0)):
+        # greedy: the last target might be left with itself
+        targets, controls, _ = lst.match(lst, method=method)
+        assert len(targets.list) >= len(lst.list) - n_unmatched
+        assert all(t is not c for t, c in zip(targets.list, controls.list))
+    single = lst.get_random(n=1)
+    for method in ("greedy", "optimal"):
+        targets, _, _ = single.match(single, method=method)
+        assert len(targets.list) == 0
+
+
+def test_drop_duplicates_with_unhashable_properties():
+    lst = SimpleArithmeticList()
+    lst.append(
+        [
+            SimpleArithmetic(1, "+", 2, properties={"tags": ["a", "b"], "block": 1}),
+            SimpleArithmetic(1, "+", 2, properties={"block": 1, "tags": ["a", "b"]}),
+            SimpleArithmetic(1, "+", 2, properties={"tags": ["a"], "block": 1}),
+            SimpleArithmetic(1, "+", 2, properties={"tags": ["a"], "block": True}),
+        ]
+    )
+    assert lst.duplicated(properties=True) == [False, True, False, False]
+    assert lst.drop_duplicates(properties=True) == 1
+    assert lst.drop_duplicates() == 2
+
+
+def test_match_undefined_n_carry():
+    lst = Datasets.problem_space("+", range(1, 6), range(1, 6))
+    lst.append(Datasets.problem_space("*", range(2, 7), range(2, 7)))
+    targets, controls, dist = lst.match(lst)  # n_carry is a default feature
+    assert len(targets.list) >= len(lst.list) - 2
+    for t, c in zip(targets.list, controls.list):
+        assert (t.operation == "*") == (c.operation == "*")
+    assert all(d < float("inf") for d in dist)